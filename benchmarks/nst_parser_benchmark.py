@@ -0,0 +1,117 @@
+"""
+Benchmark parse_nst_table against pd.read_html on recorded Natural Stat Trick pages.
+
+Usage (from the repository root):
+    python benchmarks/nst_parser_benchmark.py data/nst_pages/*.html --repeat 5
+    python benchmarks/nst_parser_benchmark.py            # synthetic 900 x 80 skater page
+
+Pages can be recorded by saving the response of a scraper URL, e.g.
+    curl -o skaters.html 'https://www.naturalstattrick.com/playerteams.php?...'
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.data_processing.nst_table_parser import parse_nst_table, toi_to_minutes
+
+def synthetic_page(n_rows: int = 900, n_stats: int = 75) -> bytes:
+    """
+    Builds a page shaped like an NST skater table followed by a few layout tables.
+
+    Parameters:
+        n_rows (int): Number of player rows.
+        n_stats (int): Number of numeric stat columns.
+
+    Returns:
+        bytes: The HTML page.
+    """
+    header = ['', 'Player', 'Team', 'Position', 'GP', 'TOI'] + [f"Stat {j}" for j in range(n_stats)]
+    rows = []
+    for i in range(n_rows):
+        stats = ''.join(
+            f"<td>{'-' if (i + j) % 17 == 0 else round(i * 0.37 + j, 2)}</td>" for j in range(n_stats)
+        )
+        rows.append(
+            f"<tr><td>{i + 1}</td><td><a href='playerreport.php?id={i}'>Player {i}</a></td>"
+            f"<td>TOR, MTL</td><td>C</td><td>{i % 82}</td><td>{i}:{i % 60:02d}</td>{stats}</tr>"
+        )
+    html = (
+        "<html><body><table id='players'><thead><tr>"
+        + ''.join(f"<th>{h}</th>" for h in header)
+        + "</tr></thead><tbody>" + ''.join(rows) + "</tbody></table>"
+        + "<table><tr><td>footer</td></tr></table>" * 20
+        + "</body></html>"
+    )
+    return html.encode('utf-8')
+
+def read_html_first_table(page: bytes) -> pd.DataFrame:
+    """Parses a page the way the scrapers did before parse_nst_table."""
+    df = pd.read_html(StringIO(page.decode('utf-8', errors='replace')), flavor='lxml')[0]
+    for col in [c for c in df.columns if 'toi' in str(c).lower()]:
+        df[col] = toi_to_minutes(df[col].astype(str).to_numpy(dtype=object))
+    return df
+
+def time_call(func, page: bytes, repeat: int) -> float:
+    """Returns the median wall time of func(page) in seconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(page)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+def frames_match(expected: pd.DataFrame, actual: pd.DataFrame) -> bool:
+    """Checks that both parsers produced the same columns and values ('-' read as missing)."""
+    if list(map(str, expected.columns)) != list(map(str, actual.columns)) or expected.shape != actual.shape:
+        return False
+    for col in expected.columns:
+        left = pd.to_numeric(expected[col].replace('-', np.nan), errors='coerce')
+        right = pd.to_numeric(actual[col], errors='coerce')
+        if left.notna().any() or right.notna().any():
+            if not np.allclose(left.to_numpy(dtype=float), right.to_numpy(dtype=float), equal_nan=True):
+                return False
+        elif not (expected[col].astype(str).to_numpy() == actual[col].astype(str).to_numpy()).all():
+            return False
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('pages', nargs='*', help='Recorded NST HTML pages (defaults to a synthetic page)')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per parser and page')
+    args = parser.parse_args()
+
+    if args.pages:
+        pages = []
+        for path in args.pages:
+            with open(path, 'rb') as f:
+                pages.append((os.path.basename(path), f.read()))
+    else:
+        pages = [('synthetic', synthetic_page())]
+
+    results = []
+    for name, page in pages:
+        read_html_s = time_call(read_html_first_table, page, args.repeat)
+        parse_s = time_call(parse_nst_table, page, args.repeat)
+        df = parse_nst_table(page)
+        results.append({
+            'page': name,
+            'kb': round(len(page) / 1024),
+            'shape': df.shape if df is not None else None,
+            'read_html_s': round(read_html_s, 4),
+            'parse_nst_table_s': round(parse_s, 4),
+            'speedup': round(read_html_s / parse_s, 1),
+            'match': df is not None and frames_match(read_html_first_table(page), df),
+        })
+
+    print(pd.DataFrame(results).to_string(index=False))
+
+if __name__ == '__main__':
+    main()
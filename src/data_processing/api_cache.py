@@ -0,0 +1,208 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+from typing import Any, Callable, Optional
+
+from src.data_processing.http_client import get_client
+
+logger = logging.getLogger(__name__)
+
+# Directory holding cached NHL API responses (override with NHL_API_CACHE_DIR)
+CACHE_DIR = os.getenv('NHL_API_CACHE_DIR', os.path.join('..', 'data', 'nhl_api_cache'))
+
+# Time-to-live in seconds for payloads of games that are live or not yet played
+LIVE_TTL = 300
+
+# Time-to-live in seconds for payloads of games that are over but not yet official ('FINAL'):
+# the NHL still corrects boxscores and play-by-play until the game is marked 'OFF'
+FINAL_TTL = 6 * 60 * 60
+
+# Time-to-live in seconds for payloads that are not tied to games (player profiles, rosters, team info)
+DEFAULT_TTL = 24 * 60 * 60
+
+# Game states of games that are over
+FINAL_GAME_STATES = {'OFF', 'FINAL'}
+
+# Game states after which a game's payloads no longer change
+OFFICIAL_GAME_STATES = {'OFF'}
+
+# Schedule states for games that will not be played on their listed date
+SETTLED_SCHEDULE_STATES = {'PPD', 'CNCL'}
+
+def _normalize_url(url: str) -> str:
+    """
+    Normalizes a URL so that equivalent requests share a cache entry.
+
+    Parameters:
+        url (str): The request URL.
+
+    Returns:
+        str: The URL with repeated slashes in the path collapsed.
+    """
+    scheme, sep, rest = url.partition('://')
+    return scheme + sep + re.sub(r'/{2,}', '/', rest)
+
+def _cache_path(url: str) -> str:
+    """
+    Returns the cache file path for a URL.
+
+    Parameters:
+        url (str): The request URL.
+
+    Returns:
+        str: Path of the gzip-compressed JSON entry, named by the SHA-256 of the normalized URL.
+    """
+    key = hashlib.sha256(_normalize_url(url).encode('utf-8')).hexdigest()
+    return os.path.join(CACHE_DIR, key[:2], f"{key}.json.gz")
+
+def _is_settled(game: dict) -> bool:
+    """
+    Checks whether a game listed in a schedule will not change anymore.
+
+    Parameters:
+        game (dict): A game entry from a schedule response.
+
+    Returns:
+        bool: True if the game is official or was postponed/cancelled.
+    """
+    return (game.get('gameState') in OFFICIAL_GAME_STATES
+            or game.get('gameScheduleState') in SETTLED_SCHEDULE_STATES)
+
+def cache_ttl(data: Any) -> Optional[float]:
+    """
+    Determines how long a response may be served from the cache.
+
+    Game payloads (boxscore, play-by-play, landing) of official ('OFF') games and
+    schedules whose games are all official never expire. Payloads of games that are
+    over but still being corrected ('FINAL') use FINAL_TTL, payloads of live or future
+    games use LIVE_TTL and everything else uses DEFAULT_TTL.
+
+    Parameters:
+        data: The decoded JSON response.
+
+    Returns:
+        Optional[float]: Time-to-live in seconds, or None if the entry never expires.
+    """
+    if not isinstance(data, dict):
+        return DEFAULT_TTL
+
+    if 'gameState' in data:
+        if data['gameState'] in OFFICIAL_GAME_STATES:
+            return None
+        return FINAL_TTL if data['gameState'] in FINAL_GAME_STATES else LIVE_TTL
+
+    if 'gameWeek' in data:
+        games = [game for day in data['gameWeek'] for game in day.get('games', [])]
+    elif isinstance(data.get('games'), list):
+        games = data['games']
+    else:
+        return DEFAULT_TTL
+
+    if not games:
+        return DEFAULT_TTL
+    if all(_is_settled(game) for game in games):
+        return None
+    if all(_is_settled(game) or game.get('gameState') in FINAL_GAME_STATES for game in games):
+        return FINAL_TTL
+    return LIVE_TTL
+
+def read_cache(url: str) -> Optional[Any]:
+    """
+    Reads a cached response if present and not expired.
+
+    Parameters:
+        url (str): The request URL.
+
+    Returns:
+        The cached JSON data, or None if there is no valid entry.
+    """
+    path = _cache_path(url)
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            entry = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable cache entry for {url}: {e}")
+        return None
+
+    expires_at = entry.get('expires_at')
+    if expires_at is not None and expires_at < time.time():
+        return None
+    return entry.get('data')
+
+def write_cache(url: str, data: Any) -> None:
+    """
+    Writes a response to the cache, expiring it according to cache_ttl.
+
+    The entry is written to a temporary file and moved into place so that
+    concurrent readers never see a partial file.
+
+    Parameters:
+        url (str): The request URL.
+        data: The decoded JSON response.
+    """
+    ttl = cache_ttl(data)
+    now = time.time()
+    entry = {
+        'url': _normalize_url(url),
+        'fetched_at': now,
+        'expires_at': None if ttl is None else now + ttl,
+        'data': data
+    }
+
+    path = _cache_path(url)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as raw, gzip.open(raw, 'wt', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def fetch_json(url: str) -> Any:
+    """
+    Fetches a URL through the shared HTTP client and decodes the JSON response.
+
+    Parameters:
+        url (str): The request URL.
+
+    Returns:
+        The decoded JSON response.
+
+    Raises:
+        requests.exceptions.RequestException: If the request fails.
+    """
+    return get_client().get_json(url)
+
+def get_cached_json(url: str, fetch: Optional[Callable[[str], Any]] = None) -> Any:
+    """
+    Returns the JSON response for an NHL API URL, using the on-disk cache when possible.
+
+    Parameters:
+        url (str): The request URL.
+        fetch (callable, optional): Function used to download the URL on a cache miss.
+                                    Defaults to fetch_json. A None result is not cached.
+
+    Returns:
+        The decoded JSON response, or whatever fetch returned on a failed request.
+    """
+    data = read_cache(url)
+    if data is not None:
+        return data
+
+    data = (fetch or fetch_json)(url)
+    if data is not None:
+        try:
+            write_cache(url, data)
+        except OSError as e:
+            logger.warning(f"Failed to cache response for {url}: {e}")
+    return data
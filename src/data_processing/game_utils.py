@@ -1,14 +1,17 @@
-import requests
 from requests.adapters import HTTPAdapter, Retry
 from datetime import datetime, timedelta
 import pandas as pd
 
+from src.data_processing.api_cache import get_cached_json
+
 API_URL = 'https://api-web.nhle.com/v1'
 
 def get_game_boxscore(game_id: int, clean: bool = False) -> dict:
     """
     Retrieves boxscore information for a specific NHL game.
 
+    Boxscores of official games are served from the on-disk API cache after the first request.
+
     Parameters:
         game_id (int): The ID of the game to retrieve boxscore data for.
         clean (bool): Whether to return a cleaned version of the data with only
@@ -21,9 +24,7 @@ def get_game_boxscore(game_id: int, clean: bool = False) -> dict:
         requests.exceptions.RequestException: If the API request fails.
     """
     boxscore_url = f"{API_URL}/gamecenter/{game_id}/boxscore"
-    response = requests.get(boxscore_url)
-    response.raise_for_status()
-    data = response.json()
+    data = get_cached_json(boxscore_url)
     
     if clean:
         return {
@@ -0,0 +1,228 @@
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter, Retry
+
+logger = logging.getLogger(__name__)
+
+# Default timeout in seconds for every request
+DEFAULT_TIMEOUT = 10
+
+# Keep-alive connections kept open per host
+POOL_MAXSIZE = 16
+
+# Per-host limits: max concurrent requests and minimum seconds between request starts
+DEFAULT_HOST_LIMITS = {
+    'api-web.nhle.com': {'max_concurrency': 8, 'min_interval': 0.0},
+    'api.nhle.com': {'max_concurrency': 8, 'min_interval': 0.0},
+    'www.naturalstattrick.com': {'max_concurrency': 1, 'min_interval': 0.0},
+    'api.the-odds-api.com': {'max_concurrency': 4, 'min_interval': 0.0},
+    'api.prop-odds.com': {'max_concurrency': 2, 'min_interval': 0.5},
+}
+
+# Limits for hosts not listed in DEFAULT_HOST_LIMITS
+FALLBACK_HOST_LIMIT = {'max_concurrency': 4, 'min_interval': 0.0}
+
+class HttpClient:
+    """
+    Shared HTTP client for NHL API, Natural Stat Trick and odds API access.
+
+    All requests go through one requests.Session, so connections are kept alive in
+    per-host pools and cookies are shared. Every request uses the same retry
+    strategy and default timeout, is subject to its host's concurrency and rate
+    limits, and is counted in per-endpoint statistics (requests, errors, seconds, bytes).
+
+    Example:
+        client = get_client()
+        data = client.get_json('https://api-web.nhle.com/v1/schedule/2024-10-08')
+        print(client.get_stats())
+    """
+
+    def __init__(self, timeout: float = DEFAULT_TIMEOUT, pool_maxsize: int = POOL_MAXSIZE,
+                 host_limits: Optional[Dict[str, dict]] = None):
+        self.timeout = timeout
+        self.session = requests.Session()
+        retry = Retry(
+            total=5,  # Total number of retries
+            backoff_factor=1,  # Exponential backoff factor (e.g., 1, 2, 4, 8, 16 seconds)
+            status_forcelist=[429, 500, 502, 503, 504, 522, 524],  # HTTP status codes to retry
+            allowed_methods=["GET"]  # Methods to retry
+        )
+        adapter = HTTPAdapter(max_retries=retry, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._host_limits = dict(DEFAULT_HOST_LIMITS if host_limits is None else host_limits)
+        self._semaphores = {}
+        self._next_start = {}
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def set_host_limit(self, host: str, max_concurrency: Optional[int] = None, min_interval: Optional[float] = None) -> None:
+        """
+        Sets the concurrency and rate limit for a host.
+
+        Parameters:
+            host (str): Host name (e.g., 'api-web.nhle.com').
+            max_concurrency (int, optional): Maximum number of requests in flight to the host.
+            min_interval (float, optional): Minimum number of seconds between request starts.
+        """
+        with self._lock:
+            limit = dict(self._host_limits.get(host, FALLBACK_HOST_LIMIT))
+            if max_concurrency is not None:
+                limit['max_concurrency'] = max_concurrency
+            if min_interval is not None:
+                limit['min_interval'] = min_interval
+            self._host_limits[host] = limit
+            self._semaphores.pop(host, None)
+
+    @contextmanager
+    def _host_slot(self, host: str):
+        """Holds one of the host's concurrency slots and waits for its rate limit."""
+        with self._lock:
+            limit = self._host_limits.get(host, FALLBACK_HOST_LIMIT)
+            semaphore = self._semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(limit['max_concurrency'])
+                self._semaphores[host] = semaphore
+
+        with semaphore:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_start.get(host, now))
+                self._next_start[host] = start + limit['min_interval']
+            if start > now:
+                time.sleep(start - now)
+            yield
+
+    @staticmethod
+    def endpoint_for(url: str) -> str:
+        """
+        Returns the statistics key for a URL: host and path with ids and dates templated.
+
+        Parameters:
+            url (str): The request URL.
+
+        Returns:
+            str: Endpoint key such as 'api-web.nhle.com/v1/gamecenter/{id}/boxscore'.
+        """
+        parsed = urlparse(url)
+        path = re.sub(r'/{2,}', '/', parsed.path)
+        path = re.sub(r'/\d[\d-]*(?=/|$)', '/{id}', path)
+        return f"{parsed.netloc}{path}"
+
+    def _record(self, endpoint: str, seconds: float, n_bytes: int, error: bool) -> None:
+        """Adds one request to the endpoint's statistics."""
+        with self._lock:
+            stats = self._stats.setdefault(endpoint, {'requests': 0, 'errors': 0, 'seconds': 0.0, 'bytes': 0})
+            stats['requests'] += 1
+            stats['errors'] += int(error)
+            stats['seconds'] += seconds
+            stats['bytes'] += n_bytes
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Sends a request through the shared session.
+
+        Parameters:
+            method (str): HTTP method.
+            url (str): The request URL.
+            **kwargs: Passed to requests.Session.request. timeout defaults to the client timeout.
+
+        Returns:
+            requests.Response: The response (status is not checked).
+
+        Raises:
+            requests.exceptions.RequestException: If the request fails after all retries.
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        host = urlparse(url).netloc
+        endpoint = self.endpoint_for(url)
+
+        with self._host_slot(host):
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except requests.exceptions.RequestException:
+                self._record(endpoint, time.perf_counter() - start, 0, error=True)
+                raise
+            n_bytes = len(response.content)
+            self._record(endpoint, time.perf_counter() - start, n_bytes, error=not response.ok)
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """
+        Sends a GET request (see request).
+
+        Parameters:
+            url (str): The request URL.
+            **kwargs: Passed to requests.Session.request.
+
+        Returns:
+            requests.Response: The response (status is not checked).
+        """
+        return self.request('GET', url, **kwargs)
+
+    def get_json(self, url: str, **kwargs):
+        """
+        Sends a GET request and decodes the JSON response.
+
+        Parameters:
+            url (str): The request URL.
+            **kwargs: Passed to requests.Session.request.
+
+        Returns:
+            The decoded JSON response.
+
+        Raises:
+            requests.exceptions.RequestException: If the request fails or returns an error status.
+        """
+        response = self.get(url, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    def get_stats(self) -> pd.DataFrame:
+        """
+        Returns the request statistics per endpoint.
+
+        Returns:
+            pd.DataFrame: One row per endpoint with requests, errors, seconds, bytes and
+                          avg_seconds, sorted by total seconds.
+        """
+        with self._lock:
+            rows = [{'endpoint': endpoint, **stats} for endpoint, stats in self._stats.items()]
+        df = pd.DataFrame(rows, columns=['endpoint', 'requests', 'errors', 'seconds', 'bytes'])
+        df['avg_seconds'] = df['seconds'] / df['requests']
+        return df.sort_values('seconds', ascending=False, ignore_index=True)
+
+    def reset_stats(self) -> None:
+        """Clears the request statistics."""
+        with self._lock:
+            self._stats.clear()
+
+    def close(self) -> None:
+        """Closes all pooled connections."""
+        self.session.close()
+
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+def get_client() -> HttpClient:
+    """
+    Returns the process-wide HTTP client, creating it on first use.
+
+    Returns:
+        HttpClient: The shared client.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
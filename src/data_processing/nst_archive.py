@@ -0,0 +1,135 @@
+import gzip
+import hashlib
+import logging
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import Optional
+from urllib.parse import urlencode
+
+logger = logging.getLogger(__name__)
+
+# Directory holding archived Natural Stat Trick pages (override with NST_ARCHIVE_DIR)
+ARCHIVE_DIR = os.getenv('NST_ARCHIVE_DIR', os.path.join('..', 'data', 'nst_archive'))
+
+# Archive modes:
+#   'off'    - pages are fetched and not archived
+#   'record' - pages are fetched and every successful response is archived
+#   'replay' - pages are read from the archive only; nothing is sent to the site
+ARCHIVE_MODES = ('off', 'record', 'replay')
+
+_mode = os.getenv('NST_ARCHIVE_MODE', 'off')
+
+def get_archive_mode() -> str:
+    """
+    Returns the current archive mode ('off', 'record' or 'replay').
+    """
+    return _mode
+
+def set_archive_mode(mode: str) -> str:
+    """
+    Sets the archive mode for all Natural Stat Trick scrapers.
+
+    Parameters:
+        mode (str): 'off', 'record' or 'replay'.
+
+    Returns:
+        str: The previous mode.
+    """
+    global _mode
+    if mode not in ARCHIVE_MODES:
+        raise ValueError(f"Invalid archive mode: {mode}. Must be one of: {', '.join(ARCHIVE_MODES)}")
+    previous, _mode = _mode, mode
+    return previous
+
+@contextmanager
+def archive_mode(mode: str):
+    """
+    Temporarily sets the archive mode.
+
+    Example:
+        # Rebuild a season's goalie table from archived pages, without delays or requests
+        with archive_mode('replay'):
+            scrape_goalie_stats_range('2024-10-04', '2025-04-17', situation='5v5')
+    """
+    previous = set_archive_mode(mode)
+    try:
+        yield
+    finally:
+        set_archive_mode(previous)
+
+def is_replaying() -> bool:
+    """
+    Checks whether pages are served from the archive, in which case callers can skip politeness delays.
+    """
+    return _mode == 'replay'
+
+def archive_key(page: str, params: dict) -> str:
+    """
+    Returns the archive key of a request: the page and its query parameters sorted by name.
+
+    Parameters:
+        page (str): The page name (e.g., 'teamtable.php').
+        params (dict): The query parameters.
+
+    Returns:
+        str: The key (e.g., 'teamtable.php?fd=2024-10-08&fromseason=20242025&...').
+    """
+    return f"{page}?{urlencode(sorted((str(k), str(v)) for k, v in params.items()))}"
+
+def _archive_path(page: str, params: dict) -> str:
+    """
+    Returns the archive file path of a request.
+
+    Parameters:
+        page (str): The page name.
+        params (dict): The query parameters.
+
+    Returns:
+        str: Path of the gzip-compressed page, named by the SHA-256 of its archive key.
+    """
+    key = hashlib.sha256(archive_key(page, params).encode('utf-8')).hexdigest()
+    return os.path.join(ARCHIVE_DIR, os.path.splitext(page)[0], key[:2], f"{key}.html.gz")
+
+def load_page(page: str, params: dict) -> Optional[bytes]:
+    """
+    Reads an archived page.
+
+    Parameters:
+        page (str): The page name.
+        params (dict): The query parameters.
+
+    Returns:
+        Optional[bytes]: The page, or None if it was never archived.
+    """
+    path = _archive_path(page, params)
+    try:
+        with gzip.open(path, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+    except (OSError, EOFError) as e:
+        logger.warning(f"Ignoring unreadable archive entry {path}: {e}")
+        return None
+
+def save_page(page: str, params: dict, content: bytes) -> None:
+    """
+    Archives a page. The file is written to a temporary file first and moved into place,
+    so an interrupted write never leaves a truncated entry.
+
+    Parameters:
+        page (str): The page name.
+        params (dict): The query parameters.
+        content (bytes): The raw response body.
+    """
+    path = _archive_path(page, params)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
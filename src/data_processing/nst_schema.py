@@ -0,0 +1,281 @@
+import logging
+import re
+from functools import lru_cache
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.data_processing.nst_table_parser import MISSING_VALUES, toi_to_minutes
+from src.data_processing.team_utils import nst_to_nhl_tricode
+
+logger = logging.getLogger(__name__)
+
+# Column kinds:
+#   'str'  - text, kept as is
+#   'team' - NST team code(s), mapped to NHL tri-codes ('N.J, T.B' -> 'NJD, TBL')
+#   'int'  - count; int64, or float64 with NaN when values are missing
+#   'float'- rate/percentage; float64 with NaN for missing values
+#   'toi'  - MM:SS time on ice, converted to decimal minutes
+#   'keep' - added by the caller (date, season, side, ...), never converted
+#   'auto' - unknown column; converted to a number only if every value is numeric
+
+@lru_cache(maxsize=None)
+def db_column_name(column: str) -> str:
+    """
+    Returns the database column name for a scraper column name.
+
+    Parameters:
+        column (str): Column name as returned by the NST scrapers (e.g., 'sv%', 'toi/gp', 'avg._shot_distance').
+
+    Returns:
+        str: The database column name (e.g., 'sv_pct', 'toi_per_gp', 'avg_shot_distance').
+    """
+    name = column.replace('/', '_per_').replace('%', '_pct')
+    name = re.sub(r'[^a-zA-Z0-9]', '_', name)
+    name = re.sub(r'_+', '_', name)
+    return name.strip('_').lower()
+
+@lru_cache(maxsize=None)
+def scraper_column_name(header: str) -> str:
+    """
+    Returns the scraper column name for an NST table header (lowercase, spaces as underscores).
+
+    Parameters:
+        header (str): The header as shown on the page (e.g., 'Shots Against').
+
+    Returns:
+        str: The column name (e.g., 'shots_against').
+    """
+    return str(header).lower().replace(' ', '_')
+
+def _map_teams(values: pd.Series) -> pd.Series:
+    """
+    Maps NST team codes to NHL tri-codes, looking up each distinct value once.
+
+    Parameters:
+        values (pd.Series): Team cells, possibly listing several teams ('N.J, T.B').
+
+    Returns:
+        pd.Series: The mapped team strings.
+    """
+    categories = values.astype('category')
+    mapping = {
+        value: ', '.join(nst_to_nhl_tricode(team.strip()) or team.strip() for team in str(value).split(','))
+        for value in categories.cat.categories
+    }
+    return categories.map(mapping).astype(object)
+
+def _to_number(values: pd.Series) -> pd.Series:
+    """Converts a column to float64, reading NST's missing markers as NaN."""
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype(np.float64)
+    return pd.to_numeric(values.replace(list(MISSING_VALUES), np.nan), errors='coerce')
+
+def _narrow_int(values: pd.Series) -> pd.Series:
+    """Returns int64 values when a float column holds only whole numbers and no NaN."""
+    if values.notna().all() and (values % 1 == 0).all():
+        return values.astype(np.int64)
+    return values
+
+class NstTableSchema:
+    """
+    Declarative schema of one type of Natural Stat Trick table.
+
+    Maps each scraper column name to its kind (see the kinds above) and converts a
+    whole table in one pass with vectorized operations. Columns not in the schema
+    use the 'auto' kind. Column names stay the scraper names that the notebooks use
+    (e.g., 'sv%', 'toi/gp'); db_column_name gives the database names.
+
+    Example:
+        df = NST_SCHEMAS['goalie'].normalize(parse_nst_table(html))
+        records = NST_SCHEMAS['goalie'].to_db_frame(df)
+    """
+
+    def __init__(self, name: str, columns: Dict[str, str]):
+        self.name = name
+        self.columns = dict(columns)
+        self.columns.setdefault('date', 'keep')
+        self.columns.setdefault('season', 'keep')
+        self.columns.setdefault('location', 'keep')
+        self.columns.setdefault('side', 'keep')
+        self.columns.setdefault('opponent', 'keep')
+
+    def kind(self, column: str) -> str:
+        """
+        Returns the kind of a column.
+
+        Parameters:
+            column (str): Scraper column name.
+
+        Returns:
+            str: The column kind.
+        """
+        if column in self.columns:
+            return self.columns[column]
+        if 'toi' in column:
+            return 'toi'
+        return 'auto'
+
+    def normalize(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Converts a raw or parsed NST table to the schema's names and dtypes.
+
+        Drops the row-number column, lowercases headers, maps team codes, converts TOI
+        to decimal minutes and numbers to int64/float64 with NaN for '-'. Normalizing
+        an already normalized table leaves it unchanged.
+
+        Parameters:
+            df (pd.DataFrame): Table from parse_nst_table or pd.read_html.
+
+        Returns:
+            pd.DataFrame: The normalized table.
+        """
+        df = df.drop(columns=[c for c in df.columns if str(c).lower() == 'unnamed: 0'])
+        df.columns = [scraper_column_name(c) for c in df.columns]
+
+        converted = {}
+        for column in df.columns:
+            values = df[column]
+            kind = self.kind(column)
+            if kind in ('keep', 'str'):
+                converted[column] = values
+            elif kind == 'team':
+                converted[column] = _map_teams(values)
+            elif kind == 'toi':
+                if pd.api.types.is_numeric_dtype(values):
+                    converted[column] = values.astype(np.float64).round(2)
+                else:
+                    converted[column] = pd.Series(
+                        toi_to_minutes(values.where(~values.isin(MISSING_VALUES), None).to_numpy(dtype=object)),
+                        index=df.index
+                    )
+            elif kind == 'int':
+                converted[column] = _narrow_int(_to_number(values))
+            elif kind == 'float':
+                converted[column] = _to_number(values)
+            elif values.dtype == object:
+                # Unknown column: numeric only if every value other than '-' parses as a number
+                numbers = _to_number(values)
+                present = values.notna() & ~values.isin(MISSING_VALUES)
+                converted[column] = _narrow_int(numbers) if numbers[present].notna().all() else values
+            else:
+                converted[column] = values
+        return pd.DataFrame(converted, index=df.index)
+
+    def to_db_frame(self, df: pd.DataFrame, columns: Optional[list] = None) -> pd.DataFrame:
+        """
+        Prepares a table for insertion: normalizes it, renames columns to database names
+        and replaces missing values with None so they are stored as NULL.
+
+        Parameters:
+            df (pd.DataFrame): Table from a scraper (normalized or not).
+            columns (list, optional): Database columns to keep, in order. Defaults to all.
+
+        Returns:
+            pd.DataFrame: Object-dtype table ready for psycopg2.
+        """
+        out = self.normalize(df)
+        # Counts with missing values are float64 after normalize; store them as integers
+        for column in out.columns:
+            if self.kind(column) == 'int' and out[column].dtype != np.int64:
+                out[column] = out[column].astype('Int64')
+        out.columns = [db_column_name(c) for c in out.columns]
+        if columns is not None:
+            missing = [c for c in columns if c not in out.columns]
+            if missing:
+                raise KeyError(f"Missing columns: {missing}")
+            out = out[columns]
+        return out.astype(object).where(out.notna(), None)
+
+# Shot-quality prefixes: scoring chances and high/medium/low danger
+_DANGER_PREFIXES = ('hd', 'md', 'ld')
+_CHANCE_PREFIXES = ('sc',) + _DANGER_PREFIXES
+
+GOALIE_SCHEMA = NstTableSchema('goalie', {
+    'player': 'str',
+    'team': 'team',
+    'gp': 'int',
+    'toi': 'toi',
+    'shots_against': 'int',
+    'saves': 'int',
+    'goals_against': 'int',
+    'sv%': 'float',
+    'gaa': 'float',
+    'gsaa': 'float',
+    'xg_against': 'float',
+    **{f"{p}_{stat}": 'int' for p in _DANGER_PREFIXES for stat in ('shots_against', 'saves', 'goals_against')},
+    **{f"{p}{stat}": 'float' for p in _DANGER_PREFIXES for stat in ('sv%', 'gaa', 'gsaa')},
+    'rush_attempts_against': 'int',
+    'rebound_attempts_against': 'int',
+    'avg._shot_distance': 'float',
+    'avg._goal_distance': 'float',
+})
+
+# goalie_stats_* columns written by insert_goalie_stats_df, in table order
+GOALIE_DB_COLUMNS = [db_column_name(c) for c, kind in GOALIE_SCHEMA.columns.items() if kind != 'keep'] + ['date', 'side', 'opponent']
+
+TEAM_SCHEMA = NstTableSchema('team', {
+    'team': 'str',  # Full team names; nst_db_utils maps them with get_tricode_by_fullname where needed
+    'gp': 'int',
+    'toi': 'toi',
+    'w': 'int',
+    'l': 'int',
+    'otl': 'int',
+    'row': 'int',
+    'points': 'int',
+    'point_%': 'float',
+    **{stat: 'int' for stat in ('cf', 'ca', 'ff', 'fa', 'sf', 'sa', 'gf', 'ga', 'ppgf', 'ppga', 'pkgf', 'pkga')},
+    **{f"{stat}%": 'float' for stat in ('cf', 'ff', 'sf', 'gf', 'xgf', 'sh', 'sv', 'pp', 'pk')},
+    'xgf': 'float',
+    'xga': 'float',
+    **{f"{p}{stat}": 'int' for p in _CHANCE_PREFIXES for stat in ('cf', 'ca', 'sf', 'sa', 'gf', 'ga')},
+    **{f"{p}{stat}%": 'float' for p in _CHANCE_PREFIXES for stat in ('cf', 'sf', 'gf', 'sh', 'sv')},
+    'pdo': 'float',
+})
+
+SKATER_STD_SCHEMA = NstTableSchema('skater_std', {
+    'player': 'str',
+    'team': 'team',
+    'position': 'str',
+    'gp': 'int',
+    'toi': 'toi',
+    **{stat: 'int' for stat in (
+        'goals', 'total_assists', 'first_assists', 'second_assists', 'total_points', 'shots',
+        'icf', 'iff', 'iscf', 'ihdcf', 'rush_attempts', 'rebounds_created', 'pim', 'total_penalties',
+        'minor', 'major', 'misconduct', 'penalties_drawn', 'giveaways', 'takeaways', 'hits',
+        'hits_taken', 'shots_blocked', 'faceoffs_won', 'faceoffs_lost'
+    )},
+    'ipp': 'float',
+    'sh%': 'float',
+    'ixg': 'float',
+    'faceoffs_%': 'float',
+})
+
+SKATER_OI_SCHEMA = NstTableSchema('skater_oi', {
+    'player': 'str',
+    'team': 'team',
+    'position': 'str',
+    'gp': 'int',
+    'toi': 'toi',
+    **{stat: 'int' for stat in ('cf', 'ca', 'ff', 'fa', 'sf', 'sa', 'gf', 'ga')},
+    **{f"{stat}%": 'float' for stat in ('cf', 'ff', 'sf', 'gf', 'xgf')},
+    'xgf': 'float',
+    'xga': 'float',
+    **{f"{p}{stat}": 'int' for p in _CHANCE_PREFIXES for stat in ('cf', 'ca', 'sf', 'sa', 'gf', 'ga')},
+    **{f"{p}{stat}%": 'float' for p in _CHANCE_PREFIXES for stat in ('cf', 'sf', 'gf')},
+    'on-ice_sh%': 'float',
+    'on-ice_sv%': 'float',
+    'pdo': 'float',
+    'off. zone_start_%': 'float',
+    'off._zone_start_%': 'float',
+    'off._zone_faceoff_%': 'float',
+})
+
+# Schemas by table type: skater individual ('std'), skater on-ice ('oi'), goalie ('g') and team
+NST_SCHEMAS = {
+    'std': SKATER_STD_SCHEMA,
+    'oi': SKATER_OI_SCHEMA,
+    'g': GOALIE_SCHEMA,
+    'team': TEAM_SCHEMA,
+}
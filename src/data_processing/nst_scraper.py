@@ -1,11 +1,165 @@
-import pandas as pd
+import json
+import os
+import tempfile
+import threading
+import time
 import requests
-from io import StringIO
-from datetime import datetime, timedelta
 import logging
+from urllib.parse import urlencode
 
-from src.data_processing.team_utils import nst_to_nhl_tricode
-from src.data_processing.season_utils import get_season_for_date, NHL_SEASONS, get_season_end_date
+from src.data_processing.http_client import get_client
+from src.data_processing.nst_archive import archive_key, get_archive_mode, is_replaying, load_page, save_page
+from src.data_processing.nst_table_parser import parse_nst_table
+from src.data_processing.nst_schema import NST_SCHEMAS, SKATER_STD_SCHEMA, TEAM_SCHEMA
+from src.data_processing.season_utils import SEASON_CALENDAR
+
+logger = logging.getLogger(__name__)
+
+# Timeout in seconds for Natural Stat Trick pages, which can take a while to render
+NST_TIMEOUT = 60
+
+NST_BASE_URL = 'https://www.naturalstattrick.com'
+
+# File keeping the NST session cookies between runs (override with NST_COOKIE_FILE)
+NST_COOKIE_FILE = os.getenv('NST_COOKIE_FILE', os.path.join('..', 'data', 'nst_cookies.json'))
+
+# Status codes with which NST rejects a request whose session is missing or expired
+SESSION_REJECTED_STATUSES = (401, 403)
+
+_session_lock = threading.Lock()
+_cookies_loaded = False
+
+def _nst_cookies(session) -> list:
+    """Returns the NST cookies in a session's cookie jar."""
+    return [cookie for cookie in session.cookies if cookie.domain.lstrip('.').endswith('naturalstattrick.com')]
+
+def _load_nst_cookies(session) -> int:
+    """
+    Loads the NST cookies saved by a previous run into a session, skipping expired cookies.
+
+    Parameters:
+        session (requests.Session): The session to load the cookies into.
+
+    Returns:
+        int: The number of cookies loaded.
+    """
+    try:
+        with open(NST_COOKIE_FILE) as f:
+            saved = json.load(f)
+    except FileNotFoundError:
+        return 0
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable NST cookie file {NST_COOKIE_FILE}: {e}")
+        return 0
+
+    now = time.time()
+    loaded = 0
+    for cookie in saved:
+        if cookie.get('expires') is not None and cookie['expires'] <= now:
+            continue
+        session.cookies.set(
+            cookie['name'], cookie['value'], domain=cookie['domain'], path=cookie['path'],
+            expires=cookie.get('expires'), secure=cookie.get('secure', False)
+        )
+        loaded += 1
+    return loaded
+
+def _save_nst_cookies(session) -> None:
+    """
+    Saves a session's NST cookies so that the next run can reuse the session.
+
+    Parameters:
+        session (requests.Session): The session whose cookies to save.
+    """
+    cookies = [
+        {'name': c.name, 'value': c.value, 'domain': c.domain, 'path': c.path, 'expires': c.expires, 'secure': c.secure}
+        for c in _nst_cookies(session)
+    ]
+    directory = os.path.dirname(NST_COOKIE_FILE) or '.'
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(cookies, f)
+        os.replace(tmp_path, NST_COOKIE_FILE)
+    except OSError as e:
+        logger.warning(f"Could not save NST cookies to {NST_COOKIE_FILE}: {e}")
+
+def _prime_nst_session(client, prime_url: str) -> None:
+    """
+    Requests a page to get a new NST session cookie and saves it.
+
+    Parameters:
+        client (HttpClient): The shared HTTP client.
+        prime_url (str): The page to request.
+    """
+    logger.info("Starting a new Natural Stat Trick session")
+    client.get(prime_url, timeout=NST_TIMEOUT)
+    _save_nst_cookies(client.session)
+
+def _ensure_nst_session(client, prime_url: str) -> None:
+    """
+    Makes sure the shared client holds an NST session cookie.
+
+    The cookies saved by a previous run are loaded once per process; a priming request
+    is only sent when there is no cookie to reuse.
+
+    Parameters:
+        client (HttpClient): The shared HTTP client.
+        prime_url (str): The page to request if a new session is needed.
+    """
+    global _cookies_loaded
+    with _session_lock:
+        if not _cookies_loaded:
+            _load_nst_cookies(client.session)
+            _cookies_loaded = True
+        if not _nst_cookies(client.session):
+            _prime_nst_session(client, prime_url)
+
+def _fetch_nst_page(page: str, params: dict, headers: dict, prime_url: str) -> bytes:
+    """
+    Fetches a Natural Stat Trick page, honouring the archive mode (see nst_archive).
+
+    In replay mode the page is read from the archive and no request is sent. In record
+    mode every successful response is archived before it is returned. The NST session
+    cookie is reused across calls and runs; the session is only primed again when
+    there is no cookie or the site rejects it.
+
+    Parameters:
+        page (str): The page name (e.g., 'teamtable.php').
+        params (dict): The query parameters.
+        headers (dict): Request headers.
+        prime_url (str): Page requested to get a session cookie when needed.
+
+    Returns:
+        bytes: The raw page.
+
+    Raises:
+        LookupError: In replay mode, if the page was never archived.
+        requests.exceptions.HTTPError: If the request returned an unsuccessful status code.
+    """
+    if is_replaying():
+        content = load_page(page, params)
+        if content is None:
+            raise LookupError(f"No archived page for {archive_key(page, params)}")
+        return content
+
+    client = get_client()
+    _ensure_nst_session(client, prime_url)
+
+    # Send a GET request to the URL with headers using the shared client
+    url = f"{NST_BASE_URL}/{page}"
+    response = client.get(url, params=params, headers=headers, timeout=NST_TIMEOUT)
+    if response.status_code in SESSION_REJECTED_STATUSES:
+        # The saved session expired: start a new one and try once more
+        with _session_lock:
+            _prime_nst_session(client, prime_url)
+        response = client.get(url, params=params, headers=headers, timeout=NST_TIMEOUT)
+    response.raise_for_status()  # Raises HTTPError for bad responses
+
+    if get_archive_mode() == 'record':
+        save_page(page, params, response.content)
+    return response.content
 
 def nst_on_ice_scraper(fromseason=None, thruseason=None, startdate='', enddate=None, last_n=None, stype=2, sit='5v5', stdoi='std', pos='S', rate='n', loc='B', lines='multi'):
     """
@@ -52,66 +206,8 @@ def nst_on_ice_scraper(fromseason=None, thruseason=None, startdate='', enddate=N
     if enddate is None:
         raise ValueError("enddate must be provided")
     
-    try:
-        end_season = get_season_for_date(enddate)
-    except ValueError:
-        # If enddate is between seasons, find the next season
-        end_date_obj = datetime.strptime(enddate, '%Y-%m-%d')
-        for season in sorted(NHL_SEASONS.keys()):
-            season_start = datetime.strptime(NHL_SEASONS[season]['start'], '%Y-%m-%d')
-            if end_date_obj < season_start:
-                end_season = season
-                break
-        else:
-            raise ValueError(f"Could not determine season for end date {enddate}")
-
-    if last_n is not None:
-        end_date_obj = datetime.strptime(enddate, '%Y-%m-%d')
-        season_start_obj = datetime.strptime(NHL_SEASONS[end_season]['start'], '%Y-%m-%d')
-        
-        # Calculate days since season start
-        days_since_season_start = (end_date_obj - season_start_obj).days
-        
-        if days_since_season_start < last_n:
-            # Need to go into previous season
-            prev_season = end_season - 10001  # e.g., 20242025 -> 20232024
-            if prev_season in NHL_SEASONS:
-                # Calculate remaining days to look back in previous season
-                remaining_days = last_n - days_since_season_start
-                prev_season_end = get_season_end_date(prev_season, stype)
-                prev_season_end_obj = datetime.strptime(prev_season_end, '%Y-%m-%d')
-                start_date_obj = prev_season_end_obj - timedelta(days=remaining_days)
-                startdate = start_date_obj.strftime('%Y-%m-%d')
-                start_season = prev_season
-            else:
-                # If no previous season data, just go back from season start
-                start_date_obj = season_start_obj - timedelta(days=last_n)
-                startdate = start_date_obj.strftime('%Y-%m-%d')
-                start_season = end_season
-        else:
-            # All dates within current season
-            start_date_obj = end_date_obj - timedelta(days=last_n)
-            startdate = start_date_obj.strftime('%Y-%m-%d')
-            start_season = end_season
-    else:
-        # If no last_n provided and startdate is empty, use end_season as start_season
-        if not startdate:
-            start_season = end_season
-        else:
-            try:
-                start_season = get_season_for_date(startdate)
-            except ValueError:
-                # If startdate falls between seasons, use the previous season
-                start_date_obj = datetime.strptime(startdate, '%Y-%m-%d')
-                for season in sorted(NHL_SEASONS.keys()):
-                    season_start = datetime.strptime(NHL_SEASONS[season]['start'], '%Y-%m-%d')
-                    if start_date_obj < season_start:
-                        start_season = season - 10001
-                        # Adjust startdate to use the end of the previous season based on stype
-                        startdate = get_season_end_date(start_season, stype)
-                        break
-                else:
-                    raise ValueError(f"Could not determine season for start date {startdate}")
+    # Resolve the date window and its seasons (see SeasonCalendar.resolve_window)
+    startdate, start_season, end_season = SEASON_CALENDAR.resolve_window(enddate, startdate, last_n, stype)
 
     # Set seasons if not provided
     if fromseason is None:
@@ -119,15 +215,14 @@ def nst_on_ice_scraper(fromseason=None, thruseason=None, startdate='', enddate=N
     if thruseason is None:
         thruseason = max(start_season, end_season)
 
-    url = (
-        f"https://www.naturalstattrick.com/playerteams.php?"
-        f"fromseason={fromseason}&thruseason={thruseason}&stype={stype}&sit={sit}"
-        f"&score=all&stdoi={stdoi}&rate={rate}&team=ALL&pos={pos}&loc={loc}&toi=0"
-        f"&gpfilt=gpdate&fd={startdate}&td={enddate}"
-        f"&tgp=410&lines={lines}&draftteam=ALL"
-    )
+    params = {
+        'fromseason': fromseason, 'thruseason': thruseason, 'stype': stype, 'sit': sit,
+        'score': 'all', 'stdoi': stdoi, 'rate': rate, 'team': 'ALL', 'pos': pos, 'loc': loc, 'toi': 0,
+        'gpfilt': 'gpdate', 'fd': startdate, 'td': enddate,
+        'tgp': 410, 'lines': lines, 'draftteam': 'ALL'
+    }
     
-    logger.info(f"NST Scraper URL: {url}")
+    logger.info(f"NST Scraper URL: {NST_BASE_URL}/playerteams.php?{urlencode(params)}")
 
     # Add browser-like headers
     headers = {
@@ -151,37 +246,16 @@ def nst_on_ice_scraper(fromseason=None, thruseason=None, startdate='', enddate=N
         'user-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/132.0.0.0 Safari/537.36'
     }
 
-    # First make a request to get a session cookie
-    session = requests.Session()
-    session.get('https://www.naturalstattrick.com/playerteams.php?stdoi=g')
-
     try:
-        # Send a GET request to the URL with headers using the session
-        response = session.get(url, headers=headers)
-        response.raise_for_status()  # Raises HTTPError for bad responses
-
-        # Wrap the response text in StringIO
-        html_content = StringIO(response.text)
-
-        # Parse all tables from the HTML content using 'lxml' parser
-        tables = pd.read_html(html_content, flavor='lxml')
-
-        if tables:
-            # Assuming the first table is the one you need
-            df = tables[0]
-            if 'Unnamed: 0' in df.columns:
-                df = df.drop(columns=['Unnamed: 0'])
-            df.columns = df.columns.str.lower().str.replace(' ', '_')
-            
-            # Convert team names using nst_to_nhl_tricode, split by comma and apply to each team
-            if 'team' in df.columns:
-                df['team'] = df['team'].apply(lambda x: ', '.join(nst_to_nhl_tricode(team.strip()) or team.strip() for team in str(x).split(',')))
-            
-            # Format TOI and TOI/GP columns
-            toi_columns = [col for col in df.columns if 'toi' in col.lower()]
-            for col in toi_columns:
-                # Convert time format (MM:SS) to decimal minutes
-                df[col] = df[col].apply(lambda x: float(x.split(':')[0]) + float(x.split(':')[1])/60 if ':' in str(x) else x).round(2)
+        # Fetch the page (or read it from the archive in replay mode)
+        content = _fetch_nst_page('playerteams.php', params, headers, f"{NST_BASE_URL}/playerteams.php?stdoi=g")
+
+        # Parse only the stats table (the first table on the page) into typed columns
+        df = parse_nst_table(content)
+
+        if df is not None:
+            # Lowercase headers, map NST team codes to NHL tri-codes and type the columns
+            df = NST_SCHEMAS.get(stdoi, SKATER_STD_SCHEMA).normalize(df)
             
             logger.info(f"Successfully scraped data: {df.shape[0]} rows, {df.shape[1]} columns")
             return df
@@ -222,66 +296,8 @@ def nst_team_on_ice_scraper(fromseason=None, thruseason=None, startdate='', endd
     if enddate is None:
         raise ValueError("enddate must be provided")
     
-    try:
-        end_season = get_season_for_date(enddate)
-    except ValueError:
-        # If enddate is between seasons, find the next season
-        end_date_obj = datetime.strptime(enddate, '%Y-%m-%d')
-        for season in sorted(NHL_SEASONS.keys()):
-            season_start = datetime.strptime(NHL_SEASONS[season]['start'], '%Y-%m-%d')
-            if end_date_obj < season_start:
-                end_season = season
-                break
-        else:
-            raise ValueError(f"Could not determine season for end date {enddate}")
-
-    if last_n is not None:
-        end_date_obj = datetime.strptime(enddate, '%Y-%m-%d')
-        season_start_obj = datetime.strptime(NHL_SEASONS[end_season]['start'], '%Y-%m-%d')
-        
-        # Calculate days since season start
-        days_since_season_start = (end_date_obj - season_start_obj).days
-        
-        if days_since_season_start < last_n:
-            # Need to go into previous season
-            prev_season = end_season - 10001  # e.g., 20242025 -> 20232024
-            if prev_season in NHL_SEASONS:
-                # Calculate remaining days to look back in previous season
-                remaining_days = last_n - days_since_season_start
-                prev_season_end = get_season_end_date(prev_season, stype)
-                prev_season_end_obj = datetime.strptime(prev_season_end, '%Y-%m-%d')
-                start_date_obj = prev_season_end_obj - timedelta(days=remaining_days)
-                startdate = start_date_obj.strftime('%Y-%m-%d')
-                start_season = prev_season
-            else:
-                # If no previous season data, just go back from season start
-                start_date_obj = season_start_obj - timedelta(days=last_n)
-                startdate = start_date_obj.strftime('%Y-%m-%d')
-                start_season = end_season
-        else:
-            # All dates within current season
-            start_date_obj = end_date_obj - timedelta(days=last_n)
-            startdate = start_date_obj.strftime('%Y-%m-%d')
-            start_season = end_season
-    else:
-        # If no last_n provided and startdate is empty, use end_season as start_season
-        if not startdate:
-            start_season = end_season
-        else:
-            try:
-                start_season = get_season_for_date(startdate)
-            except ValueError:
-                # If startdate falls between seasons, use the previous season
-                start_date_obj = datetime.strptime(startdate, '%Y-%m-%d')
-                for season in sorted(NHL_SEASONS.keys()):
-                    season_start = datetime.strptime(NHL_SEASONS[season]['start'], '%Y-%m-%d')
-                    if start_date_obj < season_start:
-                        start_season = season - 10001
-                        # Adjust startdate to use the end of the previous season based on stype
-                        startdate = get_season_end_date(start_season, stype)
-                        break
-                else:
-                    raise ValueError(f"Could not determine season for start date {startdate}")
+    # Resolve the date window and its seasons (see SeasonCalendar.resolve_window)
+    startdate, start_season, end_season = SEASON_CALENDAR.resolve_window(enddate, startdate, last_n, stype)
 
     # Set seasons if not provided
     if fromseason is None:
@@ -293,13 +309,12 @@ def nst_team_on_ice_scraper(fromseason=None, thruseason=None, startdate='', endd
     if startdate == enddate:
         fromseason = thruseason = end_season
 
-    url = (
-        f"https://www.naturalstattrick.com/teamtable.php?"
-        f"fromseason={fromseason}&thruseason={thruseason}&stype={stype}&sit={sit}"
-        f"&score=all&rate=n&team=all&loc={loc}"
-        f"&gpfilt=gpdate&fd={startdate}&td={enddate}"
-        f"&tgp=410"
-    )
+    params = {
+        'fromseason': fromseason, 'thruseason': thruseason, 'stype': stype, 'sit': sit,
+        'score': 'all', 'rate': 'n', 'team': 'all', 'loc': loc,
+        'gpfilt': 'gpdate', 'fd': startdate, 'td': enddate,
+        'tgp': 410
+    }
 
     # Add browser-like headers
     headers = {
@@ -323,33 +338,16 @@ def nst_team_on_ice_scraper(fromseason=None, thruseason=None, startdate='', endd
         'user-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/132.0.0.0 Safari/537.36'
     }
 
-    # First make a request to get a session cookie
-    session = requests.Session()
-    session.get('https://www.naturalstattrick.com/teamtable.php')
-
     try:
-        # Send a GET request to the URL with headers using the session
-        response = session.get(url, headers=headers)
-        response.raise_for_status()  # Raises HTTPError for bad responses
-
-        # Wrap the response text in StringIO
-        html_content = StringIO(response.text)
-
-        # Parse all tables from the HTML content using 'lxml' parser
-        tables = pd.read_html(html_content, flavor='lxml')
-
-        if tables:
-            # Assuming the first table is the one you need
-            df = tables[0]
-            if 'Unnamed: 0' in df.columns:
-                df = df.drop(columns=['Unnamed: 0'])
-            df.columns = df.columns.str.lower().str.replace(' ', '_')
-            
-            # Format TOI and TOI/GP columns
-            toi_columns = [col for col in df.columns if 'toi' in col.lower()]
-            for col in toi_columns:
-                # Convert time format (MM:SS) to decimal minutes
-                df[col] = df[col].apply(lambda x: float(x.split(':')[0]) + float(x.split(':')[1])/60 if ':' in str(x) else x).round(2)
+        # Fetch the page (or read it from the archive in replay mode)
+        content = _fetch_nst_page('teamtable.php', params, headers, f"{NST_BASE_URL}/teamtable.php")
+
+        # Parse only the stats table (the first table on the page) into typed columns
+        df = parse_nst_table(content)
+
+        if df is not None:
+            # Lowercase headers and type the columns
+            df = TEAM_SCHEMA.normalize(df)
                 
             return df
         else:
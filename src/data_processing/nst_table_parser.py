@@ -0,0 +1,176 @@
+import logging
+from io import BytesIO
+from typing import List, Optional, Union
+
+import numpy as np
+import pandas as pd
+from lxml import etree
+
+logger = logging.getLogger(__name__)
+
+# Cell values Natural Stat Trick uses for missing stats
+MISSING_VALUES = ('-', '')
+
+def _cell_text(cell) -> str:
+    """Returns the stripped text content of a table cell."""
+    if len(cell) == 0:
+        # Most stats cells hold plain text, which avoids walking the cell's subtree
+        return (cell.text or '').strip()
+    return ''.join(cell.itertext()).strip()
+
+def _iter_first_table_rows(data: bytes, table_index: int = 0):
+    """
+    Streams the rows of one table of an HTML page.
+
+    Parsing stops at the end of the requested table, so the rest of the page
+    (including any later tables) is never parsed. Processed rows are cleared
+    to keep memory bounded by a single row.
+
+    Parameters:
+        data (bytes): The HTML page.
+        table_index (int): Index of the table to read among the page's top-level tables.
+
+    Yields:
+        tuple: (is_header, cells) for each row, where cells is a list of cell texts.
+    """
+    tables_seen = 0
+    depth = 0
+    for event, element in etree.iterparse(BytesIO(data), events=('start', 'end'), tag=('table', 'tr'), html=True, recover=True):
+        tag = element.tag if isinstance(element.tag, str) else ''
+        if tag == 'table':
+            if event == 'start':
+                depth += 1
+                continue
+            depth -= 1
+            if depth == 0:
+                if tables_seen == table_index:
+                    return
+                tables_seen += 1
+                element.clear()
+            continue
+
+        if depth != 1 or tables_seen != table_index or event != 'end' or tag != 'tr':
+            continue
+
+        texts = []
+        is_header = True
+        for child in element:
+            if child.tag == 'td':
+                is_header = False
+            elif child.tag != 'th':
+                continue
+            texts.append(_cell_text(child))
+        yield is_header and bool(texts), texts
+        element.clear()
+
+def toi_to_minutes(values: np.ndarray) -> np.ndarray:
+    """
+    Converts MM:SS time-on-ice strings to decimal minutes.
+
+    Parameters:
+        values (np.ndarray): Array of strings such as '1234:56'. Missing values ('-' or '') become NaN.
+
+    Returns:
+        np.ndarray: float64 minutes rounded to two decimals.
+    """
+    parts = pd.Series(values, dtype=object).str.split(':', n=1, expand=True)
+    if parts.shape[1] < 2:
+        return pd.to_numeric(parts[0], errors='coerce').round(2).to_numpy(dtype=np.float64)
+    minutes = pd.to_numeric(parts[0], errors='coerce')
+    seconds = pd.to_numeric(parts[1], errors='coerce').fillna(0)
+    return (minutes + seconds / 60).round(2).to_numpy(dtype=np.float64)
+
+def _convert_column(name: str, values: List[str]):
+    """
+    Converts a column of cell texts to the narrowest fitting type.
+
+    TOI columns become decimal minutes. Other columns become int64 if every value is an
+    integer, float64 if every non-missing value is numeric (missing values become NaN),
+    and stay strings otherwise.
+
+    Parameters:
+        name (str): The column header.
+        values (List[str]): The cell texts.
+
+    Returns:
+        np.ndarray: The typed column.
+    """
+    arr = np.array(values, dtype=object)
+    missing = np.isin(arr, MISSING_VALUES)
+
+    if 'toi' in name.lower():
+        return toi_to_minutes(np.where(missing, None, arr))
+
+    present = arr[~missing]
+    if not missing.any():
+        try:
+            return present.astype(np.int64)
+        except (ValueError, OverflowError):
+            pass
+    try:
+        numbers = present.astype(np.float64)
+    except ValueError:
+        return arr
+    out = np.full(len(arr), np.nan, dtype=np.float64)
+    out[~missing] = numbers
+    return out
+
+def _unique_headers(cells: List[str]) -> List[str]:
+    """
+    Names blank headers 'Unnamed: <position>' and suffixes repeated headers with '.1', '.2', ...
+
+    Parameters:
+        cells (List[str]): The header cell texts.
+
+    Returns:
+        List[str]: The column names, as pd.read_html would name them.
+    """
+    header = []
+    seen = {}
+    for i, cell in enumerate(cells):
+        name = cell if cell else f"Unnamed: {i}"
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        header.append(name)
+    return header
+
+def parse_nst_table(html: Union[str, bytes], table_index: int = 0) -> Optional[pd.DataFrame]:
+    """
+    Parses one stats table of a Natural Stat Trick page into a typed DataFrame.
+
+    Unlike pd.read_html, only the requested table is parsed and cells are converted
+    directly into typed columns (see _convert_column), including TOI columns in
+    decimal minutes. Headers are kept as shown on the page; blank headers become
+    'Unnamed: <position>' like pd.read_html.
+
+    Parameters:
+        html (str or bytes): The HTML page.
+        table_index (int): Index of the table to parse. Defaults to 0, the stats table.
+
+    Returns:
+        Optional[pd.DataFrame]: The table, or None if the page has no such table.
+    """
+    data = html.encode('utf-8') if isinstance(html, str) else html
+
+    header = None
+    rows = []
+    for is_header, cells in _iter_first_table_rows(data, table_index):
+        if header is None and is_header:
+            header = _unique_headers(cells)
+        elif not is_header and cells:
+            rows.append(cells)
+
+    if header is None:
+        if not rows:
+            return None
+        header = list(range(len(rows[0])))
+
+    n_columns = len(header)
+    columns = list(zip(*[row[:n_columns] + [''] * (n_columns - len(row)) for row in rows])) if rows else [()] * n_columns
+    return pd.DataFrame({
+        name: _convert_column(str(name), list(values))
+        for name, values in zip(header, columns)
+    })
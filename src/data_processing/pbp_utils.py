@@ -1,10 +1,70 @@
+import json
+import os
+import tempfile
 import requests
-from requests.adapters import HTTPAdapter, Retry
 from datetime import datetime, timedelta
+from typing import Optional
+import numpy as np
 import pandas as pd
 
+from src.data_processing.api_cache import get_cached_json, FINAL_GAME_STATES, SETTLED_SCHEDULE_STATES
+from src.data_processing.http_client import get_client
+from src.data_processing.schedule_store import get_games
+from src.data_processing.utils import iter_as_completed
+
 API_URL = 'https://api-web.nhle.com/v1'
 
+# Maximum number of play-by-play requests in flight against the NHL API
+PBP_MAX_WORKERS = 8
+
+# Directory of the incrementally maintained play-by-play dataset (override with NHL_PBP_DIR)
+PBP_DATASET_DIR = os.getenv('NHL_PBP_DIR', os.path.join('..', 'data', 'pbp'))
+
+# Fixed play-by-play schema: column -> (section of the play JSON, key, kind).
+# 'int' columns become nullable Int32, 'float' float32, 'category' categorical
+# and 'clock' converts an MM:SS clock string to whole seconds (nullable Int32).
+PBP_SCHEMA = {
+    'gid': (None, None, 'int'),
+    'eventId': (None, 'eventId', 'int'),
+    'sortOrder': (None, 'sortOrder', 'int'),
+    'period_number': ('periodDescriptor', 'number', 'int'),
+    'period_type': ('periodDescriptor', 'periodType', 'category'),
+    'maxRegulationPeriods': ('periodDescriptor', 'maxRegulationPeriods', 'int'),
+    'secondsInPeriod': (None, 'timeInPeriod', 'clock'),
+    'secondsRemaining': (None, 'timeRemaining', 'clock'),
+    'situationCode': (None, 'situationCode', 'category'),
+    'homeTeamDefendingSide': (None, 'homeTeamDefendingSide', 'category'),
+    'typeCode': (None, 'typeCode', 'int'),
+    'typeDescKey': (None, 'typeDescKey', 'category'),
+    'details_eventOwnerTeamId': ('details', 'eventOwnerTeamId', 'int'),
+    'details_xCoord': ('details', 'xCoord', 'float'),
+    'details_yCoord': ('details', 'yCoord', 'float'),
+    'details_zoneCode': ('details', 'zoneCode', 'category'),
+    'details_shotType': ('details', 'shotType', 'category'),
+    'details_reason': ('details', 'reason', 'category'),
+    'details_shootingPlayerId': ('details', 'shootingPlayerId', 'int'),
+    'details_scoringPlayerId': ('details', 'scoringPlayerId', 'int'),
+    'details_assist1PlayerId': ('details', 'assist1PlayerId', 'int'),
+    'details_assist2PlayerId': ('details', 'assist2PlayerId', 'int'),
+    'details_goalieInNetId': ('details', 'goalieInNetId', 'int'),
+    'details_blockingPlayerId': ('details', 'blockingPlayerId', 'int'),
+    'details_hittingPlayerId': ('details', 'hittingPlayerId', 'int'),
+    'details_hitteePlayerId': ('details', 'hitteePlayerId', 'int'),
+    'details_playerId': ('details', 'playerId', 'int'),
+    'details_winningPlayerId': ('details', 'winningPlayerId', 'int'),
+    'details_losingPlayerId': ('details', 'losingPlayerId', 'int'),
+    'details_committedByPlayerId': ('details', 'committedByPlayerId', 'int'),
+    'details_drawnByPlayerId': ('details', 'drawnByPlayerId', 'int'),
+    'details_servedByPlayerId': ('details', 'servedByPlayerId', 'int'),
+    'details_typeCode': ('details', 'typeCode', 'category'),
+    'details_descKey': ('details', 'descKey', 'category'),
+    'details_duration': ('details', 'duration', 'int'),
+    'details_awayScore': ('details', 'awayScore', 'int'),
+    'details_homeScore': ('details', 'homeScore', 'int'),
+    'details_awaySOG': ('details', 'awaySOG', 'int'),
+    'details_homeSOG': ('details', 'homeSOG', 'int'),
+}
+
 def get_matchup_games(start_date, end_date):
     """
     Retrieves NHL game matchups for a given date range from the NHL API.
@@ -23,11 +83,11 @@ def get_matchup_games(start_date, end_date):
 
     Note:
         The function fetches one week of games starting from start_date and filters
-        games up to end_date. For multi-week ranges, use retrieve_schedule().
+        games up to end_date. For multi-week ranges, use retrieve_schedule(), which
+        answers from the local schedule store.
         Games with gameScheduleState 'PPD' (postponed) are filtered out.
     """
-    r = requests.get(url=API_URL + '/schedule/' + str(start_date))
-    data = r.json()
+    data = get_cached_json(API_URL + '/schedule/' + str(start_date))
 
     end_date_dt = datetime.strptime(end_date, '%Y-%m-%d')
     matchup_games = {'next_start_date': '', 'game_ids': {'id': [], 'date': [], 'game_start_time': []}}
@@ -55,101 +115,270 @@ def get_matchup_games(start_date, end_date):
     return matchup_games
 
 def retrieve_schedule(start_date_str, end_date_str):
+    """
+    Retrieves the regular season games within a date range from the local schedule store.
+
+    Parameters:
+        start_date_str (str): The start date in 'YYYY-MM-DD' format.
+        end_date_str (str): The end date in 'YYYY-MM-DD' format.
+
+    Returns:
+        dict: A dictionary with two lists, 'game_ids' and 'game_dates', ordered by date.
+              Postponed games are excluded.
+    """
     all_game_ids = {'game_ids': [], 'game_dates': []}
-    temp_week = get_matchup_games(start_date_str, end_date_str)
 
-    all_game_ids['game_ids'].extend(temp_week['game_ids']['id'])
-    all_game_ids['game_dates'].extend(temp_week['game_ids']['date'])
+    for game in get_games(start_date_str, end_date_str):
+        if game['gameScheduleState'] == 'PPD' or game['gameType'] != 2:
+            continue
+        all_game_ids['game_ids'].append(game['id'])
+        all_game_ids['game_dates'].append(game['gameDate'])
 
-    end_date_dt = datetime.strptime(end_date_str, '%Y-%m-%d')
+    return all_game_ids
 
-    while True:
-        temp_next_start = datetime.strptime(temp_week['next_start_date'], '%Y-%m-%d')
+def _fetch_game_plays(game) -> Optional[list]:
+    """
+    Fetches the raw list of plays for a single game.
 
-        if temp_next_start <= end_date_dt:
-            temp_start = temp_week['next_start_date']
-            temp_week = get_matchup_games(temp_start, end_date_str)
+    Responses are served from the on-disk API cache when available.
 
-            game_ids = temp_week['game_ids']['id']
-            game_dates = temp_week['game_ids']['date']
+    Parameters:
+        game: The game ID.
 
-            for game_id, game_date in zip(game_ids, game_dates):
-                game_date_dt = datetime.strptime(game_date, '%Y-%m-%d').date()
-                if game_date_dt <= end_date_dt.date():
-                    all_game_ids['game_ids'].append(game_id)
-                    all_game_ids['game_dates'].append(game_date)
-                else:
-                    # Instead of breaking here, move to the next week
-                    break
-        else:
-            break
+    Returns:
+        Optional[list]: The 'plays' array of the play-by-play response, or None if the request failed.
+    """
+    def fetch(url):
+        return get_client().get_json(url, headers={"Content-Type": "application/json"})
 
-    return all_game_ids
+    try:
+        data = get_cached_json(f"{API_URL}/gamecenter/{game}/play-by-play", fetch=fetch)
+        return data.get('plays', [])
+    except requests.exceptions.RequestException as e:
+        print(f"Failed to fetch data for game {game}: {e}")
+        return None
+
+def iter_game_plays(game_list, max_workers: int = PBP_MAX_WORKERS):
+    """
+    Fetches play-by-play data for a list of games concurrently, yielding each game as it finishes.
+
+    Requests go through the shared HTTP client (keep-alive pool, retries, timeout and
+    the NHL API host limit), with at most max_workers requests submitted at once.
+
+    Parameters:
+        game_list (dict): A dictionary containing game IDs and dates.
+        max_workers (int): Maximum number of concurrent requests. Defaults to PBP_MAX_WORKERS.
+
+    Yields:
+        tuple: (game_id, plays) in completion order, where plays is the raw 'plays' array.
+               Games that fail after all retries are skipped.
+    """
+    for game, plays in iter_as_completed(_fetch_game_plays, game_list['game_ids'], max_workers=max_workers):
+        if plays is not None:
+            yield game, plays
+
+def _flatten_plays(game, plays: list) -> list:
+    """
+    Converts the raw plays of a game into flat play-by-play records.
+
+    Parameters:
+        game: The game ID.
+        plays (list): The raw 'plays' array from the play-by-play response.
+
+    Returns:
+        list: A list of play-by-play records.
+    """
+    play_records = []
+    for play in plays:
+        play_record = {
+            'gid': str(game),
+            'eventId': play.get('eventId'),
+            'sortOrder': play.get('sortOrder'),
+            'period_number': play.get('periodDescriptor', {}).get('number'),
+            'period_type': play.get('periodDescriptor', {}).get('periodType'),
+            'maxRegulationPeriods': play.get('periodDescriptor', {}).get('maxRegulationPeriods'),
+            'timeInPeriod': play.get('timeInPeriod'),
+            'timeRemaining': play.get('timeRemaining'),
+            'situationCode': play.get('situationCode'),
+            'homeTeamDefendingSide': play.get('homeTeamDefendingSide'),
+            'typeCode': play.get('typeCode'),
+            'typeDescKey': play.get('typeDescKey')
+        }
+
+        details = play.get('details', {})
+        for key, value in details.items():
+            play_record[f'details_{key}'] = value
+
+        play_records.append(play_record)
+    return play_records
 
-def get_livedata_from_game(game_list):
+def get_livedata_from_game(game_list, max_workers: int = PBP_MAX_WORKERS):
     """
     Fetches live play-by-play data for a list of games with retry mechanism.
 
+    Games are downloaded concurrently (see iter_game_plays) and the records are
+    returned in the order of game_list. Pass max_workers=1 to fetch sequentially.
+
     Parameters:
         game_list (dict): A dictionary containing game IDs and dates.
+        max_workers (int): Maximum number of concurrent requests. Defaults to PBP_MAX_WORKERS.
 
     Returns:
         list: A list of play-by-play records.
     """
+    plays_by_game = {
+        game: _flatten_plays(game, plays)
+        for game, plays in iter_game_plays(game_list, max_workers=max_workers)
+    }
+
     all_plays = []
-    
-    # Set up a session with retry strategy
-    session = requests.Session()
-    retry = Retry(
-        total=5,  # Total number of retries
-        backoff_factor=1,  # Exponential backoff factor (e.g., 1, 2, 4, 8, 16 seconds)
-        status_forcelist=[500, 502, 503, 504, 522, 524],  # HTTP status codes to retry
-        allowed_methods=["GET"]  # Methods to retry
-    )
-    adapter = HTTPAdapter(max_retries=retry)
-    session.mount("https://", adapter)
-    session.mount("http://", adapter)
-    
     for game in game_list['game_ids']:
-        try:
-            response = session.get(
-                f"{API_URL}/gamecenter/{game}/play-by-play",
-                headers={"Content-Type": "application/json"},
-                timeout=10  # Timeout after 10 seconds
-            )
-            response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
-            data = response.json()
-            temp_game_plays = data.get('plays', [])
-
-            for play in temp_game_plays:
-                play_record = {
-                    'gid': str(game),
-                    'eventId': play.get('eventId'),
-                    'sortOrder': play.get('sortOrder'),
-                    'period_number': play.get('periodDescriptor', {}).get('number'),
-                    'period_type': play.get('periodDescriptor', {}).get('periodType'),
-                    'maxRegulationPeriods': play.get('periodDescriptor', {}).get('maxRegulationPeriods'),
-                    'timeInPeriod': play.get('timeInPeriod'),
-                    'timeRemaining': play.get('timeRemaining'),
-                    'situationCode': play.get('situationCode'),
-                    'homeTeamDefendingSide': play.get('homeTeamDefendingSide'),
-                    'typeCode': play.get('typeCode'),
-                    'typeDescKey': play.get('typeDescKey')
-                }
-
-                details = play.get('details', {})
-                for key, value in details.items():
-                    play_record[f'details_{key}'] = value
-
-                all_plays.append(play_record)
-        
-        except requests.exceptions.RequestException as e:
-            print(f"Failed to fetch data for game {game}: {e}")
-            # Optionally, log the error or store it for later analysis
-
-    session.close()
+        all_plays.extend(plays_by_game.get(game, []))
     return all_plays
 
+def _clock_to_seconds(clock) -> Optional[int]:
+    """
+    Converts an MM:SS game clock string to whole seconds.
+
+    Parameters:
+        clock (str): Clock string such as '12:34'.
+
+    Returns:
+        Optional[int]: The number of seconds, or None if the value is missing or malformed.
+    """
+    try:
+        minutes, seconds = clock.split(':')
+        return int(minutes) * 60 + int(seconds)
+    except (AttributeError, ValueError):
+        return None
+
+class PlayByPlayBuilder:
+    """
+    Accumulates play-by-play data into typed columns following PBP_SCHEMA.
+
+    Each game is written into column buffers preallocated to the game's number of
+    plays, so the output has the same columns and dtypes regardless of which games
+    or event types were seen. Details fields outside the schema are dropped.
+
+    Example:
+        builder = PlayByPlayBuilder()
+        for game, plays in iter_game_plays(schedule):
+            builder.append_game(game, plays)
+        df = builder.to_frame()
+    """
+
+    def __init__(self):
+        self._chunks = {column: [] for column in PBP_SCHEMA}
+        self._masks = {column: [] for column, (_, _, kind) in PBP_SCHEMA.items() if kind in ('int', 'clock')}
+        self.n_games = 0
+        self.n_plays = 0
+
+    def append_game(self, game, plays: list) -> None:
+        """
+        Appends the raw plays of a single game.
+
+        Parameters:
+            game: The game ID.
+            plays (list): The raw 'plays' array from the play-by-play response.
+        """
+        n = len(plays)
+        values = {}
+        masks = {}
+        for column, (_, _, kind) in PBP_SCHEMA.items():
+            if kind in ('int', 'clock'):
+                values[column] = np.zeros(n, dtype=np.int32)
+                masks[column] = np.ones(n, dtype=bool)
+            elif kind == 'float':
+                values[column] = np.full(n, np.nan, dtype=np.float32)
+            else:
+                values[column] = np.empty(n, dtype=object)
+
+        values['gid'][:] = int(game)
+        masks['gid'][:] = False
+
+        for i, play in enumerate(plays):
+            sections = {
+                None: play,
+                'periodDescriptor': play.get('periodDescriptor') or {},
+                'details': play.get('details') or {}
+            }
+            for column, (section, key, kind) in PBP_SCHEMA.items():
+                if key is None:
+                    continue
+                value = sections[section].get(key)
+                if value is None:
+                    continue
+                if kind == 'clock':
+                    value = _clock_to_seconds(value)
+                    if value is None:
+                        continue
+                if kind in ('int', 'clock'):
+                    values[column][i] = value
+                    masks[column][i] = False
+                else:
+                    values[column][i] = value
+
+        for column in PBP_SCHEMA:
+            self._chunks[column].append(values[column])
+            if column in masks:
+                self._masks[column].append(masks[column])
+
+        self.n_games += 1
+        self.n_plays += n
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Builds a DataFrame from the accumulated games.
+
+        Returns:
+            pd.DataFrame: One row per play with the columns and dtypes of PBP_SCHEMA.
+        """
+        data = {}
+        for column, (_, _, kind) in PBP_SCHEMA.items():
+            chunks = self._chunks[column]
+            if kind in ('int', 'clock'):
+                dtype = np.int32
+                data[column] = pd.arrays.IntegerArray(
+                    np.concatenate(chunks) if chunks else np.empty(0, dtype=dtype),
+                    np.concatenate(self._masks[column]) if chunks else np.empty(0, dtype=bool)
+                )
+            elif kind == 'float':
+                data[column] = np.concatenate(chunks) if chunks else np.empty(0, dtype=np.float32)
+            else:
+                data[column] = pd.Categorical(np.concatenate(chunks) if chunks else np.empty(0, dtype=object))
+        return pd.DataFrame(data)
+
+    def to_arrow(self):
+        """
+        Builds a pyarrow Table from the accumulated games.
+
+        Requires the optional pyarrow package.
+
+        Returns:
+            pyarrow.Table: One row per play with the PBP_SCHEMA columns (categoricals as dictionary arrays).
+        """
+        import pyarrow as pa
+        return pa.Table.from_pandas(self.to_frame(), preserve_index=False)
+
+def get_livedata_frame(game_list, max_workers: int = PBP_MAX_WORKERS) -> pd.DataFrame:
+    """
+    Fetches play-by-play data for a list of games into a typed, schema-stable DataFrame.
+
+    Parameters:
+        game_list (dict): A dictionary containing game IDs and dates.
+        max_workers (int): Maximum number of concurrent requests. Defaults to PBP_MAX_WORKERS.
+
+    Returns:
+        pd.DataFrame: One row per play with the columns and dtypes of PBP_SCHEMA,
+                      ordered by game and sortOrder.
+    """
+    builder = PlayByPlayBuilder()
+    for game, plays in iter_game_plays(game_list, max_workers=max_workers):
+        builder.append_game(game, plays)
+
+    df = builder.to_frame()
+    return df.sort_values(['gid', 'sortOrder'], kind='stable', ignore_index=True)
+
 def scrape_month_playbyplay(year: int, month: int) -> pd.DataFrame:
     """
     Scrapes all play-by-play data for the specified month.
@@ -159,7 +388,8 @@ def scrape_month_playbyplay(year: int, month: int) -> pd.DataFrame:
         month (int): The month to scrape (1-12).
 
     Returns:
-        pd.DataFrame: A DataFrame containing all play-by-play data for the month.
+        pd.DataFrame: A DataFrame containing all play-by-play data for the month,
+                      with the columns and dtypes of PBP_SCHEMA.
     """
     # Define the start and end dates for the month
     start_date = datetime(year, month, 1)
@@ -177,10 +407,228 @@ def scrape_month_playbyplay(year: int, month: int) -> pd.DataFrame:
     # Retrieve the schedule for the specified date range
     schedule = retrieve_schedule(start_date_str, end_date_str)
     
-    # Fetch play-by-play data for all games in the schedule
-    playbyplay_data = get_livedata_from_game(schedule)
-    
-    # Convert the play-by-play data to a DataFrame
-    df_pbp = pd.DataFrame(playbyplay_data)
+    # Fetch play-by-play data for all games in the schedule into typed columns
+    df_pbp = get_livedata_frame(schedule)
     
-    return df_pbp
\ No newline at end of file
+    return df_pbp
+
+def _pbp_game_path(dataset_dir: str, game) -> str:
+    """
+    Returns the path of a game's file in a play-by-play dataset.
+
+    Parameters:
+        dataset_dir (str): The dataset directory.
+        game: The game ID.
+
+    Returns:
+        str: Path of the gzip-compressed pickle holding the game's plays.
+    """
+    return os.path.join(dataset_dir, 'games', f"{game}.pkl.gz")
+
+def _write_pbp_game(dataset_dir: str, game, plays: list) -> None:
+    """
+    Writes the plays of one game to the dataset atomically.
+
+    Parameters:
+        dataset_dir (str): The dataset directory.
+        game: The game ID.
+        plays (list): The raw 'plays' array from the play-by-play response.
+    """
+    builder = PlayByPlayBuilder()
+    builder.append_game(game, plays)
+    df = builder.to_frame().sort_values('sortOrder', kind='stable', ignore_index=True)
+
+    path = _pbp_game_path(dataset_dir, game)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    os.close(fd)
+    try:
+        df.to_pickle(tmp_path, compression='gzip')
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def _read_pbp_manifest(dataset_dir: str) -> dict:
+    """
+    Returns the game dates recorded for a play-by-play dataset.
+
+    Parameters:
+        dataset_dir (str): The dataset directory.
+
+    Returns:
+        dict: Game ID (as a string) -> game date in 'YYYY-MM-DD' format.
+    """
+    path = os.path.join(dataset_dir, 'manifest.json')
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def _write_pbp_manifest(dataset_dir: str, manifest: dict) -> None:
+    """
+    Writes the game dates of a play-by-play dataset atomically.
+
+    Parameters:
+        dataset_dir (str): The dataset directory.
+        manifest (dict): Game ID (as a string) -> game date in 'YYYY-MM-DD' format.
+    """
+    os.makedirs(dataset_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=dataset_dir, suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(manifest, f, sort_keys=True)
+    os.replace(tmp_path, os.path.join(dataset_dir, 'manifest.json'))
+
+def read_pbp_watermark(dataset_dir: str = PBP_DATASET_DIR) -> Optional[str]:
+    """
+    Returns the date through which every game of a play-by-play dataset has been ingested.
+
+    Parameters:
+        dataset_dir (str): The dataset directory. Defaults to PBP_DATASET_DIR.
+
+    Returns:
+        Optional[str]: Date in 'YYYY-MM-DD' format, or None for a new dataset.
+    """
+    path = os.path.join(dataset_dir, 'watermark.json')
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        return json.load(f).get('complete_through')
+
+def _write_pbp_watermark(dataset_dir: str, complete_through: str) -> None:
+    """
+    Writes the watermark of a play-by-play dataset atomically.
+
+    Parameters:
+        dataset_dir (str): The dataset directory.
+        complete_through (str): Date in 'YYYY-MM-DD' format.
+    """
+    os.makedirs(dataset_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=dataset_dir, suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump({'complete_through': complete_through, 'updated_at': datetime.now().isoformat()}, f)
+    os.replace(tmp_path, os.path.join(dataset_dir, 'watermark.json'))
+
+def update_pbp_dataset(start_date: Optional[str] = None, end_date: Optional[str] = None,
+                       dataset_dir: str = PBP_DATASET_DIR, max_workers: int = PBP_MAX_WORKERS) -> dict:
+    """
+    Incrementally adds newly completed regular season games to a stored play-by-play dataset.
+
+    Only final games after the dataset's watermark are fetched. Each game is written to its
+    own file before the watermark moves, and games already on disk are skipped, so a run that
+    crashed can simply be repeated: it resumes without duplicates or gaps. The watermark only
+    advances up to the day before the first game that is not final yet or failed to download.
+
+    Parameters:
+        start_date (str, optional): First date to ingest in 'YYYY-MM-DD' format. Defaults to the
+                                    day after the watermark; required for a new dataset.
+        end_date (str, optional): Last date to ingest in 'YYYY-MM-DD' format. Defaults to today.
+        dataset_dir (str): The dataset directory. Defaults to PBP_DATASET_DIR.
+        max_workers (int): Maximum number of concurrent requests. Defaults to PBP_MAX_WORKERS.
+
+    Returns:
+        dict: 'games_added' (number of games written) and 'complete_through' (the new watermark).
+
+    Example:
+        update_pbp_dataset(start_date='2024-10-04')  # first run
+        update_pbp_dataset()                          # daily runs
+        df = load_pbp_dataset()
+    """
+    watermark = read_pbp_watermark(dataset_dir)
+    if start_date is None:
+        if watermark is None:
+            raise ValueError("start_date is required for a new play-by-play dataset")
+        start_date = (datetime.strptime(watermark, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
+    if end_date is None:
+        end_date = datetime.now().strftime('%Y-%m-%d')
+    if start_date > end_date:
+        return {'games_added': 0, 'complete_through': watermark}
+
+    games = [
+        game for game in get_games(start_date, end_date)
+        if game['gameType'] == 2 and game['gameScheduleState'] not in SETTLED_SCHEDULE_STATES
+    ]
+    to_fetch = [
+        game['id'] for game in games
+        if game['gameState'] in FINAL_GAME_STATES and not os.path.exists(_pbp_game_path(dataset_dir, game['id']))
+    ]
+    print(f"Ingesting play-by-play data for {len(to_fetch)} new games from {start_date} to {end_date}")
+
+    games_added = 0
+    try:
+        for game, plays in iter_game_plays({'game_ids': to_fetch}, max_workers=max_workers):
+            _write_pbp_game(dataset_dir, game, plays)
+            games_added += 1
+    finally:
+        # Record the date of every stored game of the range, including games written by a run that crashed
+        manifest = _read_pbp_manifest(dataset_dir)
+        stored = {
+            str(game['id']): game['gameDate'] for game in games
+            if os.path.exists(_pbp_game_path(dataset_dir, game['id']))
+        }
+        if any(manifest.get(game) != date for game, date in stored.items()):
+            _write_pbp_manifest(dataset_dir, {**manifest, **stored})
+
+    pending = [
+        game['gameDate'] for game in games
+        if game['gameState'] not in FINAL_GAME_STATES or not os.path.exists(_pbp_game_path(dataset_dir, game['id']))
+    ]
+    if pending:
+        complete_through = (datetime.strptime(min(pending), '%Y-%m-%d') - timedelta(days=1)).strftime('%Y-%m-%d')
+    else:
+        complete_through = end_date
+
+    if watermark is None or complete_through > watermark:
+        _write_pbp_watermark(dataset_dir, complete_through)
+    else:
+        complete_through = watermark
+
+    return {'games_added': games_added, 'complete_through': complete_through}
+
+def load_pbp_dataset(start_date: Optional[str] = None, end_date: Optional[str] = None,
+                     dataset_dir: str = PBP_DATASET_DIR) -> pd.DataFrame:
+    """
+    Loads a stored play-by-play dataset.
+
+    Parameters:
+        start_date (str, optional): First game date to load in 'YYYY-MM-DD' format.
+        end_date (str, optional): Last game date to load in 'YYYY-MM-DD' format.
+                                  If both dates are omitted, every stored game is loaded.
+                                  Games are selected by the dates update_pbp_dataset records
+                                  in the dataset's manifest.json.
+        dataset_dir (str): The dataset directory. Defaults to PBP_DATASET_DIR.
+
+    Returns:
+        pd.DataFrame: One row per play with the columns and dtypes of PBP_SCHEMA,
+                      ordered by game and sortOrder.
+    """
+    games_dir = os.path.join(dataset_dir, 'games')
+    stored = [
+        name[:-len('.pkl.gz')]
+        for name in (os.listdir(games_dir) if os.path.isdir(games_dir) else [])
+        if name.endswith('.pkl.gz')
+    ]
+    if start_date is not None or end_date is not None:
+        first, last = start_date or '0000-01-01', end_date or '9999-12-31'
+        manifest = _read_pbp_manifest(dataset_dir)
+
+        # Games stored before dates were recorded: look up the schedule of their seasons only
+        # (the first four digits of a game ID are the year the season starts)
+        for year in sorted({int(game[:4]) for game in stored if game not in manifest}):
+            season_first, season_last = max(first, f"{year}-07-01"), min(last, f"{year + 1}-06-30")
+            if season_first <= season_last:
+                manifest = {**manifest, **{str(game['id']): game['gameDate'] for game in get_games(season_first, season_last)}}
+        stored = [game for game in stored if first <= manifest.get(game, '') <= last]
+    paths = [_pbp_game_path(dataset_dir, game) for game in stored]
+
+    if not paths:
+        return PlayByPlayBuilder().to_frame()
+
+    df = pd.concat([pd.read_pickle(path, compression='gzip') for path in paths], ignore_index=True)
+
+    # Categories differ between games, so restore the categorical dtypes after concatenation
+    for column, (_, _, kind) in PBP_SCHEMA.items():
+        if kind == 'category':
+            df[column] = df[column].astype('category')
+    return df.sort_values(['gid', 'sortOrder'], kind='stable', ignore_index=True)
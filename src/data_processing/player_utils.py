@@ -1,7 +1,9 @@
 import logging
-import requests
 from typing import Optional, Dict, Any
 
+from src.data_processing.api_cache import get_cached_json
+from src.data_processing.http_client import get_client
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -20,14 +22,18 @@ def fetch_player_data(player_id: int) -> Optional[Dict[str, Any]]:
     """
     url = f"{API_URL}/v1/player/{player_id}/landing"
     
-    try:
-        # Fetch player data from the NHL API
-        response = requests.get(url)
+    def fetch(url):
+        response = get_client().get(url)
         if response.status_code != 200:
+            return None
+        return response.json()
+
+    try:
+        # Fetch player data from the NHL API (or the on-disk API cache)
+        player_json = get_cached_json(url, fetch=fetch)
+        if player_json is None:
             logger.error(f"Failed to fetch data for player_id {player_id}")
             return None
-        
-        player_json = response.json()
 
         # Process and return the player information
         return {
@@ -0,0 +1,347 @@
+import json
+import logging
+import os
+import tempfile
+import time
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+from src.data_processing.api_cache import get_cached_json, FINAL_GAME_STATES, SETTLED_SCHEDULE_STATES
+from src.data_processing.season_utils import SEASON_CALENDAR
+
+logger = logging.getLogger(__name__)
+
+API_URL = 'https://api-web.nhle.com/v1'
+
+# Directory holding one schedule file per season (override with NHL_SCHEDULE_DIR)
+SCHEDULE_DIR = os.getenv('NHL_SCHEDULE_DIR', os.path.join('..', 'data', 'schedules'))
+
+# Minimum number of seconds between refreshes of a season that still has unplayed games
+REFRESH_INTERVAL = 300
+
+# Days before the regular season start from which preseason games are collected
+PRESEASON_LEAD_DAYS = 35
+
+# In-memory stores by season
+_stores: Dict[int, 'SeasonSchedule'] = {}
+
+# Walked date range of each known season ('YYYY-MM-DD' strings, in season order), computed once
+_WALK_STARTS = [(start - timedelta(days=PRESEASON_LEAD_DAYS)).isoformat() for start in SEASON_CALENDAR.starts]
+_WALK_ENDS = [end.isoformat() for end in SEASON_CALENDAR.playoff_ends]
+_WALK_BOUNDS = dict(zip(SEASON_CALENDAR.season_ids, zip(_WALK_STARTS, _WALK_ENDS)))
+
+def season_for_date(date_str: str) -> int:
+    """
+    Returns the season whose schedule covers a date.
+
+    Known seasons use the boundaries of SEASON_CALENDAR (including preseason);
+    other dates fall in the season starting in the most recent July.
+
+    Parameters:
+        date_str (str): Date in 'YYYY-MM-DD' format.
+
+    Returns:
+        int: Season in YYYYYYYY format (e.g., 20242025).
+    """
+    i = bisect_right(_WALK_STARTS, date_str) - 1
+    if i >= 0 and date_str <= _WALK_ENDS[i]:
+        return SEASON_CALENDAR.season_ids[i]
+    year = int(date_str[:4]) if int(date_str[5:7]) >= 7 else int(date_str[:4]) - 1
+    return year * 10000 + year + 1
+
+def _season_bounds(season: int) -> tuple:
+    """
+    Returns the date range walked to collect a season's schedule.
+
+    Parameters:
+        season (int): Season in YYYYYYYY format.
+
+    Returns:
+        tuple: (first_date, last_date) as 'YYYY-MM-DD' strings.
+    """
+    if season in _WALK_BOUNDS:
+        return _WALK_BOUNDS[season]
+    start_year = season // 10000
+    return f"{start_year}-09-01", f"{start_year + 1}-06-30"
+
+def _game_record(game_date: str, game: dict) -> dict:
+    """
+    Extracts the stored fields of a game from a schedule response.
+
+    Parameters:
+        game_date (str): The local date the game is listed under.
+        game (dict): The game entry from the schedule response.
+
+    Returns:
+        dict: The game record kept by the store.
+    """
+    return {
+        'id': game['id'],
+        'season': game.get('season'),
+        'gameType': game.get('gameType'),
+        'gameDate': game_date,
+        'startTimeUTC': game.get('startTimeUTC'),
+        'gameState': game.get('gameState'),
+        'gameScheduleState': game.get('gameScheduleState'),
+        'homeTeam': game.get('homeTeam', {}).get('abbrev'),
+        'awayTeam': game.get('awayTeam', {}).get('abbrev'),
+    }
+
+class SeasonSchedule:
+    """
+    All games of one NHL season, indexed by date, team and game id.
+
+    The schedule is fetched once by walking the weekly /schedule endpoint, persisted
+    to SCHEDULE_DIR and refreshed incrementally: only weeks from the first game that
+    is not yet final onward are requested again.
+
+    Attributes:
+        season (int): Season in YYYYYYYY format.
+        complete_through (Optional[str]): Last date up to which every game is final.
+        refreshed_at (float): Unix time of the last refresh.
+    """
+
+    def __init__(self, season: int, games: Optional[List[dict]] = None,
+                 complete_through: Optional[str] = None, refreshed_at: float = 0.0):
+        self.season = season
+        self.complete_through = complete_through
+        self.refreshed_at = refreshed_at
+        self._by_id = {game['id']: game for game in games or []}
+        self._build_indexes()
+
+    def _build_indexes(self) -> None:
+        """Rebuilds the date and team indexes from the games by id."""
+        games = sorted(self._by_id.values(), key=lambda g: (g['gameDate'], g['startTimeUTC'] or '', g['id']))
+        self._by_date = {}
+        self._by_team = {}
+        for game in games:
+            self._by_date.setdefault(game['gameDate'], []).append(game)
+            for team in (game['homeTeam'], game['awayTeam']):
+                self._by_team.setdefault(team, []).append(game)
+        self._dates = sorted(self._by_date)
+        self._team_dates = {team: [g['gameDate'] for g in team_games] for team, team_games in self._by_team.items()}
+
+    @property
+    def path(self) -> str:
+        """Path of the persisted schedule file."""
+        return os.path.join(SCHEDULE_DIR, f"{self.season}.json")
+
+    @property
+    def is_complete(self) -> bool:
+        """True once every game of the season is final."""
+        return self.complete_through is not None and self.complete_through >= _season_bounds(self.season)[1]
+
+    def get_game(self, game_id: int) -> Optional[dict]:
+        """
+        Returns a game by id.
+
+        Parameters:
+            game_id (int): The game ID.
+
+        Returns:
+            Optional[dict]: The game record, or None if the game is not in this season.
+        """
+        return self._by_id.get(game_id)
+
+    def games_on(self, date_str: str) -> List[dict]:
+        """
+        Returns the games listed on a date, ordered by start time.
+
+        Parameters:
+            date_str (str): Date in 'YYYY-MM-DD' format.
+
+        Returns:
+            List[dict]: Game records.
+        """
+        return list(self._by_date.get(date_str, []))
+
+    def games_between(self, start_date: str, end_date: str) -> List[dict]:
+        """
+        Returns the games between two dates (inclusive), ordered by date and start time.
+
+        Parameters:
+            start_date (str): Start date in 'YYYY-MM-DD' format.
+            end_date (str): End date in 'YYYY-MM-DD' format.
+
+        Returns:
+            List[dict]: Game records.
+        """
+        lo = bisect_left(self._dates, start_date)
+        hi = bisect_right(self._dates, end_date)
+        return [game for d in self._dates[lo:hi] for game in self._by_date[d]]
+
+    def team_games(self, team: str, start_date: Optional[str] = None, end_date: Optional[str] = None) -> List[dict]:
+        """
+        Returns a team's games, optionally limited to a date range (inclusive), ordered by date.
+
+        Parameters:
+            team (str): Three-letter team code (e.g., 'TOR').
+            start_date (str, optional): Start date in 'YYYY-MM-DD' format.
+            end_date (str, optional): End date in 'YYYY-MM-DD' format.
+
+        Returns:
+            List[dict]: Game records.
+        """
+        games = self._by_team.get(team, [])
+        dates = self._team_dates.get(team, [])
+        lo = bisect_left(dates, start_date) if start_date else 0
+        hi = bisect_right(dates, end_date) if end_date else len(dates)
+        return games[lo:hi]
+
+    def refresh(self) -> None:
+        """
+        Fetches the weeks that may still change and persists the schedule.
+
+        Weekly responses go through the API cache, so weeks whose games are all
+        final are only ever downloaded once.
+        """
+        walk_start, walk_end = _season_bounds(self.season)
+        if self.complete_through:
+            walk_start = max(walk_start, (date.fromisoformat(self.complete_through) + timedelta(days=1)).isoformat())
+
+        current = walk_start
+        while current <= walk_end:
+            data = get_cached_json(f"{API_URL}/schedule/{current}")
+            for day in data.get('gameWeek', []):
+                for game in day.get('games', []):
+                    if game.get('season') == self.season:
+                        self._by_id[game['id']] = _game_record(day['date'], game)
+
+            next_start = data.get('nextStartDate')
+            if not next_start or next_start <= current:
+                next_start = (date.fromisoformat(current) + timedelta(days=7)).isoformat()
+            current = next_start
+
+        unsettled = [
+            g['gameDate'] for g in self._by_id.values()
+            if g['gameState'] not in FINAL_GAME_STATES and g['gameScheduleState'] not in SETTLED_SCHEDULE_STATES
+        ]
+        if unsettled:
+            self.complete_through = (date.fromisoformat(min(unsettled)) - timedelta(days=1)).isoformat()
+        else:
+            self.complete_through = walk_end
+
+        self.refreshed_at = time.time()
+        self._build_indexes()
+        self.save()
+        logger.info(f"Refreshed schedule for season {self.season}: {len(self._by_id)} games, complete through {self.complete_through}")
+
+    def save(self) -> None:
+        """Writes the schedule to its file atomically."""
+        os.makedirs(SCHEDULE_DIR, exist_ok=True)
+        payload = {
+            'season': self.season,
+            'complete_through': self.complete_through,
+            'refreshed_at': self.refreshed_at,
+            'games': list(self._by_id.values())
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=SCHEDULE_DIR, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, self.path)
+
+    @classmethod
+    def load(cls, season: int) -> 'SeasonSchedule':
+        """
+        Loads a season's schedule from disk, or returns an empty schedule if none is stored.
+
+        Parameters:
+            season (int): Season in YYYYYYYY format.
+
+        Returns:
+            SeasonSchedule: The stored schedule.
+        """
+        store = cls(season)
+        if os.path.exists(store.path):
+            with open(store.path, 'r') as f:
+                payload = json.load(f)
+            store = cls(season, payload['games'], payload.get('complete_through'), payload.get('refreshed_at', 0.0))
+        return store
+
+def get_season_schedule(season: int, max_age: float = REFRESH_INTERVAL, through: Optional[str] = None) -> SeasonSchedule:
+    """
+    Returns the schedule store for a season, fetching or refreshing it when needed.
+
+    Parameters:
+        season (int): Season in YYYYYYYY format.
+        max_age (float): Seconds after which a season with unplayed games is refreshed.
+        through (str, optional): Last date the caller needs, in 'YYYY-MM-DD' format. A stored
+                                 season that is final through that date is not refreshed,
+                                 so lookups of past dates never walk the unplayed weeks.
+
+    Returns:
+        SeasonSchedule: The season's schedule.
+    """
+    store = _stores.get(season)
+    if store is None:
+        store = SeasonSchedule.load(season)
+        _stores[season] = store
+    settled_through = through is not None and store.complete_through is not None and through <= store.complete_through
+    if not store.is_complete and not settled_through and time.time() - store.refreshed_at > max_age:
+        store.refresh()
+    return store
+
+def _seasons_between(start_date: str, end_date: str) -> List[int]:
+    """
+    Returns the seasons whose schedules overlap a date range.
+
+    Parameters:
+        start_date (str): Start date in 'YYYY-MM-DD' format.
+        end_date (str): End date in 'YYYY-MM-DD' format.
+
+    Returns:
+        List[int]: Seasons in ascending order.
+    """
+    first = season_for_date(start_date)
+    last = season_for_date(end_date)
+    return [year * 10000 + year + 1 for year in range(first // 10000, last // 10000 + 1)]
+
+def get_games(start_date: str, end_date: str) -> List[dict]:
+    """
+    Returns all games between two dates (inclusive), ordered by date and start time.
+
+    Parameters:
+        start_date (str): Start date in 'YYYY-MM-DD' format.
+        end_date (str): End date in 'YYYY-MM-DD' format.
+
+    Returns:
+        List[dict]: Game records with id, season, gameType, gameDate, startTimeUTC,
+                    gameState, gameScheduleState, homeTeam and awayTeam (team codes).
+    """
+    return [
+        game
+        for season in _seasons_between(start_date, end_date)
+        for game in get_season_schedule(season, through=end_date).games_between(start_date, end_date)
+    ]
+
+def get_team_games(team: str, start_date: str, end_date: str) -> List[dict]:
+    """
+    Returns a team's games between two dates (inclusive), ordered by date.
+
+    Parameters:
+        team (str): Three-letter team code (e.g., 'TOR').
+        start_date (str): Start date in 'YYYY-MM-DD' format.
+        end_date (str): End date in 'YYYY-MM-DD' format.
+
+    Returns:
+        List[dict]: Game records (see get_games).
+    """
+    return [
+        game
+        for season in _seasons_between(start_date, end_date)
+        for game in get_season_schedule(season, through=end_date).team_games(team, start_date, end_date)
+    ]
+
+def get_game(game_id: int) -> Optional[dict]:
+    """
+    Returns a game by id.
+
+    Parameters:
+        game_id (int): The game ID (the first four digits are the season's start year).
+
+    Returns:
+        Optional[dict]: The game record, or None if it is not in the schedule.
+    """
+    start_year = int(str(game_id)[:4])
+    return get_season_schedule(start_year * 10000 + start_year + 1).get_game(game_id)
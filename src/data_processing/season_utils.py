@@ -1,4 +1,9 @@
-from datetime import datetime
+import bisect
+from datetime import date, datetime, timedelta
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
 
 # Dictionary containing season start and end dates
 NHL_SEASONS = {
@@ -119,13 +124,219 @@ def get_season_for_date(date_str):
     Raises:
         ValueError: If date doesn't fall within any known season
     """
-    date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-    
-    for season in sorted(NHL_SEASONS.keys(), reverse=True):
-        season_start = datetime.strptime(NHL_SEASONS[season]['start'], '%Y-%m-%d')
-        season_end = datetime.strptime(NHL_SEASONS[season]['playoff_end'], '%Y-%m-%d')
-        
-        if season_start <= date_obj <= season_end:
-            return season
-            
-    raise ValueError(f"Date {date_str} does not fall within any known NHL season") 
\ No newline at end of file
+    season = SEASON_CALENDAR.season_for(date_str)
+    if season is None:
+        raise ValueError(f"Date {date_str} does not fall within any known NHL season")
+    return season
+
+# Days before a season's first game that count as its preseason
+PRESEASON_DAYS = 21
+
+# Season phases returned by SeasonCalendar
+SEASON_PHASES = ('preseason', 'regular', 'playoff', 'offseason')
+
+def _to_date(value) -> date:
+    """Converts a 'YYYY-MM-DD' string, datetime or date to a date."""
+    if isinstance(value, str):
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+class SeasonCalendar:
+    """
+    Season boundaries of NHL_SEASONS, parsed and sorted once.
+
+    Single dates are looked up with bisect and arrays of dates (lists, NumPy arrays or
+    pandas Series) with np.searchsorted, so mapping a whole column of dates to seasons
+    is one vectorized call instead of a lookup per row.
+
+    Example:
+        df['season'] = SEASON_CALENDAR.seasons(df['game_date'])
+        df['phase'] = SEASON_CALENDAR.phases(df['game_date'])
+    """
+
+    def __init__(self, seasons: dict = None):
+        seasons = NHL_SEASONS if seasons is None else seasons
+        self.season_ids = sorted(seasons)
+        self.starts = [_to_date(seasons[s]['start']) for s in self.season_ids]
+        self.regular_ends = [_to_date(seasons[s]['regular_end']) for s in self.season_ids]
+        self.playoff_ends = [_to_date(seasons[s]['playoff_end']) for s in self.season_ids]
+
+        self._season_array = np.array(self.season_ids, dtype=np.int64)
+        self._start_array = np.array(self.starts, dtype='datetime64[D]')
+        self._regular_end_array = np.array(self.regular_ends, dtype='datetime64[D]')
+        self._playoff_end_array = np.array(self.playoff_ends, dtype='datetime64[D]')
+
+    def _index(self, day: date) -> int:
+        """Returns the index of the last season starting on or before a date (-1 if none)."""
+        return bisect.bisect_right(self.starts, day) - 1
+
+    def season_for(self, value) -> Optional[int]:
+        """
+        Returns the season a date falls into.
+
+        Args:
+            value: Date as 'YYYY-MM-DD' string, datetime or date
+
+        Returns:
+            Season in YYYYYYYY format, or None if the date is between or outside known seasons
+        """
+        day = _to_date(value)
+        i = self._index(day)
+        if i >= 0 and day <= self.playoff_ends[i]:
+            return self.season_ids[i]
+        return None
+
+    def next_season(self, value) -> Optional[int]:
+        """
+        Returns the first season starting after a date.
+
+        Args:
+            value: Date as 'YYYY-MM-DD' string, datetime or date
+
+        Returns:
+            Season in YYYYYYYY format, or None if no known season starts after the date
+        """
+        i = self._index(_to_date(value)) + 1
+        return self.season_ids[i] if i < len(self.season_ids) else None
+
+    def phase_for(self, value) -> str:
+        """
+        Returns the phase of the season on a date.
+
+        Args:
+            value: Date as 'YYYY-MM-DD' string, datetime or date
+
+        Returns:
+            'regular', 'playoff', 'preseason' (within PRESEASON_DAYS before a season starts) or 'offseason'
+        """
+        day = _to_date(value)
+        i = self._index(day)
+        if i >= 0 and day <= self.regular_ends[i]:
+            return 'regular'
+        if i >= 0 and day <= self.playoff_ends[i]:
+            return 'playoff'
+        if i + 1 < len(self.starts) and (self.starts[i + 1] - day).days <= PRESEASON_DAYS:
+            return 'preseason'
+        return 'offseason'
+
+    def _lookup(self, dates):
+        """Returns the dates as datetime64[D] and the index of the last season starting on or before each."""
+        days = pd.to_datetime(pd.Series(dates) if isinstance(dates, list) else dates)
+        days = np.asarray(days, dtype='datetime64[D]')
+        return days, np.searchsorted(self._start_array, days, side='right') - 1
+
+    def seasons(self, dates) -> pd.Series:
+        """
+        Maps an array of dates to seasons in one vectorized call.
+
+        Args:
+            dates: Dates as a pandas Series, NumPy array or list (strings, datetimes or datetime64)
+
+        Returns:
+            Series of seasons (nullable Int64; missing for dates outside known seasons),
+            aligned with the input index when a Series is given
+        """
+        days, idx = self._lookup(dates)
+        clipped = np.clip(idx, 0, None)
+        in_season = (idx >= 0) & (days <= self._playoff_end_array[clipped])
+        seasons = pd.array(np.where(in_season, self._season_array[clipped], 0), dtype='Int64')
+        seasons[~in_season] = pd.NA
+        return pd.Series(seasons, index=dates.index if isinstance(dates, pd.Series) else None, name='season')
+
+    def phases(self, dates) -> pd.Series:
+        """
+        Maps an array of dates to season phases in one vectorized call (see phase_for).
+
+        Args:
+            dates: Dates as a pandas Series, NumPy array or list (strings, datetimes or datetime64)
+
+        Returns:
+            Categorical Series of phases (missing for missing dates), aligned with the input index
+            when a Series is given
+        """
+        days, idx = self._lookup(dates)
+        n = len(self.season_ids)
+        clipped = np.clip(idx, 0, None)
+        next_idx = np.clip(idx + 1, 0, n - 1)
+        started = idx >= 0
+        regular = started & (days <= self._regular_end_array[clipped])
+        playoff = started & ~regular & (days <= self._playoff_end_array[clipped])
+        preseason = (~regular & ~playoff & (idx + 1 < n)
+                     & ((self._start_array[next_idx] - days) <= np.timedelta64(PRESEASON_DAYS, 'D')))
+        phases = np.select([regular, playoff, preseason], ['regular', 'playoff', 'preseason'], 'offseason').astype(object)
+        phases[np.isnat(days)] = None
+        return pd.Series(
+            pd.Categorical(phases, categories=SEASON_PHASES),
+            index=dates.index if isinstance(dates, pd.Series) else None,
+            name='phase'
+        )
+
+    def resolve_window(self, enddate: str, startdate: str = '', last_n: Optional[int] = None, stype: int = 2) -> Tuple[str, int, int]:
+        """
+        Resolves the date window and seasons of a Natural Stat Trick query.
+
+        An end date between seasons belongs to the next season. With last_n, the window
+        reaches back last_n days from enddate, continuing from the end of the previous
+        season (regular season or playoffs, per stype) when it starts before the season.
+        A start date between seasons is moved to the end of the previous season.
+
+        Args:
+            enddate: End date in 'YYYY-MM-DD' format
+            startdate: Start date in 'YYYY-MM-DD' format. Ignored when last_n is given.
+            last_n: Number of days to look back from enddate
+            stype: Season type (2 for regular season, 3 for playoffs)
+
+        Returns:
+            Tuple of (startdate, start_season, end_season)
+
+        Raises:
+            ValueError: If a date is after the last known season
+        """
+        end_date_obj = _to_date(enddate)
+        end_season = self.season_for(end_date_obj) or self.next_season(end_date_obj)
+        if end_season is None:
+            raise ValueError(f"Could not determine season for end date {enddate}")
+
+        if last_n is not None:
+            season_start_obj = self.starts[self.season_ids.index(end_season)]
+
+            # Calculate days since season start
+            days_since_season_start = (end_date_obj - season_start_obj).days
+
+            if days_since_season_start < last_n:
+                # Need to go into previous season
+                prev_season = end_season - 10001  # e.g., 20242025 -> 20232024
+                if prev_season in NHL_SEASONS:
+                    # Calculate remaining days to look back in previous season
+                    remaining_days = last_n - days_since_season_start
+                    prev_season_end_obj = _to_date(get_season_end_date(prev_season, stype))
+                    startdate = (prev_season_end_obj - timedelta(days=remaining_days)).strftime('%Y-%m-%d')
+                    start_season = prev_season
+                else:
+                    # If no previous season data, just go back from season start
+                    startdate = (season_start_obj - timedelta(days=last_n)).strftime('%Y-%m-%d')
+                    start_season = end_season
+            else:
+                # All dates within current season
+                startdate = (end_date_obj - timedelta(days=last_n)).strftime('%Y-%m-%d')
+                start_season = end_season
+        elif not startdate:
+            # If no last_n provided and startdate is empty, use end_season as start_season
+            start_season = end_season
+        else:
+            start_season = self.season_for(startdate)
+            if start_season is None:
+                # If startdate falls between seasons, use the previous season
+                next_season = self.next_season(startdate)
+                if next_season is None:
+                    raise ValueError(f"Could not determine season for start date {startdate}")
+                start_season = next_season - 10001
+                # Adjust startdate to use the end of the previous season based on stype
+                startdate = get_season_end_date(start_season, stype)
+
+        return startdate, start_season, end_season
+
+# Calendar of the seasons in NHL_SEASONS
+SEASON_CALENDAR = SeasonCalendar()
@@ -1,9 +1,11 @@
-import requests
 import json
 import os
 from datetime import datetime, timedelta
 from typing import Dict, Optional
 
+from src.data_processing.api_cache import get_cached_json
+from src.data_processing.http_client import get_client
+from src.data_processing.schedule_store import get_team_games
 from src.data_processing.season_utils import get_season_for_date, get_season_end_date
 
 API_URL = 'https://api-web.nhle.com/'
@@ -21,8 +23,10 @@ def get_team_info():
             - triCode (str): The three letter abbreviation code for the team
     """
     nhl_teams = {}
-    response = requests.get(f"{API_URL}/stats/rest/en/team", params={"Content-Type": "application/json"})
-    data = response.json()
+    data = get_cached_json(
+        f"{API_URL}/stats/rest/en/team",
+        fetch=lambda url: get_client().get(url, params={"Content-Type": "application/json"}).json()
+    )
 
     for team in data["data"]:
         team_id = team['id']
@@ -141,9 +145,7 @@ def get_team_roster(team_code: str, season: int) -> dict:
         dict: JSON response containing the team roster.
     """
     roster_url = f"{API_URL}v1/roster/{team_code}/{season}"
-    response = requests.get(roster_url)
-    response.raise_for_status()
-    return response.json()
+    return get_cached_json(roster_url)
 
 def get_week_schedule(team: str, date: str) -> dict:
     """
@@ -157,9 +159,7 @@ def get_week_schedule(team: str, date: str) -> dict:
         dict: JSON response containing the weekly schedule.
     """
     schedule_url = f"{API_URL}v1/club-schedule/{team}/week/{date}"
-    response = requests.get(schedule_url)
-    response.raise_for_status()
-    return response.json()
+    return get_cached_json(schedule_url)
 
 def get_most_recent_game_id(team: str, date: str) -> tuple[Optional[int], int]:
     """
@@ -167,6 +167,7 @@ def get_most_recent_game_id(team: str, date: str) -> tuple[Optional[int], int]:
     If no games are found in the current season, looks back to the previous season.
     For UTA (Utah), looks up ARI (Arizona) games from previous season since Utah is the relocated Arizona team.
     Excludes preseason games by checking the game ID format.
+    Games are looked up in the local schedule store (see schedule_store) rather than the NHL API.
 
     Args:
         team (str): Three-letter team code (e.g., 'TOR').
@@ -183,18 +184,18 @@ def get_most_recent_game_id(team: str, date: str) -> tuple[Optional[int], int]:
     except ValueError:
         raise ValueError("date must be in 'YYYY-MM-DD' format.")
 
-    # Add a 7-day offset to the original date
-    date_plus_offset = ref_date - timedelta(days=5)
-    date_plus_offset_str = date_plus_offset.strftime('%Y-%m-%d')
+    # Look at the week starting 5 days before the original date
+    week_start = ref_date - timedelta(days=5)
+    week_end = week_start + timedelta(days=6)
 
-    # Call get_week_schedule with the offset date
-    schedule = get_week_schedule(team, date_plus_offset_str)
+    # Answer from the local schedule store instead of the club-schedule endpoint
+    schedule_games = get_team_games(team, week_start.isoformat(), week_end.isoformat())
 
     # Filter games that have a gameDate before the reference_date and exclude preseason games
     past_games = [
-        game for game in schedule.get('games', [])
-        if datetime.strptime(game.get('gameDate'), '%Y-%m-%d').date() < ref_date
-        and str(game.get('id'))[4:6] != '01'  # Exclude games where digits 5-6 are '01' (preseason)
+        game for game in schedule_games
+        if game['gameDate'] < ref_date.isoformat()
+        and str(game['id'])[4:6] != '01'  # Exclude games where digits 5-6 are '01' (preseason)
     ]
 
     if not past_games:
@@ -204,20 +205,20 @@ def get_most_recent_game_id(team: str, date: str) -> tuple[Optional[int], int]:
             prev_season = current_season - 10001  # e.g., 20242025 -> 20232024
             prev_season_end = get_season_end_date(prev_season, stype=2)  # stype=2 for regular season
 
-            prev_season_end_plus_offset = datetime.strptime(prev_season_end, '%Y-%m-%d').date() - timedelta(days=5)
-            prev_season_end_plus_offset_str = prev_season_end_plus_offset.strftime('%Y-%m-%d')
+            prev_week_start = datetime.strptime(prev_season_end, '%Y-%m-%d').date() - timedelta(days=5)
+            prev_week_end = prev_week_start + timedelta(days=6)
             
             # For UTA (Utah), look up ARI (Arizona) games from previous season
             # TODO: add season logic so this lookup only occurs when the current season is 20242025
             lookup_team = 'ARI' if team.upper() == 'UTA' else team
             
-            # Try to get the schedule for the end of previous season
-            schedule = get_week_schedule(lookup_team, prev_season_end_plus_offset_str)
+            # Get the schedule for the end of previous season
+            schedule_games = get_team_games(lookup_team, prev_week_start.isoformat(), prev_week_end.isoformat())
             
             # Get all games from the schedule, excluding preseason games
             past_games = [
-                game for game in schedule.get('games', [])
-                if str(game.get('id'))[4:6] != '01'  # Exclude preseason games
+                game for game in schedule_games
+                if str(game['id'])[4:6] != '01'  # Exclude preseason games
             ]
             
             if not past_games:
@@ -227,14 +228,11 @@ def get_most_recent_game_id(team: str, date: str) -> tuple[Optional[int], int]:
             return None, 0
 
     # Find the game with the latest gameDate
-    most_recent_game = max(
-        past_games,
-        key=lambda x: datetime.strptime(x.get('gameDate'), '%Y-%m-%d').date()
-    )
+    most_recent_game = max(past_games, key=lambda x: x['gameDate'])
 
     # Calculate if it's a back-to-back game
-    most_recent_game_date = datetime.strptime(most_recent_game.get('gameDate'), '%Y-%m-%d').date()
+    most_recent_game_date = datetime.strptime(most_recent_game['gameDate'], '%Y-%m-%d').date()
     days_difference = (ref_date - most_recent_game_date).days
     is_back_to_back = 1 if days_difference == 1 else 0
 
-    return most_recent_game.get('id'), is_back_to_back
\ No newline at end of file
+    return most_recent_game['id'], is_back_to_back
\ No newline at end of file
@@ -1,5 +1,9 @@
 import requests
 import logging
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
+
+from src.data_processing.http_client import get_client
 
 # Configure logging
 logging.basicConfig(
@@ -12,7 +16,7 @@ def get_request(url, enable_logging=False):
     try:
         if enable_logging:
             logger.info(f"Making GET request to: {url}")
-        response = requests.get(url)
+        response = get_client().get(url)
         response.raise_for_status()  # Raises an HTTPError for bad responses
         if enable_logging:
             logger.debug("Request successful, returning JSON response")
@@ -32,4 +36,31 @@ def get_request(url, enable_logging=False):
     except Exception as err:
         if enable_logging:
             logger.error(f"An unexpected error occurred: {err}", exc_info=True)  # Other errors with full traceback
-    return None
\ No newline at end of file
+    return None
+
+def iter_as_completed(func, items, max_workers=8):
+    """
+    Applies func to every item on a thread pool and yields results as they finish.
+
+    At most max_workers calls are in flight at any time, so results are handed to the
+    caller as soon as they arrive instead of being buffered for the whole input.
+
+    Parameters:
+        func (callable): Function applied to each item.
+        items (iterable): Items to process.
+        max_workers (int): Maximum number of concurrent calls. Defaults to 8.
+
+    Yields:
+        tuple: (item, result) pairs in completion order.
+    """
+    items = iter(items)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {executor.submit(func, item): item for item in islice(items, max_workers)}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = pending.pop(future)
+                # Keep the pool full before handing the result back
+                for next_item in islice(items, 1):
+                    pending[executor.submit(func, next_item)] = next_item
+                yield item, future.result()
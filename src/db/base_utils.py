@@ -1,6 +1,10 @@
 import psycopg2
 import os
 import logging
+from io import StringIO
+from typing import List, Optional, Union
+
+import pandas as pd
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -89,4 +93,138 @@ def disconnect_db(conn, suppress_log: bool = False):
     except psycopg2.Error as db_err:
         logger.error(f"Failed to close the database connection: {db_err}")
 
-# Add other shared utilities as needed
\ No newline at end of file
+def get_table_columns(cursor, table_name: str) -> List[str]:
+    """
+    Returns the column names of a table, in table order.
+
+    Parameters:
+        cursor: A psycopg2 cursor.
+        table_name (str): The table name.
+
+    Returns:
+        List[str]: The column names.
+    """
+    cursor.execute(f"SELECT * FROM {table_name} LIMIT 0")
+    return [column[0] for column in cursor.description]
+
+def copy_to_staging(cursor, table_name: str, df: pd.DataFrame, columns: List[str]) -> str:
+    """
+    Copies a DataFrame into a temporary staging table shaped like a table, with COPY FROM STDIN.
+
+    The staging table is dropped at the end of the transaction.
+
+    Parameters:
+        cursor: A psycopg2 cursor.
+        table_name (str): The table whose columns and defaults the staging table copies.
+        df (pd.DataFrame): The rows to copy. Missing values (None/NaN) are copied as NULL.
+        columns (List[str]): The DataFrame columns to copy.
+
+    Returns:
+        str: The name of the staging table.
+    """
+    staging = f"{table_name}_staging"
+    cursor.execute(f"DROP TABLE IF EXISTS {staging}")
+    cursor.execute(f"CREATE TEMP TABLE {staging} (LIKE {table_name} INCLUDING DEFAULTS) ON COMMIT DROP")
+
+    buffer = StringIO()
+    df[columns].to_csv(buffer, header=False, index=False, na_rep='')
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {staging} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '')", buffer)
+    return staging
+
+def copy_upsert(
+    cursor,
+    table_name: str,
+    df: pd.DataFrame,
+    key_columns: List[str],
+    replace_column: Optional[Union[str, List[str]]] = None,
+    touch_column: str = 'last_updated',
+    skip_unchanged: bool = False
+) -> dict:
+    """
+    Bulk upserts a DataFrame into a table: COPY into a staging table, then one
+    INSERT ... ON CONFLICT DO UPDATE from it.
+
+    Columns of the DataFrame that the table does not have are ignored. With replace_column
+    (e.g. 'date'), rows stored for the same replace_column values that are not in the
+    DataFrame are deleted, so the DataFrame replaces those values entirely (rows with NULL
+    in a replace column replace nothing). With
+    skip_unchanged, rows identical to the stored row (compared with IS DISTINCT FROM
+    across all value columns) are not rewritten, so re-loading unchanged data writes
+    nothing. The caller commits.
+
+    Parameters:
+        cursor: A psycopg2 cursor.
+        table_name (str): The target table.
+        df (pd.DataFrame): The rows, with database column names. Missing values (None/NaN) are stored as NULL.
+        key_columns (List[str]): The conflict target (the table's primary key, e.g. ['player', 'date']).
+        replace_column (str or List[str], optional): Column (or columns, e.g. ['date', 'side'])
+            whose values the DataFrame replaces entirely.
+        touch_column (str): Timestamp column set to CURRENT_TIMESTAMP on updated rows, if the table has it.
+        skip_unchanged (bool): Only update rows whose values changed. Defaults to False.
+
+    Returns:
+        dict: 'inserted', 'updated' and 'unchanged' (identical to the stored row) counts, and
+              'deleted' (stale rows removed for replace_column).
+    """
+    counts = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'deleted': 0}
+    if df.empty:
+        return counts
+
+    table_columns = get_table_columns(cursor, table_name)
+    columns = [column for column in df.columns if column in table_columns]
+    ignored = [column for column in df.columns if column not in table_columns]
+    if ignored:
+        logger.debug(f"Ignoring columns not in {table_name}: {ignored}")
+
+    staging = copy_to_staging(cursor, table_name, df, columns)
+
+    keys = ', '.join(key_columns)
+    key_match = ' AND '.join(f"s.{column} = t.{column}" for column in key_columns)
+    value_columns = [column for column in columns if column not in key_columns]
+    stored = ', '.join(f"t.{column}" for column in value_columns)
+    incoming = ', '.join(f"s.{column}" for column in value_columns)
+
+    if value_columns and not skip_unchanged:
+        cursor.execute(
+            f"SELECT COUNT(*) FROM {staging} s JOIN {table_name} t ON {key_match} "
+            f"WHERE ROW({incoming}) IS NOT DISTINCT FROM ROW({stored})"
+        )
+        counts['unchanged'] = cursor.fetchone()[0]
+
+    if replace_column is not None:
+        replace_columns = [replace_column] if isinstance(replace_column, str) else list(replace_column)
+        cursor.execute(
+            f"DELETE FROM {table_name} t "
+            f"WHERE ({', '.join(f't.{column}' for column in replace_columns)}) "
+            f"IN (SELECT DISTINCT {', '.join(replace_columns)} FROM {staging}) "
+            f"AND NOT EXISTS (SELECT 1 FROM {staging} s WHERE {key_match})"
+        )
+        counts['deleted'] = cursor.rowcount
+
+    assignments = [f"{column} = EXCLUDED.{column}" for column in value_columns]
+    if touch_column in table_columns and touch_column not in columns:
+        assignments.append(f"{touch_column} = CURRENT_TIMESTAMP")
+    on_conflict = f"DO UPDATE SET {', '.join(assignments)}" if assignments else "DO NOTHING"
+    if skip_unchanged and value_columns:
+        excluded = ', '.join(f"EXCLUDED.{column}" for column in value_columns)
+        target = ', '.join(f"{table_name}.{column}" for column in value_columns)
+        on_conflict += f" WHERE ROW({target}) IS DISTINCT FROM ROW({excluded})"
+
+    # DISTINCT ON keeps one row per key, since a row cannot be updated twice by one statement
+    cursor.execute(
+        f"INSERT INTO {table_name} ({', '.join(columns)}) "
+        f"SELECT DISTINCT ON ({keys}) {', '.join(columns)} FROM {staging} "
+        f"ON CONFLICT ({keys}) {on_conflict} "
+        f"RETURNING (xmax = 0)"
+    )
+    results = [row[0] for row in cursor.fetchall()]
+    counts['inserted'] = sum(results)
+    if skip_unchanged:
+        # Rows skipped by the WHERE clause are not returned
+        counts['updated'] = len(results) - counts['inserted']
+        counts['unchanged'] = len(df.drop_duplicates(subset=key_columns)) - len(results)
+    else:
+        counts['updated'] = len(results) - counts['inserted'] - counts['unchanged']
+    cursor.execute(f"DROP TABLE IF EXISTS {staging}")
+    return counts
\ No newline at end of file
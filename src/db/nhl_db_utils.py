@@ -15,9 +15,25 @@ from contextlib import contextmanager
 import logging
 from typing import List, Optional
 from src.data_processing.pbp_utils import retrieve_schedule
+from src.data_processing.api_cache import get_cached_json
+from src.data_processing.player_utils import fetch_player_data
+from src.data_processing.utils import iter_as_completed
 
 API_URL = 'https://api-web.nhle.com/v1'
 
+# Maximum number of concurrent boxscore requests
+BOXSCORE_MAX_WORKERS = 8
+
+# Maximum number of concurrent player profile requests
+PLAYER_MAX_WORKERS = 8
+
+# Columns of the players table written by the player upserts (last_updated is set by the database)
+PLAYER_COLUMNS = [
+    'player_id', 'first_name', 'last_name', 'full_name', 'position', 'jersey_number',
+    'date_of_birth', 'nationality', 'height', 'weight', 'shoots', 'current_team_id',
+    'current_team_name', 'current_team_abbreviation', 'is_active'
+]
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -58,8 +74,8 @@ def insert_player(player_id: int, db_prefix: dict) -> None:
     url = f'{API_URL}/player/{player_id}/landing'
 
     try:
-        # Fetch player data from the NHL API
-        player_json = get_request(url, enable_logging=True)
+        # Fetch player data from the NHL API (or the on-disk API cache)
+        player_json = get_cached_json(url, fetch=lambda u: get_request(u, enable_logging=True))
         if not player_json:
             logger.error(f"Failed to fetch data for player_id {player_id}")
             return
@@ -267,98 +283,212 @@ def append_player_ids(player_list, db_prefix):
     except Exception as ex:
         logger.error(f"An unexpected error occurred: {ex}")
 
-def get_boxscores(start_date_str: str, end_date_str: str):
+def _fetch_boxscore(game_id) -> Optional[dict]:
     """
-    Retrieves boxscore information for all games within a specified date range.
+    Fetches the boxscore of a single game.
+
+    Parameters:
+        game_id: The game ID.
+
+    Returns:
+        Optional[dict]: The boxscore JSON, or None if the request failed.
+    """
+    url = f"{API_URL}/gamecenter/{game_id}/boxscore"
+    return get_cached_json(url, fetch=lambda u: get_request(u, enable_logging=True))
+
+def iter_boxscores(start_date_str: str, end_date_str: str, max_workers: int = BOXSCORE_MAX_WORKERS):
+    """
+    Fetches the boxscores of all games within a date range concurrently, yielding each as it arrives.
+
+    Only max_workers boxscores are in flight at once and each payload is released once the
+    caller moves on, so memory stays flat regardless of the size of the date range.
 
     Parameters:
         start_date_str (str): The start date in 'YYYY-MM-DD' format.
         end_date_str (str): The end date in 'YYYY-MM-DD' format.
+        max_workers (int): Maximum number of concurrent requests. Defaults to BOXSCORE_MAX_WORKERS.
 
-    Returns:
-        list: A list of boxscore JSON objects for each game.
+    Yields:
+        tuple: (game_id, boxscore) in completion order. Games that fail to fetch are skipped.
     """
     # Retrieve the schedule to get all game IDs within the date range
     schedule = retrieve_schedule(start_date_str, end_date_str)
     game_ids = schedule.get('game_ids', [])
 
-    boxscores = []
-
-    for game_id in game_ids:
-        url = f"{API_URL}/gamecenter/{game_id}/boxscore"
-        boxscore_data = get_request(url, enable_logging=True)
-        
+    for game_id, boxscore_data in iter_as_completed(_fetch_boxscore, game_ids, max_workers=max_workers):
         if boxscore_data:
-            boxscores.append(boxscore_data)
             logger.info(f"Successfully fetched boxscore for game {game_id}")
+            yield game_id, boxscore_data
         else:
             logger.error(f"Failed to fetch boxscore for game {game_id}")
 
-    return boxscores
+def get_boxscores(start_date_str: str, end_date_str: str):
+    """
+    Retrieves boxscore information for all games within a specified date range.
+
+    Parameters:
+        start_date_str (str): The start date in 'YYYY-MM-DD' format.
+        end_date_str (str): The end date in 'YYYY-MM-DD' format.
+
+    Returns:
+        list: A list of boxscore JSON objects for each game.
+    """
+    return [boxscore for _, boxscore in iter_boxscores(start_date_str, end_date_str)]
+
+def _extract_boxscore_player_ids(boxscore: dict) -> set:
+    """
+    Extracts the IDs of all players listed in a boxscore.
+
+    Parameters:
+        boxscore (dict): The boxscore JSON.
+
+    Returns:
+        set: The player IDs of the home and away forwards, defense and goalies.
+    """
+    player_ids = set()
+
+    # Access the playerByGameStats section
+    player_stats = boxscore.get('playerByGameStats', {})
+    if not player_stats:
+        logger.warning("  No 'playerByGameStats' found in this boxscore.")
+        return player_ids
+
+    # Iterate through both homeTeam and awayTeam
+    for team_key in ['homeTeam', 'awayTeam']:
+        team_stats = player_stats.get(team_key, {})
+        if not team_stats:
+            logger.warning(f"  No '{team_key}' data found.")
+            continue
+
+        # Define the player positions to extract
+        position_groups = ['forwards', 'defense', 'goalies']
+        for position_group in position_groups:
+            players = team_stats.get(position_group, [])
+            if not players:
+                logger.info(f"    No players found in position group '{position_group}'.")
+                continue
+
+            # Extract player IDs from each position group
+            for player in players:
+                player_id = player.get('playerId')
+                if player_id:
+                    player_ids.add(player_id)
+                else:
+                    logger.warning("      Player without 'playerId' encountered.")
 
-def extract_unique_player_ids(start_date_str: str, end_date_str: str) -> set:
+    return player_ids
+
+def extract_unique_player_ids(start_date_str: str, end_date_str: str, max_workers: int = BOXSCORE_MAX_WORKERS) -> set:
     """
     Extracts all unique player IDs from boxscore data within the specified date range.
 
+    Boxscores are fetched concurrently and each one is dropped as soon as its
+    player IDs have been extracted.
+
     Parameters:
         start_date_str (str): The start date in 'YYYY-MM-DD' format.
         end_date_str (str): The end date in 'YYYY-MM-DD' format.
+        max_workers (int): Maximum number of concurrent boxscore requests. Defaults to BOXSCORE_MAX_WORKERS.
 
     Returns:
         set: A set of unique player IDs.
     """
-    # Retrieve boxscore data for the given date range
-    boxscores = get_boxscores(start_date_str, end_date_str)
     unique_player_ids = set()
+    n_boxscores = 0
 
-    logger.info(f"Retrieved {len(boxscores)} boxscores.")
+    for game_id, boxscore in iter_boxscores(start_date_str, end_date_str, max_workers=max_workers):
+        n_boxscores += 1
+        logger.info(f"Processing boxscore {n_boxscores} (Game ID: {game_id})")
+        unique_player_ids |= _extract_boxscore_player_ids(boxscore)
 
-    if not boxscores:
+    logger.info(f"Retrieved {n_boxscores} boxscores.")
+
+    if not n_boxscores:
         logger.warning("No boxscores found for the given date range.")
         return unique_player_ids
 
-    # Iterate through each boxscore
-    for idx, boxscore in enumerate(boxscores):
-        game_id = boxscore.get('id', 'Unknown')
-        logger.info(f"Processing boxscore {idx + 1}/{len(boxscores)} (Game ID: {game_id})")
+    logger.info(f"Total unique player IDs extracted: {len(unique_player_ids)}")
+    return unique_player_ids
 
-        # Access the playerByGameStats section
-        player_stats = boxscore.get('playerByGameStats', {})
-        if not player_stats:
-            logger.warning("  No 'playerByGameStats' found in this boxscore.")
-            continue
+def fetch_players(player_ids, max_workers: int = PLAYER_MAX_WORKERS) -> List[dict]:
+    """
+    Fetches the profiles of several players concurrently.
 
-        # Iterate through both homeTeam and awayTeam
-        for team_key in ['homeTeam', 'awayTeam']:
-            team_stats = player_stats.get(team_key, {})
-            if not team_stats:
-                logger.warning(f"  No '{team_key}' data found.")
-                continue
+    Requests go through player_utils.fetch_player_data, so they share the API cache and
+    the shared HTTP client's rate limit for the NHL API.
 
-            logger.info(f"  Processing team: {team_key}")
+    Parameters:
+        player_ids (iterable): The player IDs to fetch.
+        max_workers (int): Maximum number of concurrent requests. Defaults to PLAYER_MAX_WORKERS.
 
-            # Define the player positions to extract
-            position_groups = ['forwards', 'defense', 'goalies']
-            for position_group in position_groups:
-                players = team_stats.get(position_group, [])
-                if not players:
-                    logger.info(f"    No players found in position group '{position_group}'.")
-                    continue
+    Returns:
+        List[dict]: Player rows keyed by PLAYER_COLUMNS. Players that fail to fetch are skipped.
+    """
+    players = []
+    for player_id, player_data in iter_as_completed(fetch_player_data, player_ids, max_workers=max_workers):
+        if player_data is None or player_data.get('player_id') is None:
+            logger.error(f"Skipping player_id {player_id}: no profile data.")
+            continue
+        players.append(player_data)
+    return players
 
-                logger.info(f"    Processing position group: {position_group} ({len(players)} players)")
+def upsert_players(players: List[dict], db_prefix: dict) -> dict:
+    """
+    Inserts or updates many players with a single statement in one transaction.
 
-                # Extract player IDs from each position group
-                for player in players:
-                    player_id = player.get('playerId')
-                    if player_id:
-                        unique_player_ids.add(player_id)
-                    else:
-                        logger.warning("      Player without 'playerId' encountered.")
+    Existing rows are only rewritten (and their last_updated bumped) when at least one
+    field changed.
 
-    logger.info(f"Total unique player IDs extracted: {len(unique_player_ids)}")
-    return unique_player_ids
+    Parameters:
+        players (List[dict]): Player rows keyed by PLAYER_COLUMNS.
+        db_prefix (dict): Database configuration with keys: dbname, user, password, host, port.
 
-def update_player_db(start_date_str: str, end_date_str: str, db_prefix: dict, skip_existing: bool = False) -> None:
+    Returns:
+        dict: Counts of 'inserted', 'updated' and 'unchanged' players.
+
+    Example:
+        counts = upsert_players(fetch_players([8478236, 8479318]), db_prefix)
+    """
+    # A statement cannot touch the same row twice, so keep the last row per player
+    rows_by_id = {player['player_id']: tuple(player.get(col) for col in PLAYER_COLUMNS) for player in players}
+    counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+    if not rows_by_id:
+        return counts
+
+    columns = ', '.join(PLAYER_COLUMNS)
+    updates = ',\n        '.join(f"{col} = EXCLUDED.{col}" for col in PLAYER_COLUMNS[1:])
+    current = ', '.join(f"players.{col}" for col in PLAYER_COLUMNS[1:])
+    excluded = ', '.join(f"EXCLUDED.{col}" for col in PLAYER_COLUMNS[1:])
+    upsert_query = f"""
+    INSERT INTO players ({columns})
+    VALUES %s
+    ON CONFLICT (player_id) DO UPDATE SET
+        {updates},
+        last_updated = CURRENT_TIMESTAMP
+    WHERE ({current}) IS DISTINCT FROM ({excluded})
+    RETURNING (xmax = 0) AS inserted;
+    """
+
+    with get_db_connection(db_prefix) as conn:
+        try:
+            with conn.cursor() as cursor:
+                results = extras.execute_values(cursor, upsert_query, list(rows_by_id.values()), page_size=1000, fetch=True)
+            conn.commit()
+        except psycopg2.Error:
+            conn.rollback()
+            raise
+
+    counts['inserted'] = sum(1 for (inserted,) in results if inserted)
+    counts['updated'] = len(results) - counts['inserted']
+    counts['unchanged'] = len(rows_by_id) - len(results)
+    logger.info(
+        f"Upserted {len(rows_by_id)} players: {counts['inserted']} inserted, "
+        f"{counts['updated']} updated, {counts['unchanged']} unchanged."
+    )
+    return counts
+
+def update_player_db(start_date_str: str, end_date_str: str, db_prefix: dict, skip_existing: bool = False,
+                     batch: bool = True) -> Optional[dict]:
     """
     Updates the players database by extracting unique player IDs within the specified date range
     and inserting/updating their information.
@@ -368,6 +498,11 @@ def update_player_db(start_date_str: str, end_date_str: str, db_prefix: dict, sk
         end_date_str (str): The end date in 'YYYY-MM-DD' format.
         db_prefix (dict): Database configuration with keys: dbname, user, password, host, port.
         skip_existing (bool): If True, skips players that already exist in the database. Defaults to False.
+        batch (bool): If True, fetches profiles concurrently and writes them with one upsert
+                      (see upsert_players). If False, inserts players one at a time. Defaults to True.
+
+    Returns:
+        Optional[dict]: In batch mode, the counts of inserted, updated and unchanged players.
     """
     # Extract unique player IDs within the date range
     unique_player_ids = extract_unique_player_ids(start_date_str, end_date_str)
@@ -401,11 +536,21 @@ def update_player_db(start_date_str: str, end_date_str: str, db_prefix: dict, sk
         player_ids_to_update = unique_player_ids
         logger.info(f"Will process all {len(player_ids_to_update)} players.")
 
+    if batch:
+        try:
+            counts = upsert_players(fetch_players(player_ids_to_update), db_prefix)
+        except psycopg2.Error as e:
+            logger.error(f"Database error while upserting players: {e}")
+            return None
+        logger.info("Player database update completed.")
+        return counts
+
     # Iterate through the filtered player IDs and insert/update each player in the database
     for player_id in player_ids_to_update:
         insert_player(player_id, db_prefix)
 
     logger.info("Player database update completed.")
+    return None
 
 def check_last_update(db_prefix: dict) -> str:
     """
@@ -5,18 +5,27 @@ import time
 from typing import Optional
 from datetime import datetime, timedelta
 import unicodedata
-import requests
+from io import StringIO
+import psycopg2.extras
 
-from src.db.base_utils import connect_db, disconnect_db
+from src.db.base_utils import connect_db, copy_upsert, disconnect_db
+from src.data_processing.nst_archive import is_replaying
 from src.data_processing.nst_scraper import nst_on_ice_scraper, nst_team_on_ice_scraper
+from src.data_processing.nst_schema import GOALIE_DB_COLUMNS, GOALIE_SCHEMA, TEAM_SCHEMA
 from src.data_processing.season_utils import get_season_for_date, NHL_SEASONS, get_season_end_date
-from src.data_processing.team_utils import get_tricode_by_fullname, get_week_schedule, nst_to_nhl_tricode, get_fullname_by_tricode
+from src.data_processing.schedule_store import get_games
+from src.data_processing.team_utils import get_tricode_by_fullname, get_fullname_by_tricode
 
 logger = logging.getLogger(__name__)
 
-def insert_goalie_stats_df(df: pd.DataFrame, conn, cursor, table_name: str = "goalie_stats") -> None:
+def insert_goalie_stats_df(df: pd.DataFrame, conn, cursor, table_name: str = "goalie_stats", commit: bool = True,
+                           skip_unchanged: bool = True) -> dict:
     """
     Insert goalie stats dataframe into database using psycopg2.
+
+    The rows are copied into a staging table and merged with one INSERT ... ON CONFLICT
+    (player, date) DO UPDATE, replacing the stored rows of the frame's dates. When rows
+    change, the goalie_rolling_stats windows that include them are refreshed.
     
     This revised version cleans and maps the DataFrame's columns to match the new schema.
     It now expects the following columns (after cleaning):
@@ -28,103 +37,39 @@ def insert_goalie_stats_df(df: pd.DataFrame, conn, cursor, table_name: str = "go
       - mdgaa, mdgsaa, ld_shots_against, ld_saves, ld_goals_against,
       - ldsv_pct, ldgaa, ldgsaa, rush_attempts_against, rebound_attempts_against,
       - avg_shot_distance, avg_goal_distance,
-      - date
+      - date, and side and opponent when known (see attach_game_sides)
       
     Args:
         df: DataFrame containing goalie stats
         conn: Database connection
         cursor: Database cursor
         table_name: Name of the table to insert into (default: "goalie_stats")
+        commit: Whether to commit. Pass False to leave the transaction to the caller.
+        skip_unchanged: Leave rows identical to the stored ones untouched (including last_updated)
+
+    Returns:
+        Counts of rows inserted, updated, unchanged and deleted (see copy_upsert)
     """
-    # Clean column names to match PostgreSQL table
-    df.columns = (
-        df.columns
-        .str.replace('/', '_per_', regex=False)      # In case any '/' exists
-        .str.replace('%', '_pct', regex=False)         # Replace % with _pct
-        .str.replace(r'[^a-zA-Z0-9]', '_', regex=True)  # Replace other special characters
-        .str.replace(r'_+', '_', regex=True)            # Collapse multiple underscores
-        .str.strip('_')
-        .str.lower()
-    )
-    
-    # Replace placeholder '-' with None so that numeric columns are handled properly
-    df.replace("-", None, inplace=True)
-    
-    # Convert expected numeric columns explicitly
-    numeric_columns = [
-        'gp', 'toi', 'shots_against', 'saves', 'goals_against', 'sv_pct',
-        'gaa', 'gsaa', 'xg_against', 'hd_shots_against', 'hd_saves', 'hd_goals_against',
-        'hdsv_pct', 'hdgaa', 'hdgsaa', 'md_shots_against', 'md_saves', 'md_goals_against',
-        'mdsv_pct', 'mdgaa', 'mdgsaa', 'ld_shots_against', 'ld_saves', 'ld_goals_against',
-        'ldsv_pct', 'ldgaa', 'ldgsaa', 'rush_attempts_against', 'rebound_attempts_against',
-        'avg_shot_distance', 'avg_goal_distance'
-    ]
-    for col in numeric_columns:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-    
-    # Log cleaned columns for verification
-    logger.info(f"Cleaned columns: {df.columns.tolist()}")
-    
-    # Ensure required columns are present
-    required_columns = [
-        'player', 'team', 'gp', 'toi',
-        'shots_against', 'saves', 'goals_against', 'sv_pct',
-        'gaa', 'gsaa', 'xg_against', 'hd_shots_against', 'hd_saves',
-        'hd_goals_against', 'hdsv_pct', 'hdgaa', 'hdgsaa',
-        'md_shots_against', 'md_saves', 'md_goals_against', 'mdsv_pct',
-        'mdgaa', 'mdgsaa', 'ld_shots_against', 'ld_saves', 'ld_goals_against',
-        'ldsv_pct', 'ldgaa', 'ldgsaa', 'rush_attempts_against', 'rebound_attempts_against',
-        'avg_shot_distance', 'avg_goal_distance',
-        'date'
-    ]
-    
-    missing = [col for col in required_columns if col not in df.columns]
-    if missing:
-        logger.error(f"Missing columns after cleaning: {missing}")
-        raise KeyError(f"Missing columns: {missing}")
-    
-    # First, delete any existing records for the date we're inserting
-    # This ensures we don't have duplicates
-    delete_query = f"""
-    DELETE FROM {table_name}
-    WHERE date = %(date)s;
-    """
-    
-    # Get unique dates from the DataFrame
-    unique_dates = df['date'].unique()
-    for date in unique_dates:
-        cursor.execute(delete_query, {'date': date})
-    
-    # Prepare the INSERT statement with dynamic table name
-    insert_query = f"""
-    INSERT INTO {table_name} (
-        player, team, gp, toi,
-        shots_against, saves, goals_against, sv_pct,
-        gaa, gsaa, xg_against, hd_shots_against, hd_saves,
-        hd_goals_against, hdsv_pct, hdgaa, hdgsaa,
-        md_shots_against, md_saves, md_goals_against, mdsv_pct,
-        mdgaa, mdgsaa, ld_shots_against, ld_saves, ld_goals_against,
-        ldsv_pct, ldgaa, ldgsaa, rush_attempts_against, rebound_attempts_against,
-        avg_shot_distance, avg_goal_distance,
-        date
-    ) VALUES (
-        %(player)s, %(team)s, %(gp)s, %(toi)s,
-        %(shots_against)s, %(saves)s, %(goals_against)s, %(sv_pct)s,
-        %(gaa)s, %(gsaa)s, %(xg_against)s, %(hd_shots_against)s, %(hd_saves)s,
-        %(hd_goals_against)s, %(hdsv_pct)s, %(hdgaa)s, %(hdgsaa)s,
-        %(md_shots_against)s, %(md_saves)s, %(md_goals_against)s, %(mdsv_pct)s,
-        %(mdgaa)s, %(mdgsaa)s, %(ld_shots_against)s, %(ld_saves)s, %(ld_goals_against)s,
-        %(ldsv_pct)s, %(ldgaa)s, %(ldgsaa)s, %(rush_attempts_against)s, %(rebound_attempts_against)s,
-        %(avg_shot_distance)s, %(avg_goal_distance)s,
-        %(date)s
-    );
-    """
-    
-    # Convert DataFrame to a list of dictionaries for batch insertion
-    records = df.to_dict('records')
-    cursor.executemany(insert_query, records)
-    conn.commit()
+    # Map the scraper's columns to the table's names and types ('-' and NaN become NULL).
+    # Frames without side and opponent leave the stored values of those columns as they are.
+    columns = [column for column in GOALIE_DB_COLUMNS if column not in ('side', 'opponent') or column in df.columns]
+    try:
+        df = GOALIE_SCHEMA.to_db_frame(df, columns)
+    except KeyError as e:
+        logger.error(f"Missing columns after cleaning: {e}")
+        raise
+
+    # Merge the rows in one statement; goalies no longer listed for the date are removed
+    counts = copy_upsert(cursor, table_name, df, ['player', 'date'], replace_column='date', skip_unchanged=skip_unchanged)
+
+    # Update the rolling windows that include the saved games, if any of them changed
+    if counts['inserted'] or counts['updated'] or counts['deleted']:
+        for date in sorted(df['date'].dropna().unique()):
+            refresh_goalie_rolling_stats(cursor, table_name, str(date))
+    if commit:
+        conn.commit()
+    logger.info(f"Saved goalie stats to {table_name}: {counts}")
+    return counts
 
 def get_goalie_stats(
     goalie_name: Optional[str] = None,
@@ -186,8 +131,8 @@ def get_goalie_stats(
         
     where_clause = " AND ".join(conditions) if conditions else "1=1"
     
-    # Base columns to select
-    base_columns = [
+    # Columns to select (side and opponent are attached to every row at scrape time)
+    columns_to_select = [
         "date",
         "player",
         "team",
@@ -215,7 +160,9 @@ def get_goalie_stats(
         "rush_attempts_against",
         "rebound_attempts_against",
         "avg_shot_distance",
-        "avg_goal_distance"
+        "avg_goal_distance",
+        "side",
+        "opponent"
     ]
     
     conn = None
@@ -223,95 +170,36 @@ def get_goalie_stats(
         conn = connect_db(db_prefix)
         cur = conn.cursor()
         
-        # Check if the side column exists
-        cur.execute(
-            """
-            SELECT column_name 
-            FROM information_schema.columns 
-            WHERE table_name = %s AND column_name = 'side'
-            """, 
-            (table_name,)
-        )
-        
-        side_column_exists = cur.fetchone() is not None
-        
-        # Build the query
-        if side_column_exists:
-            # Include side column in the select list
-            columns_to_select = base_columns + ["side"]
+        # If last_n is provided, we need to get only the most recent N games per goalie
+        if last_n is not None:
+            # Use window function to get the most recent N games per goalie
+            partition_by = "player"
             
-            # If last_n is provided, we need to get only the most recent N games per goalie
-            if last_n is not None:
-                # Use window function to get the most recent N games per goalie
-                partition_by = "player"
-                
-                # Only include side in the partition if it's specified
-                if side in ['home', 'away']:
-                    partition_by += ", side"
-                
-                query = f"""
-                WITH ranked_games AS (
-                    SELECT 
-                        {', '.join(columns_to_select)},
-                        ROW_NUMBER() OVER (PARTITION BY {partition_by} ORDER BY date DESC) as row_num
-                    FROM {table_name}
-                    WHERE {where_clause}
-                )
-                SELECT {', '.join(columns_to_select)}
-                FROM ranked_games
-                WHERE row_num <= {last_n}
-                ORDER BY player, date DESC
-                """
-            else:
-                # No last_n, but we still need to handle duplicates if side is not specified
-                if side not in ['home', 'away']:
-                    # Get distinct player-date combinations to avoid duplicates
-                    query = f"""
-                    WITH ranked_records AS (
-                        SELECT 
-                            {', '.join(columns_to_select)},
-                            ROW_NUMBER() OVER (PARTITION BY date, player ORDER BY date DESC) as row_num
-                        FROM {table_name}
-                        WHERE {where_clause}
-                    )
-                    SELECT {', '.join(columns_to_select)}
-                    FROM ranked_records
-                    WHERE row_num = 1
-                    ORDER BY date DESC
-                    """
-                else:
-                    # Side is specified, use normal query
-                    query = f"""
-                    SELECT {', '.join(columns_to_select)}
-                    FROM {table_name}
-                    WHERE {where_clause}
-                    ORDER BY date DESC
-                    """
-        else:
-            # Side column doesn't exist
-            # If last_n is provided, we need to get only the most recent N games per goalie
-            if last_n is not None:
-                query = f"""
-                WITH ranked_games AS (
-                    SELECT 
-                        {', '.join(base_columns)},
-                        ROW_NUMBER() OVER (PARTITION BY player ORDER BY date DESC) as row_num
-                    FROM {table_name}
-                    WHERE {where_clause}
-                )
-                SELECT {', '.join(base_columns)}
-                FROM ranked_games
-                WHERE row_num <= {last_n}
-                ORDER BY player, date DESC
-                """
-            else:
-                # No last_n, use normal query
-                query = f"""
-                SELECT {', '.join(base_columns)}
+            # Only include side in the partition if it's specified
+            if side in ['home', 'away']:
+                partition_by += ", side"
+            
+            query = f"""
+            WITH ranked_games AS (
+                SELECT 
+                    {', '.join(columns_to_select)},
+                    ROW_NUMBER() OVER (PARTITION BY {partition_by} ORDER BY date DESC) as row_num
                 FROM {table_name}
                 WHERE {where_clause}
-                ORDER BY date DESC
-                """
+            )
+            SELECT {', '.join(columns_to_select)}
+            FROM ranked_games
+            WHERE row_num <= {last_n}
+            ORDER BY player, date DESC
+            """
+        else:
+            # (player, date) is the primary key, so every row is a distinct goalie game
+            query = f"""
+            SELECT {', '.join(columns_to_select)}
+            FROM {table_name}
+            WHERE {where_clause}
+            ORDER BY date DESC
+            """
         
         # Execute query
         cur.execute(query, params)
@@ -328,18 +216,132 @@ def get_goalie_stats(
     except Exception as e:
         logger.error(f"Error retrieving goalie stats: {e}")
         # Return an empty DataFrame with the expected columns if there's an error
-        columns = base_columns
-        
-        # Add side column to expected columns if it exists
-        if conn and side_column_exists:
-            columns.append('side')
-            
-        return pd.DataFrame(columns=columns)
+        return pd.DataFrame(columns=columns_to_select)
     finally:
         if conn:
             cur.close()
             disconnect_db(conn)
 
+# Windows (in games) maintained in goalie_rolling_stats
+ROLLING_WINDOWS = (5, 10, 20)
+
+# goalie_rolling_stats column -> averaged goalie stats column
+ROLLING_GOALIE_STATS = {
+    'avg_sv_pct': 'sv_pct',
+    'avg_hd_sv_pct': 'hdsv_pct',
+    'avg_md_sv_pct': 'mdsv_pct',
+    'avg_ld_sv_pct': 'ldsv_pct',
+    'avg_hd_shots': 'hd_shots_against',
+    'avg_md_shots': 'md_shots_against',
+    'avg_ld_shots': 'ld_shots_against',
+    'avg_gsaa': 'gsaa',
+}
+
+def refresh_goalie_rolling_stats(cursor, table_name: str = "goalie_stats_all", date_str: Optional[str] = None,
+                                 players: Optional[list] = None) -> int:
+    """
+    Recompute the goalie_rolling_stats rows that depend on the games of a date.
+
+    A game is part of the windows of the same goalie's next ROLLING_WINDOWS games, so
+    only those rows are rewritten, for the goalies who played on the date (or had a
+    rolling row for it, in case their game was removed). All windows are computed with
+    window functions in one statement. The caller commits.
+
+    Args:
+        cursor: Database cursor
+        table_name: The goalie stats table the rows are computed from
+        date_str: Date in 'YYYY-MM-DD' format of the saved games. All dates if None.
+        players: Goalies to refresh. Defaults to the goalies who played on date_str
+                 (all goalies if date_str is None).
+
+    Returns:
+        The number of rolling rows written
+    """
+    since = date_str or '-infinity'
+
+    # Rows of goalies no longer listed for the date are removed; their later windows change too
+    cursor.execute(
+        f"""
+        DELETE FROM goalie_rolling_stats r
+        WHERE r.source_table = %s AND {'r.date = %s' if date_str else 'r.date >= %s'}
+        AND NOT EXISTS (SELECT 1 FROM {table_name} t WHERE t.player = r.player AND t.date = r.date)
+        RETURNING r.player
+        """,
+        (table_name, since)
+    )
+    removed = {row[0] for row in cursor.fetchall()}
+
+    if players is None and date_str is not None:
+        cursor.execute(f"SELECT DISTINCT player FROM {table_name} WHERE date = %s", (date_str,))
+        players = [row[0] for row in cursor.fetchall()]
+    if players is not None:
+        players = sorted(set(players) | removed)
+        if not players:
+            return 0
+
+    windows = ', '.join(
+        f"w{n} AS (PARTITION BY player ORDER BY date ROWS BETWEEN {n - 1} PRECEDING AND CURRENT ROW)"
+        for n in ROLLING_WINDOWS
+    )
+    rolled_columns = ', '.join(
+        [f"COUNT(*) OVER w{n} AS games_{n}" for n in ROLLING_WINDOWS]
+        + [f"AVG({stat}) OVER w{n} AS {column}_{n}" for n in ROLLING_WINDOWS for column, stat in ROLLING_GOALIE_STATS.items()]
+    )
+    values = ', '.join(
+        "(" + ', '.join([str(n), f"games_{n}"] + [f"{column}_{n}" for column in ROLLING_GOALIE_STATS]) + ")"
+        for n in ROLLING_WINDOWS
+    )
+    columns = ['n_games', 'games'] + list(ROLLING_GOALIE_STATS)
+
+    cursor.execute(
+        f"""
+        WITH rolled AS (
+            SELECT player, date, {rolled_columns}
+            FROM {table_name}
+            WHERE {'player = ANY(%(players)s)' if players is not None else '1=1'}
+            WINDOW {windows}
+        ),
+        affected AS (
+            SELECT *, ROW_NUMBER() OVER (PARTITION BY player ORDER BY date) AS games_since
+            FROM rolled
+            WHERE date >= %(since)s
+        )
+        INSERT INTO goalie_rolling_stats (source_table, player, date, {', '.join(columns)})
+        SELECT %(table_name)s, player, date, {', '.join(f"v.{column}" for column in columns)}
+        FROM affected
+        CROSS JOIN LATERAL (VALUES {values}) AS v({', '.join(columns)})
+        {'WHERE games_since <= v.n_games' if date_str else ''}
+        ON CONFLICT (source_table, player, n_games, date) DO UPDATE
+        SET {', '.join(f"{column} = EXCLUDED.{column}" for column in columns[1:])}, last_updated = CURRENT_TIMESTAMP
+        """,
+        {'players': players, 'since': since, 'table_name': table_name}
+    )
+    return cursor.rowcount
+
+def rebuild_goalie_rolling_stats(table_name: str = "goalie_stats_all", db_prefix: str = "NST_DB_") -> int:
+    """
+    Recompute goalie_rolling_stats for every goalie and date of a goalie stats table.
+
+    Only needed once for rows saved before the table was maintained, since every saved
+    day refreshes the rows it affects.
+
+    Args:
+        table_name: The goalie stats table the rows are computed from
+        db_prefix: Database environment variable prefix
+
+    Returns:
+        The number of rolling rows written
+    """
+    conn = connect_db(db_prefix)
+    try:
+        with conn.cursor() as cursor:
+            rows = refresh_goalie_rolling_stats(cursor, table_name)
+        conn.commit()
+    finally:
+        disconnect_db(conn)
+    logger.info(f"Rebuilt {rows} rolling rows from {table_name}")
+    return rows
+
 def get_goalie_rolling_stats(
     goalie_name: str,
     date: str,
@@ -349,6 +351,10 @@ def get_goalie_rolling_stats(
 ) -> pd.DataFrame:
     """
     Get rolling average stats for a specific goalie up to a given date.
+
+    For the windows in ROLLING_WINDOWS the stats are read from goalie_rolling_stats when
+    its row for the goalie's last game up to the date is current (computed after every
+    change to the goalie's games up to then). Otherwise they are computed from table_name.
     
     Args:
         goalie_name: Name of the goalie
@@ -359,14 +365,32 @@ def get_goalie_rolling_stats(
     Returns:
         DataFrame with rolling average statistics
     """
+    rolling_query = f"""
+        WITH latest AS (
+            SELECT MAX(date) AS date, MAX(last_updated) AS last_updated
+            FROM {table_name}
+            WHERE player = %(player)s
+            AND date <= %(date)s
+        )
+        SELECT 
+            r.player,
+            {', '.join(f"r.{column}" for column in ROLLING_GOALIE_STATS)}
+        FROM goalie_rolling_stats r
+        JOIN latest ON r.date = latest.date
+        WHERE r.source_table = %(table_name)s
+        AND r.player = %(player)s
+        AND r.n_games = %(n_games)s
+        AND r.last_updated >= latest.last_updated
+    """
+
     query = f"""
         WITH recent_games AS (
             SELECT *
             FROM {table_name}
-            WHERE player = %s
-            AND date <= %s
+            WHERE player = %(player)s
+            AND date <= %(date)s
             ORDER BY date DESC
-            LIMIT %s
+            LIMIT %(n_games)s
         )
         SELECT 
             player,
@@ -381,18 +405,24 @@ def get_goalie_rolling_stats(
         FROM recent_games
         GROUP BY player
     """
+    params = {'player': goalie_name, 'date': date, 'n_games': n_games, 'table_name': table_name}
     
     conn = None
     try:
         conn = connect_db(db_prefix)
         cur = conn.cursor()
         
-        # Execute query
-        cur.execute(query, [goalie_name, date, n_games])
+        # Read the maintained windows when they are current
+        results = []
+        if n_games in ROLLING_WINDOWS:
+            cur.execute(rolling_query, params)
+            results = cur.fetchall()
+        if not results:
+            cur.execute(query, params)
+            results = cur.fetchall()
         
         # Fetch column names and results
         columns = [desc[0] for desc in cur.description]
-        results = cur.fetchall()
         df = pd.DataFrame(results, columns=columns)
         
         return df
@@ -405,6 +435,93 @@ def get_goalie_rolling_stats(
             cur.close()
             disconnect_db(conn)
 
+def get_goalie_rolling_stats_batch(
+    pairs: pd.DataFrame,
+    n_games: int = 5,
+    player_column: str = "player",
+    date_column: str = "date",
+    db_prefix: str = "NST_DB_",
+    table_name: str = "goalie_stats_all"
+) -> pd.DataFrame:
+    """
+    Get rolling average stats for many (goalie, date) pairs with one query.
+
+    The pairs are copied into a temp table, and each pair's last n_games games up to its
+    date are averaged by a LATERAL subquery (an index scan of the table's (player, date)
+    key), so thousands of pairs cost one connection and one round trip instead of one
+    get_goalie_rolling_stats call each.
+
+    Example:
+        features = get_goalie_rolling_stats_batch(starts[['player', 'date']], n_games=10)
+        starts = starts.join(features)
+
+    Args:
+        pairs: DataFrame with a goalie name and an as-of date per row
+        n_games: Number of games to look back
+        player_column: Column of pairs holding the goalie names
+        date_column: Column of pairs holding the dates (strings, dates or timestamps)
+        db_prefix: Database environment variable prefix
+        table_name: Name of the table to query (default: "goalie_stats_all")
+
+    Returns:
+        DataFrame with the same index as pairs: the number of games averaged (0 when the
+        goalie has no games up to the date) and the averages of get_goalie_rolling_stats
+    """
+    columns = ['games'] + list(ROLLING_GOALIE_STATS)
+    if pairs.empty:
+        return pd.DataFrame(columns=columns, index=pairs.index)
+
+    rows = pd.DataFrame({
+        'row_id': range(len(pairs)),
+        'player': pairs[player_column].to_numpy(),
+        'date': pd.to_datetime(pairs[date_column]).dt.strftime('%Y-%m-%d').to_numpy(),
+    })
+    buffer = StringIO()
+    rows.to_csv(buffer, header=False, index=False, na_rep='')
+    buffer.seek(0)
+
+    query = f"""
+        SELECT
+            p.row_id,
+            COALESCE(r.games, 0) AS games,
+            {', '.join(f"r.{column}" for column in ROLLING_GOALIE_STATS)}
+        FROM rolling_pairs p
+        LEFT JOIN LATERAL (
+            SELECT
+                COUNT(*) AS games,
+                {', '.join(f"AVG({source}) AS {column}" for column, source in ROLLING_GOALIE_STATS.items())}
+            FROM (
+                SELECT *
+                FROM {table_name} g
+                WHERE g.player = p.player
+                AND g.date <= p.date
+                ORDER BY g.date DESC
+                LIMIT %(n_games)s
+            ) recent_games
+        ) r ON TRUE
+        ORDER BY p.row_id
+    """
+
+    conn = connect_db(db_prefix)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("CREATE TEMP TABLE rolling_pairs (row_id integer, player text, date date) ON COMMIT DROP")
+            cur.copy_expert("COPY rolling_pairs FROM STDIN WITH (FORMAT csv, NULL '')", buffer)
+            cur.execute("ANALYZE rolling_pairs")
+            cur.execute(query, {'n_games': n_games})
+            results = cur.fetchall()
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        logger.error(f"Error retrieving batch rolling stats: {e}")
+        raise
+    finally:
+        disconnect_db(conn)
+
+    df = pd.DataFrame(results, columns=['row_id'] + columns)
+    df.index = pairs.index[df.pop('row_id').to_numpy()]
+    return df
+
 def get_goalie_comparison(
     date: str,
     n_games: int = 5,
@@ -471,141 +588,419 @@ def get_goalie_comparison(
             cur.close()
             disconnect_db(conn)
 
-def scrape_goalie_stats_range(
-    start_date: str,
-    end_date: str,
-    db_prefix: str = "NST_DB_",
-    delay_min: int = 3,
-    delay_max: int = 7,
-    situation: str = "all"
-) -> None:
+# Days and rows after which the range scrapers commit
+COMMIT_EVERY_DAYS = 7
+COMMIT_EVERY_ROWS = 2000
+
+class _CommitBatch:
     """
-    Scrape goalie stats across a date range and save to the database.
-    
-    This function iterates through each day in the provided date range.
-    For each day, it calls the scraper to retrieve data by setting both startdate
-    and enddate to the same value, then inserts that day's records into the database.
-    The conflict target is (player, date).
-    
+    Groups the days saved by a range scraper into transactions and adds up their merge counts.
+
+    Each day runs in a savepoint: a failed day is rolled back on its own and the
+    days before it stay in the batch. The batch is committed once it holds
+    batch_days days or batch_rows rows, and before the first day of each season of
+    table_name, so that its partition is created outside the batch (see ensure_stats_partition).
+    """
+
+    def __init__(self, conn, batch_days: int, batch_rows: int, table_name: Optional[str] = None):
+        self.conn = conn
+        self.batch_days = batch_days
+        self.batch_rows = batch_rows
+        self.table_name = table_name
+        self.partitions = set()
+        self.days = 0
+        self.rows = 0
+        self.changes = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'deleted': 0}
+
+    def run_day(self, scrape_day, date_str: str, situation: str, **kwargs) -> Optional[int]:
+        """
+        Runs a scrape_*_day function in a savepoint, without committing.
+
+        Args:
+            scrape_day: scrape_goalie_stats_day or scrape_team_stats_day
+            date_str: Date in 'YYYY-MM-DD' format
+            situation: The game situation
+            **kwargs: Passed to scrape_day
+
+        Returns:
+            The number of rows saved, or None if the scraper returned no data
+        """
+        if self.table_name is not None:
+            partition = _stats_partition_for_date(self.table_name, date_str)[0]
+            if partition not in self.partitions:
+                self.commit()
+                ensure_stats_partition(self.conn, self.table_name, date_str)
+                self.partitions.add(partition)
+
+        with self.conn.cursor() as cursor:
+            cursor.execute("SAVEPOINT scrape_day")
+        try:
+            day_changes = {}
+            rows = scrape_day(date_str, situation, self.conn, commit=False, stats=day_changes, **kwargs)
+        except Exception:
+            with self.conn.cursor() as cursor:
+                cursor.execute("ROLLBACK TO SAVEPOINT scrape_day")
+            raise
+        with self.conn.cursor() as cursor:
+            cursor.execute("RELEASE SAVEPOINT scrape_day")
+        for key, value in day_changes.items():
+            self.changes[key] += value
+
+        if rows:
+            self.days += 1
+            self.rows += rows
+            if self.days >= self.batch_days or self.rows >= self.batch_rows:
+                self.commit()
+        return rows
+
+    def summary(self) -> dict:
+        """Returns the run's merge counts, with 'changed' = inserted + updated + deleted."""
+        return {**self.changes, 'changed': self.changes['inserted'] + self.changes['updated'] + self.changes['deleted']}
+
+    def commit(self) -> None:
+        """Commits the days saved since the last commit."""
+        if self.conn.closed:
+            return
+        self.conn.commit()
+        if self.days:
+            logger.info(f"Committed {self.days} days ({self.rows} rows)")
+        self.days = 0
+        self.rows = 0
+
+# Season-partitioned stats tables (see sql/partition_nst_stats.sql)
+NST_STATS_TABLES = (
+    'goalie_stats_all', 'goalie_stats_5v5', 'goalie_stats_pk',
+    'team_stats_all', 'team_stats_5v5', 'team_stats_pk', 'team_stats_pp',
+)
+
+def _stats_partition(table_name: str, season: int) -> tuple:
+    """
+    Returns the partition of a stats table holding a season.
+
+    Partitions span July 1 to June 30, so a season's preseason, regular season and
+    playoffs share one partition.
+
     Args:
-        start_date: Start date in 'YYYY-MM-DD' format
-        end_date: End date in 'YYYY-MM-DD' format
+        table_name: The partitioned stats table (e.g., 'goalie_stats_all')
+        season: Season in YYYYYYYY format (e.g., 20242025)
+
+    Returns:
+        A (partition name, first date, end date (exclusive)) tuple
+    """
+    start_year = int(season) // 10000
+    return f"{table_name}_{start_year}{start_year + 1}", f"{start_year}-07-01", f"{start_year + 1}-07-01"
+
+def _stats_partition_for_date(table_name: str, date_str: str) -> tuple:
+    """
+    Returns the partition of a stats table holding a date (see _stats_partition).
+
+    Args:
+        table_name: The partitioned stats table (e.g., 'goalie_stats_all')
+        date_str: Date in 'YYYY-MM-DD' format
+
+    Returns:
+        A (partition name, first date, end date (exclusive)) tuple
+    """
+    year, month = int(date_str[:4]), int(date_str[5:7])
+    start_year = year if month >= 7 else year - 1
+    return _stats_partition(table_name, start_year * 10000 + start_year + 1)
+
+def ensure_stats_partition(conn, table_name: str, date_str: str) -> Optional[str]:
+    """
+    Creates the partition of a stats table for the season of a date if it does not exist.
+
+    Creating a partition locks the parent table in ACCESS EXCLUSIVE mode until the
+    transaction ends, blocking every reader. When conn has no open transaction the
+    partition is therefore created and committed in its own short transaction; the
+    range scrapers commit their batch before the first day of each season for this
+    (see _CommitBatch). Tables that have not been converted to partitioned tables yet
+    are left alone.
+
+    Args:
+        conn: Database connection
+        table_name: The stats table (e.g., 'goalie_stats_all')
+        date_str: Date in 'YYYY-MM-DD' format
+
+    Returns:
+        The partition name, or None if the table is not partitioned
+    """
+    partition, first_date, end_date = _stats_partition_for_date(table_name, date_str)
+    in_transaction = conn.info.transaction_status != psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT relkind = 'p', to_regclass(%s) IS NOT NULL FROM pg_class WHERE oid = to_regclass(%s)",
+            (f"public.{partition}", f"public.{table_name}")
+        )
+        row = cursor.fetchone()
+        if row is None or not row[0]:
+            return None
+        if row[1]:
+            return partition
+
+        if in_transaction:
+            logger.warning(f"Creating partition {partition} in an open transaction; {table_name} stays locked until it commits")
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS public.{partition} "
+            f"PARTITION OF public.{table_name} FOR VALUES FROM (%s) TO (%s)",
+            (first_date, end_date)
+        )
+    if not in_transaction:
+        conn.commit()
+    logger.info(f"Created partition {partition}")
+    return partition
+
+def freeze_stats_season(season: int, db_prefix: str = "NST_DB_", tables: tuple = NST_STATS_TABLES) -> None:
+    """
+    Marks a finished season's stats partitions read-only and freezes them.
+
+    Each partition is vacuumed with FREEZE, gets a trigger that rejects writes and has
+    autovacuum turned off, since a partition that is never written needs no vacuuming
+    (PostgreSQL still runs anti-wraparound vacuums, which find nothing to do).
+
+    Args:
+        season: Season in YYYYYYYY format (e.g., 20232024)
         db_prefix: Prefix for database environment variables
-        delay_min: Minimum delay between requests (seconds)
-        delay_max: Maximum delay between requests (seconds)
-        situation: The game situation to scrape ('all', '5v5', or 'pk'). Determines which table to use.
+        tables: The stats tables whose partitions to freeze. Defaults to all of them.
+    """
+    conn = connect_db(db_prefix)
+    try:
+        # VACUUM cannot run inside a transaction
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute(
+                """
+                CREATE OR REPLACE FUNCTION nst_stats_read_only() RETURNS trigger AS $$
+                BEGIN
+                    RAISE EXCEPTION '% is read-only (see nst_db_utils.thaw_stats_season)', TG_TABLE_NAME;
+                END;
+                $$ LANGUAGE plpgsql
+                """
+            )
+            for table_name in tables:
+                partition = _stats_partition(table_name, season)[0]
+                cursor.execute("SELECT to_regclass(%s)", (f"public.{partition}",))
+                if cursor.fetchone()[0] is None:
+                    logger.warning(f"Partition {partition} does not exist")
+                    continue
+                cursor.execute(f"VACUUM (FREEZE, ANALYZE) public.{partition}")
+                cursor.execute(f"DROP TRIGGER IF EXISTS read_only ON public.{partition}")
+                cursor.execute(
+                    f"CREATE TRIGGER read_only BEFORE INSERT OR UPDATE OR DELETE ON public.{partition} "
+                    f"FOR EACH ROW EXECUTE FUNCTION nst_stats_read_only()"
+                )
+                cursor.execute(f"ALTER TABLE public.{partition} SET (autovacuum_enabled = false)")
+                logger.info(f"Froze partition {partition}")
+    finally:
+        disconnect_db(conn)
+
+def thaw_stats_season(season: int, db_prefix: str = "NST_DB_", tables: tuple = NST_STATS_TABLES) -> None:
+    """
+    Makes a season's stats partitions writable again (undoes freeze_stats_season).
+
+    Args:
+        season: Season in YYYYYYYY format (e.g., 20232024)
+        db_prefix: Prefix for database environment variables
+        tables: The stats tables whose partitions to thaw. Defaults to all of them.
+    """
+    conn = connect_db(db_prefix)
+    try:
+        with conn.cursor() as cursor:
+            for table_name in tables:
+                partition = _stats_partition(table_name, season)[0]
+                cursor.execute("SELECT to_regclass(%s)", (f"public.{partition}",))
+                if cursor.fetchone()[0] is None:
+                    continue
+                cursor.execute(f"DROP TRIGGER IF EXISTS read_only ON public.{partition}")
+                cursor.execute(f"ALTER TABLE public.{partition} RESET (autovacuum_enabled)")
+                logger.info(f"Thawed partition {partition}")
+        conn.commit()
+    finally:
+        disconnect_db(conn)
+
+def _goalie_table_name(situation: str) -> str:
+    """
+    Returns the goalie stats table for a situation.
+
+    Args:
+        situation: The game situation ('all', '5v5', or 'pk')
+
+    Returns:
+        The table name
     """
-    # Determine table name based on situation
     if situation == "all":
-        table_name = "goalie_stats_all"
+        return "goalie_stats_all"
     elif situation == "5v5":
-        table_name = "goalie_stats_5v5"
+        return "goalie_stats_5v5"
     elif situation == "pk":
-        table_name = "goalie_stats_pk"
+        return "goalie_stats_pk"
     else:
         raise ValueError(f"Invalid situation: {situation}. Must be one of: 'all', '5v5', 'pk'")
-    
-    # Convert dates to datetime objects
-    start = datetime.strptime(start_date, '%Y-%m-%d')
-    end = datetime.strptime(end_date, '%Y-%m-%d')
-    
-    # Initialize counters for logging purposes
-    successful_scrapes = 0
-    failed_scrapes = 0
-    
-    current_date = start
-    while current_date <= end:
-        conn = None
-        cursor = None
-        try:
-            # Format the current day as a string
-            current_date_str = current_date.strftime('%Y-%m-%d')
-            logger.info(f"Scraping data for date: {current_date_str}")
-            
-            # Get the season for the current date
+
+def scrape_goalie_stats_day(date_str: str, situation: str, conn, commit: bool = True,
+                            stats: Optional[dict] = None) -> Optional[int]:
+    """
+    Scrape one day of goalie stats for a situation and save it to the database.
+
+    Every row gets the side and opponent of its goalie's game from the schedule
+    (see attach_game_sides). The season's partition is created if needed.
+
+    Args:
+        date_str: Date in 'YYYY-MM-DD' format
+        situation: The game situation to scrape ('all', '5v5', or 'pk')
+        conn: Database connection
+        commit: Whether to commit the day. Pass False to leave the transaction to the caller.
+        stats: Optional dict to which the merge counts (inserted, updated, unchanged, deleted) are added
+
+    Returns:
+        The number of rows saved, or None if the scraper returned no data
+    """
+    table_name = _goalie_table_name(situation)
+    current_date = datetime.strptime(date_str, '%Y-%m-%d')
+
+    # Get the season for the current date
+    try:
+        current_season = get_season_for_date(date_str)
+        logger.info(f"Using season: {current_season} for date: {date_str}")
+    except ValueError as e:
+        logger.error(f"Error determining season for {date_str}: {e}")
+        raise
+
+    # Scrape data for the day
+    goalie_stats_df = nst_on_ice_scraper(
+        fromseason=current_season,
+        thruseason=current_season,
+        startdate=date_str,
+        enddate=date_str,
+        sit=situation,
+        pos='G',
+        rate='n',
+        stdoi='g',
+        lines='single'
+    )
+
+    # Check if the DataFrame is empty or None
+    if goalie_stats_df is None:
+        logger.warning(f"No data returned from scraper for {date_str}")
+        return None
+
+    if goalie_stats_df.empty:
+        logger.warning(f"Empty DataFrame returned from scraper for {date_str}")
+        return None
+
+    # Add date information
+    goalie_stats_df['date'] = current_date.date()
+
+    # Add season information using the calculated season
+    goalie_stats_df['season'] = current_season
+
+    # Add the side and opponent of each goalie's game from the schedule
+    attach_game_sides(goalie_stats_df, date_str)
+
+    # Log details about the returned DataFrame
+    logger.info(f"Goalie Stats DataFrame shape: {goalie_stats_df.shape}")
+    logger.info(f"Goalie Stats DataFrame columns: {goalie_stats_df.columns.tolist()}")
+
+    # Insert (or update) the day's data with the appropriate table name
+    ensure_stats_partition(conn, table_name, date_str)
+    cursor = conn.cursor()
+    try:
+        counts = insert_goalie_stats_df(goalie_stats_df, conn, cursor, table_name, commit=commit)
+    finally:
+        cursor.close()
+
+    if stats is not None:
+        for key, value in counts.items():
+            stats[key] = stats.get(key, 0) + value
+
+    return len(goalie_stats_df)
+
+def scrape_goalie_stats_range(
+    start_date: str,
+    end_date: str,
+    db_prefix: str = "NST_DB_",
+    delay_min: int = 3,
+    delay_max: int = 7,
+    situation: str = "all",
+    conn=None,
+    commit_every_days: int = COMMIT_EVERY_DAYS,
+    commit_every_rows: int = COMMIT_EVERY_ROWS
+) -> dict:
+    """
+    Scrape goalie stats across a date range and save to the database.
+    
+    This function iterates through each day in the provided date range.
+    For each day, it calls the scraper to retrieve data by setting both startdate
+    and enddate to the same value, then inserts that day's records into the database.
+    The conflict target is (player, date).
+
+    The whole run uses one connection. Days are committed in batches of
+    commit_every_days days or commit_every_rows rows, and each day runs in a
+    savepoint so a failed day does not roll back the rest of its batch.
+
+    For long backfills that should survive restarts, use nst_job_queue instead.
+    
+    Args:
+        start_date: Start date in 'YYYY-MM-DD' format
+        end_date: End date in 'YYYY-MM-DD' format
+        db_prefix: Prefix for database environment variables
+        delay_min: Minimum delay between requests (seconds)
+        delay_max: Maximum delay between requests (seconds)
+        situation: The game situation to scrape ('all', '5v5', or 'pk'). Determines which table to use.
+        conn: Database connection to use (e.g., borrowed from a pool). Opened from db_prefix if None.
+        commit_every_days: Commit after this many saved days
+        commit_every_rows: Commit after this many saved rows
+
+    Returns:
+        Merge counts of the run: inserted, updated, unchanged and deleted rows, and
+        changed (inserted + updated + deleted). Re-scraping unchanged days changes nothing.
+    """
+    # Determine table name based on situation
+    table_name = _goalie_table_name(situation)
+    
+    # Convert dates to datetime objects
+    start = datetime.strptime(start_date, '%Y-%m-%d')
+    end = datetime.strptime(end_date, '%Y-%m-%d')
+    
+    # Initialize counters for logging purposes
+    successful_scrapes = 0
+    failed_scrapes = 0
+    
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_db(db_prefix)
+    batch = _CommitBatch(conn, commit_every_days, commit_every_rows, table_name)
+    try:
+        current_date = start
+        while current_date <= end:
+            # Format the current day as a string
+            current_date_str = current_date.strftime('%Y-%m-%d')
+            logger.info(f"Scraping data for date: {current_date_str}")
+
             try:
-                current_season = get_season_for_date(current_date_str)
-                logger.info(f"Using season: {current_season} for date: {current_date_str}")
-            except ValueError as e:
-                logger.error(f"Error determining season for {current_date_str}: {e}")
-                raise
-            
-            # Log the URL that will be used for scraping
-            scrape_url = (
-                f"https://www.naturalstattrick.com/playerteams.php?"
-                f"fromseason={current_season}&thruseason={current_season}&stype=2&sit={situation}"
-                f"&score=all&stdoi=g&rate=n&team=ALL&pos=S&loc=B&toi=0"
-                f"&gpfilt=gpdate&fd={current_date_str}&td={current_date_str}"
-                f"&tgp=410&lines=single&draftteam=ALL"
-            )
-            logger.info(f"Scraping URL: {scrape_url}")
-            
-            # Scrape data for the day
-            goalie_stats_df = nst_on_ice_scraper(
-                fromseason=current_season,
-                thruseason=current_season,
-                startdate=current_date_str,
-                enddate=current_date_str,
-                sit=situation,
-                pos='G',
-                rate='n',
-                stdoi='g',
-                lines='single'
-            )
-            
-            # Check if the DataFrame is empty or None
-            if goalie_stats_df is None:
-                logger.warning(f"No data returned from scraper for {current_date_str}")
-                failed_scrapes += 1
-                continue
-                
-            if goalie_stats_df.empty:
-                logger.warning(f"Empty DataFrame returned from scraper for {current_date_str}")
+                # Scrape and save the day's data
+                if batch.run_day(scrape_goalie_stats_day, current_date_str, situation) is None:
+                    failed_scrapes += 1
+                else:
+                    successful_scrapes += 1
+                    logger.info(f"Successfully saved data for {current_date_str}")
+            except Exception as e:
                 failed_scrapes += 1
-                continue
-            
-            # Add date information
-            goalie_stats_df['date'] = current_date.date()
-            
-            # Add season information using the calculated season
-            goalie_stats_df['season'] = current_season
-            
-            # Log details about the returned DataFrame
-            logger.info(f"Goalie Stats DataFrame shape: {goalie_stats_df.shape}")
-            logger.info(f"Goalie Stats DataFrame columns: {goalie_stats_df.columns.tolist()}")
-            logger.info(f"Sample data: {goalie_stats_df.head(2).to_dict('records')}")
-            
-            # Connect to the database
-            conn = connect_db(db_prefix)
-            if conn is None:
-                raise Exception("Failed to establish database connection")
-            cursor = conn.cursor()
-            
-            # Insert (or update) the day's data with the appropriate table name
-            insert_goalie_stats_df(goalie_stats_df, conn, cursor, table_name)
-            
-            successful_scrapes += 1
-            logger.info(f"Successfully saved data for {current_date_str}")
-        except Exception as e:
-            failed_scrapes += 1
-            logger.error(f"Error processing data for {current_date_str}: {str(e)}")
-            if conn:
-                conn.rollback()
-        finally:
-            # Close the database cursor and connection
-            if cursor:
-                cursor.close()
-            if conn:
-                disconnect_db(conn)
+                logger.error(f"Error processing data for {current_date_str}: {str(e)}")
             
-            # If not processing the last date, wait a random delay
-            if current_date < end:
+            # If not processing the last date, wait a random delay (pages replayed from the archive need none)
+            if current_date < end and not is_replaying():
                 delay = random.uniform(delay_min, delay_max)
                 logger.info(f"Waiting {delay:.1f} seconds before next request...")
                 time.sleep(delay)
             
             # Move on to the next day
             current_date += timedelta(days=1)
+    finally:
+        # Commit the days saved since the last batch, even if the run was interrupted
+        batch.commit()
+        if own_conn:
+            disconnect_db(conn)
     
     # Log the final summary
     logger.info(f"""
@@ -614,11 +1009,18 @@ def scrape_goalie_stats_range(
     - Failed scrapes: {failed_scrapes}
     - Date range: {start_date} to {end_date}
     - Table: {table_name}
+    - Rows changed: {batch.summary()['changed']} ({batch.summary()['unchanged']} unchanged)
     """)
+    return batch.summary()
 
-def insert_team_stats_df(df: pd.DataFrame, conn, cursor, table_name: str = "team_stats") -> None:
+def insert_team_stats_df(df: pd.DataFrame, conn, cursor, table_name: str = "team_stats", commit: bool = True,
+                         skip_unchanged: bool = True) -> dict:
     """
     Insert team stats dataframe into database using psycopg2.
+
+    The rows are copied into a staging table and merged with one INSERT ... ON CONFLICT
+    (team, date) DO UPDATE, replacing the stored rows of the frame's dates (of the frame's
+    side only, for home or away pages).
     
     This function cleans and maps the DataFrame's columns to match the team stats schema.
     
@@ -627,25 +1029,14 @@ def insert_team_stats_df(df: pd.DataFrame, conn, cursor, table_name: str = "team
         conn: Database connection
         cursor: Database cursor
         table_name: Name of the table to insert into (default: "team_stats")
+        commit: Whether to commit. Pass False to leave the transaction to the caller.
+        skip_unchanged: Leave rows identical to the stored ones untouched (including last_updated)
+
+    Returns:
+        Counts of rows inserted, updated, unchanged and deleted (see copy_upsert)
     """
-    # Clean column names to match PostgreSQL table
-    df.columns = (
-        df.columns
-        .str.replace('/', '_per_', regex=False)      # In case any '/' exists
-        .str.replace('%', '_pct', regex=False)       # Replace % with _pct
-        .str.replace(r'[^a-zA-Z0-9]', '_', regex=True)  # Replace other special characters
-        .str.replace(r'_+', '_', regex=True)         # Collapse multiple underscores
-        .str.strip('_')
-        .str.lower()
-    )
-    
-    # Replace placeholder '-' with None so that numeric columns are handled properly
-    df.replace("-", None, inplace=True)
-    
-    # Convert all numeric columns explicitly
-    numeric_columns = df.select_dtypes(include=['float64', 'int64']).columns.tolist()
-    for col in numeric_columns:
-        df[col] = pd.to_numeric(df[col], errors='coerce')
+    # Map the scraper's columns to the table's names and types ('-' and NaN become NULL)
+    df = TEAM_SCHEMA.to_db_frame(df)
     
     # Convert season format from string (e.g., "2023-24") to integer (e.g., 20232024)
     if 'season' in df.columns:
@@ -678,34 +1069,118 @@ def insert_team_stats_df(df: pd.DataFrame, conn, cursor, table_name: str = "team
     # Log cleaned columns for verification
     logger.info(f"Cleaned columns: {df.columns.tolist()}")
     
-    # First, delete any existing records for the date we're inserting
-    # This ensures we don't have duplicates
-    delete_query = f"""
-    DELETE FROM {table_name}
-    WHERE date = %(date)s;
+    # Merge the rows in one statement; teams no longer listed for the date are removed.
+    # Home and away pages each list one side of the date's games, so they only replace that side.
+    replace_columns = ['date', 'side'] if 'location' in df.columns and 'side' in df.columns else 'date'
+    if isinstance(replace_columns, list) and df['side'].isna().any():
+        # Without a side, a row cannot tell which side of the date it replaces (the other
+        # side's page would delete it again), so stale rows are only removed for known sides
+        logger.warning(f"No side found for {df.loc[df['side'].isna(), 'team'].tolist()} on "
+                       f"{df['date'].iloc[0]}; their stale rows are not replaced")
+    counts = copy_upsert(cursor, table_name, df, ['team', 'date'], replace_column=replace_columns,
+                         skip_unchanged=skip_unchanged)
+
+    # Update the running totals from the saved games onward, if any of them changed
+    if counts['inserted'] or counts['updated'] or counts['deleted']:
+        for date in sorted(df['date'].dropna().unique()):
+            refresh_team_cumulative_stats(cursor, table_name, str(date))
+    if commit:
+        conn.commit()
+    logger.info(f"Saved team stats to {table_name}: {counts}")
+    return counts
+
+def _team_table_name(situation: str) -> str:
     """
-    
-    # Get unique dates from the DataFrame
-    unique_dates = df['date'].unique()
-    for date in unique_dates:
-        cursor.execute(delete_query, {'date': date})
-    
-    # Dynamically create the INSERT statement based on the DataFrame columns
-    columns = df.columns.tolist()
-    placeholders = [f"%({col})s" for col in columns]
-    
-    insert_query = f"""
-    INSERT INTO {table_name} (
-        {', '.join(columns)}
-    ) VALUES (
-        {', '.join(placeholders)}
-    );
+    Returns the team stats table for a situation.
+
+    Args:
+        situation: The game situation ('all', '5v5', 'pk', or 'pp')
+
+    Returns:
+        The table name
     """
-    
-    # Convert DataFrame to a list of dictionaries for batch insertion
-    records = df.to_dict('records')
-    cursor.executemany(insert_query, records)
-    conn.commit()
+    if situation == "all":
+        return "team_stats_all"
+    elif situation == "5v5":
+        return "team_stats_5v5"
+    elif situation == "pk":
+        return "team_stats_pk"
+    elif situation == "pp":
+        return "team_stats_pp"
+    else:
+        raise ValueError(f"Invalid situation: {situation}. Must be one of: 'all', '5v5', 'pk', 'pp'")
+
+def scrape_team_stats_day(date_str: str, situation: str, conn, stype: int = 2, loc: str = 'B', commit: bool = True,
+                          stats: Optional[dict] = None) -> Optional[int]:
+    """
+    Scrape one day of team stats for a situation and save it to the database.
+
+    Args:
+        date_str: Date in 'YYYY-MM-DD' format
+        situation: The game situation to scrape ('all', '5v5', 'pk', or 'pp')
+        conn: Database connection
+        stype: Type of statistics to retrieve. Defaults to 2 for regular season.
+        loc: 'B' for all games, 'H' for home games or 'A' for away games. Home and away
+             rows get a location column ('home' or 'away'). Every row gets the side and
+             opponent of its team's game from the schedule (see attach_game_sides).
+             The season's partition is created if needed.
+        commit: Whether to commit the day. Pass False to leave the transaction to the caller.
+        stats: Optional dict to which the merge counts (inserted, updated, unchanged, deleted) are added
+
+    Returns:
+        The number of rows saved, or None if the scraper returned no data
+    """
+    table_name = _team_table_name(situation)
+    current_date = datetime.strptime(date_str, '%Y-%m-%d')
+
+    # Scrape data for the day using nst_team_on_ice_scraper
+    # Set both startdate and enddate to the same value to ensure correct URL construction
+    team_stats_df = nst_team_on_ice_scraper(
+        startdate=date_str,
+        enddate=date_str,
+        sit=situation,
+        stype=stype,
+        loc=loc
+    )
+
+    if team_stats_df is None or team_stats_df.empty:
+        logger.warning(f"No team data returned from scraper for {date_str} (loc={loc})")
+        return None
+
+    # Add date information
+    team_stats_df['date'] = current_date.date()
+
+    # Add season information for logging
+    year = current_date.year
+    month = current_date.month
+    season = f"{year-1}-{str(year)[2:]}" if month < 7 else f"{year}-{str(year+1)[2:]}"
+    team_stats_df['season'] = season
+
+    # Add location column
+    if loc == 'H':
+        team_stats_df['location'] = 'home'
+    elif loc == 'A':
+        team_stats_df['location'] = 'away'
+
+    # Add the side and opponent of each team's game from the schedule
+    attach_game_sides(team_stats_df, date_str, full_names=True)
+
+    # Log details about the returned DataFrame
+    logger.info(f"Team Stats DataFrame shape: {team_stats_df.shape}")
+
+    # Insert (or update) the day's data with the appropriate table name
+    ensure_stats_partition(conn, table_name, date_str)
+    cursor = conn.cursor()
+    try:
+        counts = insert_team_stats_df(team_stats_df, conn, cursor, table_name, commit=commit)
+    finally:
+        cursor.close()
+
+    if stats is not None:
+        for key, value in counts.items():
+            stats[key] = stats.get(key, 0) + value
+
+    return len(team_stats_df)
 
 def scrape_team_stats_range(
     start_date: str,
@@ -714,14 +1189,23 @@ def scrape_team_stats_range(
     delay_min: int = 3,
     delay_max: int = 7,
     situation: str = "all",
-    stype: int = 2
-) -> None:
+    stype: int = 2,
+    conn=None,
+    commit_every_days: int = COMMIT_EVERY_DAYS,
+    commit_every_rows: int = COMMIT_EVERY_ROWS
+) -> dict:
     """
     Scrape team stats across a date range and save to the database.
     
     This function iterates through each day in the provided date range.
     For each day, it calls the team scraper to retrieve data by setting both startdate
     and enddate to the same value, then inserts that day's records into the database.
+
+    The whole run uses one connection. Days are committed in batches of
+    commit_every_days days or commit_every_rows rows, and each day runs in a
+    savepoint so a failed day does not roll back the rest of its batch.
+
+    For long backfills that should survive restarts, use nst_job_queue instead.
     
     Args:
         start_date: Start date in 'YYYY-MM-DD' format
@@ -731,18 +1215,16 @@ def scrape_team_stats_range(
         delay_max: Maximum delay between requests (seconds)
         situation: The game situation to scrape ('all', '5v5', 'pk', or 'pp'). Determines which table to use.
         stype: Type of statistics to retrieve. Defaults to 2 for regular season.
+        conn: Database connection to use (e.g., borrowed from a pool). Opened from db_prefix if None.
+        commit_every_days: Commit after this many saved days
+        commit_every_rows: Commit after this many saved rows
+
+    Returns:
+        Merge counts of the run: inserted, updated, unchanged and deleted rows, and
+        changed (inserted + updated + deleted). Re-scraping unchanged days changes nothing.
     """
     # Determine table name based on situation
-    if situation == "all":
-        table_name = "team_stats_all"
-    elif situation == "5v5":
-        table_name = "team_stats_5v5"
-    elif situation == "pk":
-        table_name = "team_stats_pk"
-    elif situation == "pp":
-        table_name = "team_stats_pp"
-    else:
-        raise ValueError(f"Invalid situation: {situation}. Must be one of: 'all', '5v5', 'pk', 'pp'")
+    table_name = _team_table_name(situation)
     
     # Convert dates to datetime objects
     start = datetime.strptime(start_date, '%Y-%m-%d')
@@ -752,68 +1234,41 @@ def scrape_team_stats_range(
     successful_scrapes = 0
     failed_scrapes = 0
     
-    current_date = start
-    while current_date <= end:
-        conn = None
-        cursor = None
-        try:
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_db(db_prefix)
+    batch = _CommitBatch(conn, commit_every_days, commit_every_rows, table_name)
+    try:
+        current_date = start
+        while current_date <= end:
             # Format the current day as a string
             current_date_str = current_date.strftime('%Y-%m-%d')
             logger.info(f"Scraping team data for date: {current_date_str}")
+
+            try:
+                # Scrape and save the day's data
+                if batch.run_day(scrape_team_stats_day, current_date_str, situation, stype=stype) is None:
+                    failed_scrapes += 1
+                else:
+                    successful_scrapes += 1
+                    logger.info(f"Successfully saved team data for {current_date_str}")
+            except Exception as e:
+                failed_scrapes += 1
+                logger.error(f"Error processing team data for {current_date_str}: {str(e)}")
             
-            # Scrape data for the day using nst_team_on_ice_scraper
-            # Set both startdate and enddate to the same value to ensure correct URL construction
-            team_stats_df = nst_team_on_ice_scraper(
-                startdate=current_date_str,
-                enddate=current_date_str,
-                sit=situation,
-                stype=stype
-            )
-            
-            # Add date information
-            team_stats_df['date'] = current_date.date()
-            
-            # Add season information for logging
-            year = current_date.year
-            month = current_date.month
-            season = f"{year-1}-{str(year)[2:]}" if month < 7 else f"{year}-{str(year+1)[2:]}"
-            team_stats_df['season'] = season
-            
-            # Log details about the returned DataFrame
-            logger.info(f"Team Stats DataFrame shape: {team_stats_df.shape}")
-            logger.info(f"Team Stats DataFrame columns: {team_stats_df.columns.tolist()}")
-            
-            # Connect to the database
-            conn = connect_db(db_prefix)
-            if conn is None:
-                raise Exception("Failed to establish database connection")
-            cursor = conn.cursor()
-            
-            # Insert (or update) the day's data with the appropriate table name
-            insert_team_stats_df(team_stats_df, conn, cursor, table_name)
-            
-            successful_scrapes += 1
-            logger.info(f"Successfully saved team data for {current_date_str}")
-        except Exception as e:
-            failed_scrapes += 1
-            logger.error(f"Error processing team data for {current_date_str}: {str(e)}")
-            if conn:
-                conn.rollback()
-        finally:
-            # Close the database cursor and connection
-            if cursor:
-                cursor.close()
-            if conn:
-                disconnect_db(conn)
-            
-            # If not processing the last date, wait a random delay
-            if current_date < end:
+            # If not processing the last date, wait a random delay (pages replayed from the archive need none)
+            if current_date < end and not is_replaying():
                 delay = random.uniform(delay_min, delay_max)
                 logger.info(f"Waiting {delay:.1f} seconds before next request...")
                 time.sleep(delay)
             
             # Move on to the next day
             current_date += timedelta(days=1)
+    finally:
+        # Commit the days saved since the last batch, even if the run was interrupted
+        batch.commit()
+        if own_conn:
+            disconnect_db(conn)
     
     # Log the final summary
     logger.info(f"""
@@ -822,7 +1277,398 @@ def scrape_team_stats_range(
     - Failed scrapes: {failed_scrapes}
     - Date range: {start_date} to {end_date}
     - Table: {table_name}
+    - Rows changed: {batch.summary()['changed']} ({batch.summary()['unchanged']} unchanged)
     """)
+    return batch.summary()
+
+# Column names and types of the stats tables by (connection, table), read once per process
+_column_types_cache = {}
+
+def get_stats_column_types(cursor, table_name: str) -> list:
+    """
+    Returns the columns of a stats table with their data types.
+
+    The columns are read from information_schema on first use and cached for the
+    connection's database, so repeated queries do not probe the catalog.
+
+    Args:
+        cursor: Database cursor
+        table_name: The stats table (e.g., 'team_stats_all')
+
+    Returns:
+        A list of (column name, data type) tuples, in table order
+    """
+    key = (cursor.connection.dsn, table_name)
+    if key not in _column_types_cache:
+        cursor.execute(
+            """
+            SELECT column_name, data_type 
+            FROM information_schema.columns 
+            WHERE table_schema = 'public' AND table_name = %s
+            ORDER BY ordinal_position
+            """,
+            (table_name,)
+        )
+        _column_types_cache[key] = cursor.fetchall()
+    return _column_types_cache[key]
+
+def _team_aggregates(column_info: list) -> list:
+    """
+    Returns the expressions that aggregate team games: sums for counts, percentages
+    recomputed from the summed counts, and averages for other rates.
+
+    Args:
+        column_info: The table's (column name, data type) tuples (see get_stats_column_types)
+
+    Returns:
+        A list of (column, kind, SQL expression) tuples (gp, stats, last_game_date and season).
+        kind is 'sum' (summed per game), 'avg' (averaged per game) or 'derived' (computed
+        from other columns or the game dates, such as percentages recomputed from counts).
+    """
+    # First, identify numeric columns for aggregation
+    numeric_columns = []
+
+    for col_name, data_type in column_info:
+        if col_name == 'team':
+            continue  # Skip team as it's our grouping column
+        elif col_name in ['date', 'last_updated', 'season']:
+            # Skip date-related columns for aggregation
+            continue
+        elif col_name in ['side', 'opponent']:
+            # Keep side for grouping if needed
+            continue
+        elif data_type in ['integer', 'numeric', 'real', 'double precision']:
+            numeric_columns.append(col_name)
+
+    # Build aggregation expressions
+    agg_expressions = []
+
+    # Special handling for GP (games played) - we count distinct dates
+    agg_expressions.append(('gp', 'derived', "COUNT(DISTINCT date)"))
+
+    # For other numeric columns, use SUM or AVG as appropriate
+    for col in numeric_columns:
+        if col == 'gp':
+            continue  # Skip GP as we're handling it specially
+        elif col in ['cf_pct', 'ff_pct', 'sf_pct', 'gf_pct', 'xgf_pct', 
+                   'scf_pct', 'scsf_pct', 'scgf_pct', 'hdcf_pct', 'hdsf_pct', 
+                   'hdgf_pct', 'mdcf_pct', 'mdsf_pct', 'mdgf_pct', 'ldcf_pct', 
+                   'ldsf_pct', 'ldgf_pct', 'sh_pct', 'sv_pct', 'pdo', 
+                   'scsh_pct', 'scsv_pct', 'hdsh_pct', 'hdsv_pct', 'mdsh_pct', 
+                   'mdsv_pct', 'ldsh_pct', 'ldsv_pct', 'point_pct']:
+            # For percentage columns, use weighted average
+            # For example, CF% should be calculated as total CF / (total CF + total CA)
+            if col == 'cf_pct':
+                agg_expressions.append(('cf_pct', 'derived', "ROUND(CASE WHEN SUM(cf + ca) > 0 THEN (SUM(cf) * 100.0 / SUM(cf + ca)) ELSE NULL END, 3)"))
+            elif col == 'ff_pct':
+                agg_expressions.append(('ff_pct', 'derived', "ROUND(CASE WHEN SUM(ff + fa) > 0 THEN (SUM(ff) * 100.0 / SUM(ff + fa)) ELSE NULL END, 3)"))
+            elif col == 'sf_pct':
+                agg_expressions.append(('sf_pct', 'derived', "ROUND(CASE WHEN SUM(sf + sa) > 0 THEN (SUM(sf) * 100.0 / SUM(sf + sa)) ELSE NULL END, 3)"))
+            elif col == 'gf_pct':
+                agg_expressions.append(('gf_pct', 'derived', "ROUND(CASE WHEN SUM(gf + ga) > 0 THEN (SUM(gf) * 100.0 / SUM(gf + ga)) ELSE NULL END, 3)"))
+            elif col == 'xgf_pct':
+                agg_expressions.append(('xgf_pct', 'derived', "ROUND(CASE WHEN SUM(xgf + xga) > 0 THEN (SUM(xgf) * 100.0 / SUM(xgf + xga)) ELSE NULL END, 3)"))
+            elif col == 'scf_pct':
+                agg_expressions.append(('scf_pct', 'derived', "ROUND(CASE WHEN SUM(scf + sca) > 0 THEN (SUM(scf) * 100.0 / SUM(scf + sca)) ELSE NULL END, 3)"))
+            elif col == 'scsf_pct':
+                agg_expressions.append(('scsf_pct', 'derived', "ROUND(CASE WHEN SUM(scsf + scsa) > 0 THEN (SUM(scsf) * 100.0 / SUM(scsf + scsa)) ELSE NULL END, 3)"))
+            elif col == 'scgf_pct':
+                agg_expressions.append(('scgf_pct', 'derived', "ROUND(CASE WHEN SUM(scgf + scga) > 0 THEN (SUM(scgf) * 100.0 / SUM(scgf + scga)) ELSE NULL END, 3)"))
+            elif col == 'hdcf_pct':
+                agg_expressions.append(('hdcf_pct', 'derived', "ROUND(CASE WHEN SUM(hdcf + hdca) > 0 THEN (SUM(hdcf) * 100.0 / SUM(hdcf + hdca)) ELSE NULL END, 3)"))
+            elif col == 'hdsf_pct':
+                agg_expressions.append(('hdsf_pct', 'derived', "ROUND(CASE WHEN SUM(hdsf + hdsa) > 0 THEN (SUM(hdsf) * 100.0 / SUM(hdsf + hdsa)) ELSE NULL END, 3)"))
+            elif col == 'hdgf_pct':
+                agg_expressions.append(('hdgf_pct', 'derived', "ROUND(CASE WHEN SUM(hdgf + hdga) > 0 THEN (SUM(hdgf) * 100.0 / SUM(hdgf + hdga)) ELSE NULL END, 3)"))
+            elif col == 'mdcf_pct':
+                agg_expressions.append(('mdcf_pct', 'derived', "ROUND(CASE WHEN SUM(mdcf + mdca) > 0 THEN (SUM(mdcf) * 100.0 / SUM(mdcf + mdca)) ELSE NULL END, 3)"))
+            elif col == 'mdsf_pct':
+                agg_expressions.append(('mdsf_pct', 'derived', "ROUND(CASE WHEN SUM(mdsf + mdsa) > 0 THEN (SUM(mdsf) * 100.0 / SUM(mdsf + mdsa)) ELSE NULL END, 3)"))
+            elif col == 'mdgf_pct':
+                agg_expressions.append(('mdgf_pct', 'derived', "ROUND(CASE WHEN SUM(mdgf + mdga) > 0 THEN (SUM(mdgf) * 100.0 / SUM(mdgf + mdga)) ELSE NULL END, 3)"))
+            elif col == 'ldcf_pct':
+                agg_expressions.append(('ldcf_pct', 'derived', "ROUND(CASE WHEN SUM(ldcf + ldca) > 0 THEN (SUM(ldcf) * 100.0 / SUM(ldcf + ldca)) ELSE NULL END, 3)"))
+            elif col == 'ldsf_pct':
+                agg_expressions.append(('ldsf_pct', 'derived', "ROUND(CASE WHEN SUM(ldsf + ldsa) > 0 THEN (SUM(ldsf) * 100.0 / SUM(ldsf + ldsa)) ELSE NULL END, 3)"))
+            elif col == 'ldgf_pct':
+                agg_expressions.append(('ldgf_pct', 'derived', "ROUND(CASE WHEN SUM(ldgf + ldga) > 0 THEN (SUM(ldgf) * 100.0 / SUM(ldgf + ldga)) ELSE NULL END, 3)"))
+            elif col == 'sh_pct':
+                agg_expressions.append(('sh_pct', 'derived', "ROUND(CASE WHEN SUM(sf) > 0 THEN (SUM(gf) * 100.0 / SUM(sf)) ELSE NULL END, 3)"))
+            elif col == 'sv_pct':
+                agg_expressions.append(('sv_pct', 'derived', "ROUND(CASE WHEN SUM(sa) > 0 THEN ((SUM(sa) - SUM(ga)) * 100.0 / SUM(sa)) ELSE NULL END, 3)"))
+            elif col == 'pdo':
+                agg_expressions.append(('pdo', 'derived', "ROUND(CASE WHEN (SUM(sf) > 0 AND SUM(sa) > 0) THEN ((SUM(gf) * 100.0 / SUM(sf)) + ((SUM(sa) - SUM(ga)) * 100.0 / SUM(sa))) / 100.0 ELSE NULL END, 3)"))
+            else:
+                # For other percentage columns, use AVG
+                agg_expressions.append((col, 'avg', f"ROUND(AVG({col}), 3)"))
+        elif col in ['toi']:
+            # For time on ice, use AVG
+            agg_expressions.append((col, 'avg', f"ROUND(AVG({col}), 3)"))
+        else:
+            # For count columns, use SUM
+            # Only round non-integer values (like expected goals)
+            if col in ['xgf', 'xga']:
+                agg_expressions.append((col, 'sum', f"ROUND(SUM({col}), 3)"))
+            else:
+                agg_expressions.append((col, 'sum', f"SUM({col})"))
+
+    # Add MAX for the most recent date and season
+    agg_expressions.append(('last_game_date', 'derived', "MAX(date)"))
+    agg_expressions.append(('season', 'derived', "MAX(season)"))
+    return agg_expressions
+
+def _goalie_aggregates(column_info: list) -> list:
+    """
+    Returns the expressions that aggregate goalie games: sums for counts, GSAA and
+    expected goals, save percentages weighted by shots against, goals-against averages
+    weighted by time on ice and averages for other rates.
+
+    Weighting keeps each rate in the units it is stored in.
+
+    Args:
+        column_info: The table's (column name, data type) tuples (see get_stats_column_types)
+
+    Returns:
+        A list of (column, kind, SQL expression) tuples (gp, team, stats, last_game_date and
+        season), with kinds as in _team_aggregates
+    """
+    columns = {col_name for col_name, _ in column_info}
+    agg_expressions = [
+        ('gp', 'derived', "COUNT(DISTINCT date)"),
+        ('team', 'derived', "(ARRAY_AGG(team ORDER BY date DESC))[1]"),
+    ]
+    for col_name, data_type in column_info:
+        if col_name in ['player', 'team', 'date', 'last_updated', 'season', 'side', 'opponent', 'gp']:
+            continue
+        if data_type not in ['integer', 'numeric', 'real', 'double precision']:
+            continue
+        prefix = col_name[:2] if col_name[:2] in ('hd', 'md', 'ld') else ''
+        shots = f"{prefix}_shots_against" if prefix else "shots_against"
+        if col_name.endswith('sv_pct') and shots in columns:
+            agg_expressions.append(
+                (col_name, 'derived', f"ROUND(SUM({col_name} * {shots}) / NULLIF(SUM(CASE WHEN {col_name} IS NOT NULL THEN {shots} END), 0), 3)")
+            )
+        elif col_name.endswith('gaa') and 'toi' in columns:
+            agg_expressions.append(
+                (col_name, 'derived', f"ROUND(SUM({col_name} * toi) / NULLIF(SUM(CASE WHEN {col_name} IS NOT NULL THEN toi END), 0), 3)")
+            )
+        elif data_type == 'integer' or col_name in ['toi', 'xg_against'] or col_name.endswith('gsaa'):
+            agg_expressions.append((col_name, 'sum', f"SUM({col_name})"))
+        else:
+            agg_expressions.append((col_name, 'avg', f"ROUND(AVG({col_name}), 3)"))
+    agg_expressions.append(('last_game_date', 'derived', "MAX(date)"))
+    agg_expressions.append(('season', 'derived', "MAX(season)"))
+    return agg_expressions
+
+def _select_list(aggregates: list) -> str:
+    """Renders (column, kind, expression) tuples as a SELECT list."""
+    return ', '.join(f"{expression} as {column}" for column, _, expression in aggregates)
+
+def _cumulative_columns(column_info: list) -> tuple:
+    """
+    Splits the stats of a team table into summed columns and averaged columns, following
+    the kinds of _team_aggregates (derived columns, such as percentages recomputed from
+    counts, need no running totals of their own).
+
+    Args:
+        column_info: The table's (column name, data type) tuples (see get_stats_column_types)
+
+    Returns:
+        A (summed columns, averaged columns) tuple
+    """
+    summed, averaged = [], []
+    for column, kind, _ in _team_aggregates(column_info):
+        if kind == 'sum':
+            summed.append(column)
+        elif kind == 'avg':
+            averaged.append(column)
+    return summed, averaged
+
+def _cumulative_select(table_name: str, column_info: list, teams_filter: str = "1=1") -> str:
+    """
+    Returns the query computing the running totals of a team table in game order, for all
+    games ('all' scope) and for home and away games separately.
+
+    Args:
+        table_name: The team stats table
+        column_info: The table's (column name, data type) tuples
+        teams_filter: Condition restricting the teams
+
+    Returns:
+        The SQL query
+    """
+    summed, averaged = _cumulative_columns(column_info)
+    running = ', '.join(
+        [f"SUM(COALESCE({column}, 0)) OVER w AS {column}" for column in summed]
+        + [f"SUM({column}) OVER w AS {column}, COUNT({column}) OVER w AS {column}_n" for column in averaged]
+    )
+    return f"""
+        SELECT team, 'all' AS scope, ROW_NUMBER() OVER w AS game_no, date, season, {running}
+        FROM {table_name}
+        WHERE {teams_filter}
+        WINDOW w AS (PARTITION BY team ORDER BY date ROWS UNBOUNDED PRECEDING)
+        UNION ALL
+        SELECT team, side AS scope, ROW_NUMBER() OVER w AS game_no, date, season, {running}
+        FROM {table_name}
+        WHERE {teams_filter} AND side IN ('home', 'away')
+        WINDOW w AS (PARTITION BY team, side ORDER BY date ROWS UNBOUNDED PRECEDING)
+    """
+
+def build_team_cumulative_stats(situation: str = "all", db_prefix: str = "NST_DB_") -> int:
+    """
+    Create (or rebuild) the prefix-sum table of a team stats table.
+
+    <table>_cumulative (e.g., team_stats_all_cumulative) holds, for every team and scope
+    ('all', 'home' or 'away') and each of its games in date order, the running totals of
+    the stats (and the running count of values for averaged stats). The totals of any
+    window of games are the difference of two rows, which get_team_stats uses for last_n
+    queries. Once built, the table is kept current by insert_team_stats_df.
+
+    Args:
+        situation: The game situation ('all', '5v5', 'pk', or 'pp')
+        db_prefix: Database environment variable prefix
+
+    Returns:
+        The number of rows written
+    """
+    table_name = _team_table_name(situation)
+    cumulative = f"{table_name}_cumulative"
+    conn = connect_db(db_prefix)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {cumulative}")
+            cursor.execute(f"CREATE TABLE {cumulative} AS {_cumulative_select(table_name, get_stats_column_types(cursor, table_name))}")
+            rows = cursor.rowcount
+            cursor.execute(f"ALTER TABLE {cumulative} ADD PRIMARY KEY (team, scope, game_no)")
+            cursor.execute(f"CREATE INDEX idx_{cumulative}_date ON {cumulative}(team, scope, date)")
+        conn.commit()
+    finally:
+        disconnect_db(conn)
+    _cumulative_tables.discard((conn.dsn, table_name))
+    logger.info(f"Built {cumulative} with {rows} rows")
+    return rows
+
+# (connection, table) pairs known to have a prefix-sum table
+_cumulative_tables = set()
+
+def _has_cumulative(cursor, table_name: str) -> bool:
+    """Checks whether a team table has a prefix-sum table (see build_team_cumulative_stats)."""
+    key = (cursor.connection.dsn, table_name)
+    if key not in _cumulative_tables:
+        cursor.execute("SELECT to_regclass(%s)", (f"public.{table_name}_cumulative",))
+        if cursor.fetchone()[0] is None:
+            return False
+        _cumulative_tables.add(key)
+    return True
+
+def refresh_team_cumulative_stats(cursor, table_name: str, date_str: str, teams: Optional[list] = None) -> int:
+    """
+    Recompute the prefix-sum rows that change when the games of a date are saved.
+
+    Running totals change from the date onward, for the teams who played on it (or
+    had a row for it, in case their game was removed). Does nothing if the table has
+    no prefix-sum table. The caller commits.
+
+    Args:
+        cursor: Database cursor
+        table_name: The team stats table
+        date_str: Date in 'YYYY-MM-DD' format of the saved games
+        teams: Teams to recompute. Defaults to the teams of the date.
+
+    Returns:
+        The number of rows written
+    """
+    if not _has_cumulative(cursor, table_name):
+        return 0
+    cumulative = f"{table_name}_cumulative"
+    if teams is None:
+        cursor.execute(
+            f"SELECT team FROM {table_name} WHERE date = %s UNION SELECT team FROM {cumulative} WHERE date = %s",
+            (date_str, date_str)
+        )
+        teams = [row[0] for row in cursor.fetchall()]
+    if not teams:
+        return 0
+
+    params = {'teams': teams, 'date': date_str}
+    cursor.execute(f"DELETE FROM {cumulative} WHERE team = ANY(%(teams)s) AND date >= %(date)s", params)
+    cursor.execute(
+        f"""
+        INSERT INTO {cumulative}
+        SELECT * FROM ({_cumulative_select(table_name, get_stats_column_types(cursor, table_name), 'team = ANY(%(teams)s)')}) running
+        WHERE date >= %(date)s
+        """,
+        params
+    )
+    return cursor.rowcount
+
+def _cumulative_team_query(table_name: str, column_info: list, last_n: int, team: Optional[str],
+                           start_date: Optional[str], end_date: Optional[str], side: Optional[str]) -> tuple:
+    """
+    Builds the last_n query of get_team_stats on the prefix-sum table.
+
+    For each team, the window ends at its last game up to end_date and starts after
+    the later of its last_n-th game before that and its last game before start_date.
+    The window totals are then aggregated with the expressions of _team_aggregates,
+    so percentages are derived from the summed counts exactly as in the direct query.
+
+    Returns:
+        A (query, params) tuple
+    """
+    cumulative = f"{table_name}_cumulative"
+    summed, averaged = _cumulative_columns(column_info)
+    conditions = ["scope = %(scope)s"]
+    params = {'scope': side if side in ['home', 'away'] else 'all', 'last_n': last_n, 'start_date': start_date}
+    if team:
+        conditions.append("team = %(team)s")
+        params['team'] = team
+    if end_date:
+        conditions.append("date <= %(end_date)s")
+        params['end_date'] = end_date
+
+    totals = ', '.join(
+        [f"hi.{column} - COALESCE(lo.{column}, 0) AS {column}" for column in summed]
+        + [f"(hi.{column} - COALESCE(lo.{column}, 0)) / NULLIF(hi.{column}_n - COALESCE(lo.{column}_n, 0), 0) AS {column}"
+           for column in averaged]
+    )
+    start_game = "(SELECT MAX(c.game_no) FROM {0} c WHERE c.team = hi.team AND c.scope = hi.scope AND c.date < %(start_date)s)".format(cumulative)
+
+    # Each window is one row, so the aggregates return its totals; gp and last_game_date
+    # are columns of the window instead of aggregates of its dates
+    window_columns = {'gp': "MAX(gp)", 'last_game_date': "MAX(last_game_date)"}
+    select_list = _select_list([
+        (column, kind, window_columns.get(column, expression)) for column, kind, expression in _team_aggregates(column_info)
+    ])
+    group_by = "team"
+    if side in ['home', 'away']:
+        select_list += ", side"
+        group_by += ", side"
+
+    query = f"""
+        WITH hi AS (
+            SELECT DISTINCT ON (team) *
+            FROM {cumulative}
+            WHERE {' AND '.join(conditions)}
+            ORDER BY team, date DESC
+        ),
+        windows AS (
+            SELECT hi.*, GREATEST(hi.game_no - %(last_n)s, {start_game if start_date else '0'}, 0) AS start_game_no
+            FROM hi
+        ),
+        totals AS (
+            SELECT hi.team, hi.scope AS side, hi.game_no - hi.start_game_no AS gp, hi.date AS last_game_date, hi.season, {totals}
+            FROM windows hi
+            LEFT JOIN {cumulative} lo ON lo.team = hi.team AND lo.scope = hi.scope AND lo.game_no = hi.start_game_no
+            WHERE hi.game_no > hi.start_game_no
+        )
+        SELECT 
+            team,
+            {select_list}
+        FROM totals
+        GROUP BY {group_by}
+        {'' if team else 'ORDER BY SUM(points) DESC'}
+    """
+    return query, params
 
 def get_team_stats(
     team: Optional[str] = None,
@@ -896,119 +1742,21 @@ def get_team_stats(
         conn = connect_db(db_prefix)
         cur = conn.cursor()
         
-        # First, get the column names to determine which ones to aggregate
-        columns_query = f"""
-            SELECT column_name, data_type 
-            FROM information_schema.columns 
-            WHERE table_name = '{table_name}'
-            ORDER BY ordinal_position
-        """
-        cur.execute(columns_query)
-        column_info = cur.fetchall()
-        
         # Build the query based on whether we need to aggregate or not
-        if last_n is not None:
+        if last_n is not None and _has_cumulative(cur, table_name):
+            # Each team's window is the difference of two rows of the running totals
+            query, params = _cumulative_team_query(
+                table_name, get_stats_column_types(cur, table_name), last_n, team, start_date, end_date, side
+            )
+        elif last_n is not None:
             # We need to aggregate by team for the last N games
-            # First, identify numeric columns for aggregation
-            numeric_columns = []
-            non_numeric_columns = []
-            
-            for col_name, data_type in column_info:
-                if col_name == 'team':
-                    continue  # Skip team as it's our grouping column
-                elif col_name in ['date', 'last_updated', 'season']:
-                    # Skip date-related columns for aggregation
-                    continue
-                elif col_name == 'side':
-                    # Keep side for grouping if needed
-                    continue
-                elif data_type in ['integer', 'numeric', 'real', 'double precision']:
-                    numeric_columns.append(col_name)
-                else:
-                    non_numeric_columns.append(col_name)
-            
-            # Build aggregation expressions
-            agg_expressions = []
-            
-            # Special handling for GP (games played) - we count distinct dates
-            agg_expressions.append("COUNT(DISTINCT date) as gp")
-            
-            # For other numeric columns, use SUM or AVG as appropriate
-            for col in numeric_columns:
-                if col == 'gp':
-                    continue  # Skip GP as we're handling it specially
-                elif col in ['cf_pct', 'ff_pct', 'sf_pct', 'gf_pct', 'xgf_pct', 
-                           'scf_pct', 'scsf_pct', 'scgf_pct', 'hdcf_pct', 'hdsf_pct', 
-                           'hdgf_pct', 'mdcf_pct', 'mdsf_pct', 'mdgf_pct', 'ldcf_pct', 
-                           'ldsf_pct', 'ldgf_pct', 'sh_pct', 'sv_pct', 'pdo', 
-                           'scsh_pct', 'scsv_pct', 'hdsh_pct', 'hdsv_pct', 'mdsh_pct', 
-                           'mdsv_pct', 'ldsh_pct', 'ldsv_pct', 'point_pct']:
-                    # For percentage columns, use weighted average
-                    # For example, CF% should be calculated as total CF / (total CF + total CA)
-                    if col == 'cf_pct':
-                        agg_expressions.append("ROUND(CASE WHEN SUM(cf + ca) > 0 THEN (SUM(cf) * 100.0 / SUM(cf + ca)) ELSE NULL END, 3) as cf_pct")
-                    elif col == 'ff_pct':
-                        agg_expressions.append("ROUND(CASE WHEN SUM(ff + fa) > 0 THEN (SUM(ff) * 100.0 / SUM(ff + fa)) ELSE NULL END, 3) as ff_pct")
-                    elif col == 'sf_pct':
-                        agg_expressions.append("ROUND(CASE WHEN SUM(sf + sa) > 0 THEN (SUM(sf) * 100.0 / SUM(sf + sa)) ELSE NULL END, 3) as sf_pct")
-                    elif col == 'gf_pct':
-                        agg_expressions.append("ROUND(CASE WHEN SUM(gf + ga) > 0 THEN (SUM(gf) * 100.0 / SUM(gf + ga)) ELSE NULL END, 3) as gf_pct")
-                    elif col == 'xgf_pct':
-                        agg_expressions.append("ROUND(CASE WHEN SUM(xgf + xga) > 0 THEN (SUM(xgf) * 100.0 / SUM(xgf + xga)) ELSE NULL END, 3) as xgf_pct")
-                    elif col == 'scf_pct':
-                        agg_expressions.append("ROUND(CASE WHEN SUM(scf + sca) > 0 THEN (SUM(scf) * 100.0 / SUM(scf + sca)) ELSE NULL END, 3) as scf_pct")
-                    elif col == 'scsf_pct':
-                        agg_expressions.append("ROUND(CASE WHEN SUM(scsf + scsa) > 0 THEN (SUM(scsf) * 100.0 / SUM(scsf + scsa)) ELSE NULL END, 3) as scsf_pct")
-                    elif col == 'scgf_pct':
-                        agg_expressions.append("ROUND(CASE WHEN SUM(scgf + scga) > 0 THEN (SUM(scgf) * 100.0 / SUM(scgf + scga)) ELSE NULL END, 3) as scgf_pct")
-                    elif col == 'hdcf_pct':
-                        agg_expressions.append("ROUND(CASE WHEN SUM(hdcf + hdca) > 0 THEN (SUM(hdcf) * 100.0 / SUM(hdcf + hdca)) ELSE NULL END, 3) as hdcf_pct")
-                    elif col == 'hdsf_pct':
-                        agg_expressions.append("ROUND(CASE WHEN SUM(hdsf + hdsa) > 0 THEN (SUM(hdsf) * 100.0 / SUM(hdsf + hdsa)) ELSE NULL END, 3) as hdsf_pct")
-                    elif col == 'hdgf_pct':
-                        agg_expressions.append("ROUND(CASE WHEN SUM(hdgf + hdga) > 0 THEN (SUM(hdgf) * 100.0 / SUM(hdgf + hdga)) ELSE NULL END, 3) as hdgf_pct")
-                    elif col == 'mdcf_pct':
-                        agg_expressions.append("ROUND(CASE WHEN SUM(mdcf + mdca) > 0 THEN (SUM(mdcf) * 100.0 / SUM(mdcf + mdca)) ELSE NULL END, 3) as mdcf_pct")
-                    elif col == 'mdsf_pct':
-                        agg_expressions.append("ROUND(CASE WHEN SUM(mdsf + mdsa) > 0 THEN (SUM(mdsf) * 100.0 / SUM(mdsf + mdsa)) ELSE NULL END, 3) as mdsf_pct")
-                    elif col == 'mdgf_pct':
-                        agg_expressions.append("ROUND(CASE WHEN SUM(mdgf + mdga) > 0 THEN (SUM(mdgf) * 100.0 / SUM(mdgf + mdga)) ELSE NULL END, 3) as mdgf_pct")
-                    elif col == 'ldcf_pct':
-                        agg_expressions.append("ROUND(CASE WHEN SUM(ldcf + ldca) > 0 THEN (SUM(ldcf) * 100.0 / SUM(ldcf + ldca)) ELSE NULL END, 3) as ldcf_pct")
-                    elif col == 'ldsf_pct':
-                        agg_expressions.append("ROUND(CASE WHEN SUM(ldsf + ldsa) > 0 THEN (SUM(ldsf) * 100.0 / SUM(ldsf + ldsa)) ELSE NULL END, 3) as ldsf_pct")
-                    elif col == 'ldgf_pct':
-                        agg_expressions.append("ROUND(CASE WHEN SUM(ldgf + ldga) > 0 THEN (SUM(ldgf) * 100.0 / SUM(ldgf + ldga)) ELSE NULL END, 3) as ldgf_pct")
-                    elif col == 'sh_pct':
-                        agg_expressions.append("ROUND(CASE WHEN SUM(sf) > 0 THEN (SUM(gf) * 100.0 / SUM(sf)) ELSE NULL END, 3) as sh_pct")
-                    elif col == 'sv_pct':
-                        agg_expressions.append("ROUND(CASE WHEN SUM(sa) > 0 THEN ((SUM(sa) - SUM(ga)) * 100.0 / SUM(sa)) ELSE NULL END, 3) as sv_pct")
-                    elif col == 'pdo':
-                        agg_expressions.append("ROUND(CASE WHEN (SUM(sf) > 0 AND SUM(sa) > 0) THEN ((SUM(gf) * 100.0 / SUM(sf)) + ((SUM(sa) - SUM(ga)) * 100.0 / SUM(sa))) / 100.0 ELSE NULL END, 3) as pdo")
-                    else:
-                        # For other percentage columns, use AVG
-                        agg_expressions.append(f"ROUND(AVG({col}), 3) as {col}")
-                elif col in ['toi']:
-                    # For time on ice, use AVG
-                    agg_expressions.append(f"ROUND(AVG({col}), 3) as {col}")
-                else:
-                    # For count columns, use SUM
-                    # Only round non-integer values (like expected goals)
-                    if col in ['xgf', 'xga']:
-                        agg_expressions.append(f"ROUND(SUM({col}), 3) as {col}")
-                    else:
-                        agg_expressions.append(f"SUM({col}) as {col}")
-            
-            # Add MAX for the most recent date and season
-            agg_expressions.append("MAX(date) as last_game_date")
-            agg_expressions.append("MAX(season) as season")
+            agg_expressions = [
+                f"{expression} as {column}" for column, _, expression in _team_aggregates(get_stats_column_types(cur, table_name))
+            ]
             
             # Include side in the group by and select only if explicitly requested
             group_by_cols = ["team"]
-            has_side_column = any(col_name == 'side' for col_name, _ in column_info)
-            
-            # Only include side in GROUP BY if it exists in the table AND side filter is specified
-            if has_side_column and side in ['home', 'away']:
+            if side in ['home', 'away']:
                 agg_expressions.append("side")
                 group_by_cols.append("side")
             
@@ -1035,7 +1783,7 @@ def get_team_stats(
                 # For all teams, we need to get the last N games for each team
                 # Only partition by side if side filter is specified
                 partition_by = "team"
-                if side in ['home', 'away'] and has_side_column:
+                if side in ['home', 'away']:
                     partition_by += ", side"
                 
                 query = f"""
@@ -1087,6 +1835,158 @@ def get_team_stats(
             cur.close()
             disconnect_db(conn)
 
+def get_situation_stats(
+    kind: str = "team",
+    situations: Optional[list] = None,
+    entities: Optional[list] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    last_n: Optional[int] = None,
+    side: Optional[str] = None,
+    split_sides: bool = False,
+    prefixes: Optional[dict] = None,
+    db_prefix: str = "NST_DB_"
+) -> pd.DataFrame:
+    """
+    Retrieve team or goalie stats for several situations as one wide frame, with a single query.
+
+    Replaces one get_team_stats or get_goalie_stats call per situation followed by
+    prefixing and merging the results: the situation tables are filtered (and, with
+    last_n, aggregated like get_team_stats) in one statement and joined on the team
+    or goalie, so each stat appears once per situation with the situation's prefix
+    (e.g., '5v5_xgf', 'pk_ga', 'pp_gf'). A team or goalie missing from a situation
+    gets NULL for that situation's columns.
+
+    Example:
+        # Last 10 games of every team at 5v5, on the PK and on the PP, home and away
+        features = get_situation_stats('team', ['5v5', 'pk', 'pp'], end_date='2025-02-07',
+                                       last_n=10, split_sides=True)
+
+    Args:
+        kind: 'team' or 'goalie'
+        situations: Situations to include. Defaults to all of them ('all', '5v5', 'pk' and, for teams, 'pp').
+        entities: Optional teams (as stored in the team column) or goalie names to filter by
+        start_date: Optional start date for date range
+        end_date: Optional end date for date range
+        last_n: Optional number of most recent games per team or goalie to aggregate.
+                Without it, one row per team or goalie and date is returned.
+        side: Optional filter for home/away games ('home', 'away', or None for both)
+        split_sides: With last_n, aggregate home and away games separately (one row per side)
+        prefixes: Optional column prefix per situation. Defaults to '<situation>_'.
+        db_prefix: Database environment variable prefix
+
+    Returns:
+        DataFrame with the key columns (team or player, then date or side), the columns
+        shared by all situations (team for goalies, and side, opponent and season for
+        single games) and the prefixed stats of each situation
+    """
+    if kind == "team":
+        key_column, table_name_for, aggregates = "team", _team_table_name, _team_aggregates
+        default_situations = ['all', '5v5', 'pk', 'pp']
+    elif kind == "goalie":
+        key_column, table_name_for, aggregates = "player", _goalie_table_name, _goalie_aggregates
+        default_situations = ['all', '5v5', 'pk']
+    else:
+        raise ValueError(f"Invalid kind: {kind}. Must be one of: 'team', 'goalie'")
+    situations = list(situations or default_situations)
+    tables = [table_name_for(situation) for situation in situations]
+    prefixes = {situation: f"{situation}_" for situation in situations} | (prefixes or {})
+
+    conditions = []
+    params = {}
+    if entities:
+        conditions.append(f"{key_column} = ANY(%(entities)s)")
+        params['entities'] = list(entities)
+    if side in ['home', 'away']:
+        conditions.append("side = %(side)s")
+        params['side'] = side
+    if start_date:
+        conditions.append("date >= %(start_date)s")
+        params['start_date'] = start_date
+    if end_date:
+        conditions.append("date <= %(end_date)s")
+        params['end_date'] = end_date
+    where_clause = " AND ".join(conditions) if conditions else "1=1"
+
+    # Goalies keep their team across situations; single games also share side, opponent and season
+    shared_columns = ['team'] if kind == "goalie" else []
+    if last_n is None:
+        key_columns = [key_column, 'date']
+        shared_columns += ['side', 'opponent', 'season']
+    else:
+        key_columns = [key_column] + (['side'] if split_sides else [])
+
+    conn = None
+    try:
+        conn = connect_db(db_prefix)
+        cur = conn.cursor()
+
+        ctes = []
+        situation_columns = []
+        for i, table_name in enumerate(tables):
+            column_info = get_stats_column_types(cur, table_name)
+            if last_n is None:
+                ctes.append(f"s{i} AS (SELECT * FROM {table_name} WHERE {where_clause})")
+                columns = [col_name for col_name, _ in column_info]
+            else:
+                agg_expressions = aggregates(column_info)
+                ctes.append(f"""s{i} AS (
+                    SELECT {', '.join(key_columns)}, {_select_list(agg_expressions)}
+                    FROM (
+                        SELECT *, ROW_NUMBER() OVER (PARTITION BY {', '.join(key_columns)} ORDER BY date DESC) as row_num
+                        FROM {table_name}
+                        WHERE {where_clause}
+                    ) ranked_games
+                    WHERE row_num <= {int(last_n)}
+                    GROUP BY {', '.join(key_columns)}
+                )""")
+                columns = [column for column, _, _ in agg_expressions]
+            situation_columns.append([
+                col_name for col_name in columns
+                if col_name not in key_columns and col_name not in shared_columns and col_name != 'last_updated'
+            ])
+
+        # Every team or goalie (and date or side) found in any situation
+        keys = ', '.join(key_columns)
+        ctes.append("keys AS (" + " UNION ".join(f"SELECT {keys} FROM s{i}" for i in range(len(tables))) + ")")
+
+        select_list = [f"keys.{column}" for column in key_columns]
+        select_list += [
+            f"COALESCE({', '.join(f's{i}.{column}' for i in range(len(tables)))}) as {column}"
+            for column in shared_columns
+        ]
+        for i, situation in enumerate(situations):
+            select_list += [f's{i}.{column} as "{prefixes[situation]}{column}"' for column in situation_columns[i]]
+        joins = [
+            # side may be NULL for rows saved before it was attached at scrape time
+            f"LEFT JOIN s{i} ON " + " AND ".join(
+                f"s{i}.{column} IS NOT DISTINCT FROM keys.{column}" if column == 'side' else f"s{i}.{column} = keys.{column}"
+                for column in key_columns
+            )
+            for i in range(len(tables))
+        ]
+        order_by = f"keys.date DESC, keys.{key_column}" if last_n is None else ', '.join(f"keys.{column}" for column in key_columns)
+
+        query = f"""
+            WITH {', '.join(ctes)}
+            SELECT {', '.join(select_list)}
+            FROM keys
+            {' '.join(joins)}
+            ORDER BY {order_by}
+        """
+        cur.execute(query, params or None)
+
+        columns = [desc[0] for desc in cur.description]
+        return pd.DataFrame(cur.fetchall(), columns=columns)
+
+    except Exception as e:
+        logger.error(f"Error retrieving {kind} stats for {', '.join(situations)}: {e}")
+        raise
+    finally:
+        if conn:
+            cur.close()
+            disconnect_db(conn)
+
 def scrape_team_stats_home_away_range(
     start_date: str,
     end_date: str,
@@ -1094,14 +1994,22 @@ def scrape_team_stats_home_away_range(
     delay_min: int = 3,
     delay_max: int = 7,
     situation: str = "all",
-    stype: int = 2
-) -> None:
+    stype: int = 2,
+    conn=None,
+    commit_every_days: int = COMMIT_EVERY_DAYS,
+    commit_every_rows: int = COMMIT_EVERY_ROWS
+) -> dict:
     """
     Scrape team stats across a date range for both home and away games and save to the database.
     
     This function iterates through each day in the provided date range.
     For each day, it calls the team scraper to retrieve home and away data separately,
     and saves the results to the database.
+
+    The whole run uses one connection, committed in batches like scrape_team_stats_range.
+    The home and away pages of a day are saved in separate savepoints.
+
+    For long backfills that should survive restarts, use nst_job_queue instead.
     
     Args:
         start_date: Start date in 'YYYY-MM-DD' format
@@ -1111,18 +2019,16 @@ def scrape_team_stats_home_away_range(
         delay_max: Maximum delay between requests in seconds
         situation: The game situation to scrape ('all', '5v5', 'pk', or 'pp')
         stype: Type of statistics to retrieve. Defaults to 2 for regular season.
+        conn: Database connection to use (e.g., borrowed from a pool). Opened from db_prefix if None.
+        commit_every_days: Commit after this many saved days (home and away pages count separately)
+        commit_every_rows: Commit after this many saved rows
+
+    Returns:
+        Merge counts of the run: inserted, updated, unchanged and deleted rows, and
+        changed (inserted + updated + deleted). Re-scraping unchanged days changes nothing.
     """
     # Determine table name based on situation
-    if situation == "all":
-        table_name = "team_stats_all"
-    elif situation == "5v5":
-        table_name = "team_stats_5v5"
-    elif situation == "pk":
-        table_name = "team_stats_pk"
-    elif situation == "pp":
-        table_name = "team_stats_pp"
-    else:
-        raise ValueError(f"Invalid situation: {situation}. Must be one of: 'all', '5v5', 'pk', 'pp'")
+    table_name = _team_table_name(situation)
     
     # Convert dates to datetime objects
     start = datetime.strptime(start_date, '%Y-%m-%d')
@@ -1134,107 +2040,60 @@ def scrape_team_stats_home_away_range(
     successful_away_scrapes = 0
     failed_away_scrapes = 0
     
-    current_date = start
-    while current_date <= end:
-        conn = None
-        cursor = None
-        try:
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_db(db_prefix)
+    batch = _CommitBatch(conn, commit_every_days, commit_every_rows, table_name)
+    try:
+        current_date = start
+        while current_date <= end:
+            home_done = False
             # Format the current day as a string
             current_date_str = current_date.strftime('%Y-%m-%d')
             logger.info(f"Scraping team home/away data for date: {current_date_str}")
-            
-            # Connect to the database
-            conn = connect_db(db_prefix)
-            if conn is None:
-                raise Exception("Failed to establish database connection")
-            cursor = conn.cursor()
-            
-            # Scrape HOME data for the day
-            logger.info(f"Scraping HOME team data for date: {current_date_str}")
-            home_stats_df = nst_team_on_ice_scraper(
-                startdate=current_date_str,
-                enddate=current_date_str,
-                sit=situation,
-                stype=stype,
-                loc='H'  # 'H' for home games
-            )
-            
-            # Add date information
-            home_stats_df['date'] = current_date.date()
-            
-            # Add season information for logging
-            year = current_date.year
-            month = current_date.month
-            season = f"{year-1}-{str(year)[2:]}" if month < 7 else f"{year}-{str(year+1)[2:]}"
-            home_stats_df['season'] = season
-            
-            # Add location column
-            home_stats_df['location'] = 'home'
-            
-            # Log details about the returned DataFrame
-            logger.info(f"Home Team Stats DataFrame shape: {home_stats_df.shape}")
-            
-            # Insert (or update) the home data
-            insert_team_stats_df(home_stats_df, conn, cursor, table_name)
-            
-            successful_home_scrapes += 1
-            logger.info(f"Successfully saved home team data for {current_date_str}")
-            
-            # Add a small delay between home and away requests
-            delay = random.uniform(delay_min/2, delay_max/2)
-            logger.info(f"Waiting {delay:.1f} seconds before away request...")
-            time.sleep(delay)
-            
-            # Scrape AWAY data for the day
-            logger.info(f"Scraping AWAY team data for date: {current_date_str}")
-            away_stats_df = nst_team_on_ice_scraper(
-                startdate=current_date_str,
-                enddate=current_date_str,
-                sit=situation,
-                stype=stype,
-                loc='A'  # 'A' for away games
-            )
-            
-            # Add date information
-            away_stats_df['date'] = current_date.date()
-            away_stats_df['season'] = season
-            
-            # Add location column
-            away_stats_df['location'] = 'away'
-            
-            # Log details about the returned DataFrame
-            logger.info(f"Away Team Stats DataFrame shape: {away_stats_df.shape}")
-            
-            # Insert (or update) the away data
-            insert_team_stats_df(away_stats_df, conn, cursor, table_name)
-            
-            successful_away_scrapes += 1
-            logger.info(f"Successfully saved away team data for {current_date_str}")
-            
-        except Exception as e:
-            if 'home_stats_df' not in locals():
-                failed_home_scrapes += 1
-                logger.error(f"Error processing home team data for {current_date_str}: {str(e)}")
-            if 'away_stats_df' not in locals():
+
+            try:
+                # Scrape HOME data for the day
+                logger.info(f"Scraping HOME team data for date: {current_date_str}")
+                if batch.run_day(scrape_team_stats_day, current_date_str, situation, stype=stype, loc='H') is None:
+                    raise Exception("No home team data returned")
+                home_done = True
+                successful_home_scrapes += 1
+                logger.info(f"Successfully saved home team data for {current_date_str}")
+                
+                # Add a small delay between home and away requests
+                if not is_replaying():
+                    delay = random.uniform(delay_min/2, delay_max/2)
+                    logger.info(f"Waiting {delay:.1f} seconds before away request...")
+                    time.sleep(delay)
+                
+                # Scrape AWAY data for the day
+                logger.info(f"Scraping AWAY team data for date: {current_date_str}")
+                if batch.run_day(scrape_team_stats_day, current_date_str, situation, stype=stype, loc='A') is None:
+                    raise Exception("No away team data returned")
+                successful_away_scrapes += 1
+                logger.info(f"Successfully saved away team data for {current_date_str}")
+                
+            except Exception as e:
+                if not home_done:
+                    failed_home_scrapes += 1
+                    logger.error(f"Error processing home team data for {current_date_str}: {str(e)}")
                 failed_away_scrapes += 1
                 logger.error(f"Error processing away team data for {current_date_str}: {str(e)}")
-            if conn:
-                conn.rollback()
-        finally:
-            # Close the database cursor and connection
-            if cursor:
-                cursor.close()
-            if conn:
-                disconnect_db(conn)
             
-            # If not processing the last date, wait a random delay
-            if current_date < end:
+            # If not processing the last date, wait a random delay (pages replayed from the archive need none)
+            if current_date < end and not is_replaying():
                 delay = random.uniform(delay_min, delay_max)
                 logger.info(f"Waiting {delay:.1f} seconds before next date...")
                 time.sleep(delay)
             
             # Move on to the next day
             current_date += timedelta(days=1)
+    finally:
+        # Commit the days saved since the last batch, even if the run was interrupted
+        batch.commit()
+        if own_conn:
+            disconnect_db(conn)
     
     # Log the final summary
     logger.info(f"""
@@ -1245,7 +2104,117 @@ def scrape_team_stats_home_away_range(
     - Failed away scrapes: {failed_away_scrapes}
     - Date range: {start_date} to {end_date}
     - Table: {table_name}
+    - Rows changed: {batch.summary()['changed']} ({batch.summary()['unchanged']} unchanged)
     """)
+    return batch.summary()
+
+def _normalize_team_name(name: str) -> str:
+    """
+    Removes accent marks and punctuation from a team name, the form NST team tables store.
+
+    Args:
+        name: Team name (e.g., 'Montréal Canadiens', 'St. Louis Blues')
+
+    Returns:
+        The normalized name (e.g., 'Montreal Canadiens', 'St Louis Blues')
+    """
+    return ''.join(
+        c for c in unicodedata.normalize('NFD', name)
+        if unicodedata.category(c) != 'Mn' and (c.isalnum() or c.isspace())
+    )
+
+def _game_sides(start_date: str, end_date: str, full_names: bool = False) -> list:
+    """
+    List the home/away side and opponent of every team in the games of a date range.
+
+    Games come from the local schedule store. Teams are returned in the form used by
+    the stats tables: tri-codes for goalie tables, normalized full names for team tables.
+
+    Args:
+        start_date: Start date in 'YYYY-MM-DD' format
+        end_date: End date in 'YYYY-MM-DD' format
+        full_names: Return full team names (team tables) instead of tri-codes (goalie tables)
+
+    Returns:
+        A list of (date, team, side, opponent) tuples
+    """
+    names = {}
+
+    def team_name(tricode):
+        if not full_names:
+            return tricode
+        if tricode not in names:
+            names[tricode] = _normalize_team_name(get_fullname_by_tricode(tricode) or '') or tricode
+        return names[tricode]
+
+    rows = []
+    for game in get_games(start_date, end_date):
+        if not game['homeTeam'] or not game['awayTeam']:
+            logger.warning(f"Missing team abbreviation for game {game['id']}")
+            continue
+        home, away = team_name(game['homeTeam']), team_name(game['awayTeam'])
+        rows.append((game['gameDate'], home, 'home', away))
+        rows.append((game['gameDate'], away, 'away', home))
+    return rows
+
+def attach_game_sides(df: pd.DataFrame, date_str: str, full_names: bool = False) -> int:
+    """
+    Add the side ('home' or 'away') and opponent of each row's team on a date.
+
+    Goalie rows that list several teams ('NJD, TBL') take the side of whichever of
+    them played. Rows whose team did not play that day get None for both columns.
+
+    Args:
+        df: Stats of one day with a team column; side and opponent are added in place
+        date_str: Date in 'YYYY-MM-DD' format
+        full_names: The team column holds full team names (team tables) instead of tri-codes
+
+    Returns:
+        The number of rows whose side was found
+    """
+    sides = {team: (side, opponent) for _, team, side, opponent in _game_sides(date_str, date_str, full_names)}
+
+    def lookup(team):
+        if full_names:
+            return sides.get(_normalize_team_name(str(team)), (None, None))
+        for code in str(team).split(','):
+            if code.strip() in sides:
+                return sides[code.strip()]
+        return (None, None)
+
+    # Look up each distinct team once
+    matches = {team: lookup(team) for team in df['team'].dropna().unique()}
+    df['side'] = df['team'].map(lambda team: matches.get(team, (None, None))[0])
+    df['opponent'] = df['team'].map(lambda team: matches.get(team, (None, None))[1])
+
+    found = int(df['side'].notna().sum())
+    if found < len(df):
+        logger.warning(f"No scheduled game found for {len(df) - found} of {len(df)} rows on {date_str}")
+    return found
+
+def load_game_sides(cursor, start_date: str, end_date: str, full_names: bool = False) -> int:
+    """
+    Load the home/away side of every team in the games of a date range into a temp table.
+
+    Creates game_sides (date, team, side, opponent), dropped at the end of the transaction,
+    from the local schedule store (see _game_sides).
+
+    Args:
+        cursor: Database cursor
+        start_date: Start date in 'YYYY-MM-DD' format
+        end_date: End date in 'YYYY-MM-DD' format
+        full_names: Store full team names (team tables) instead of tri-codes (goalie tables)
+
+    Returns:
+        The number of (date, team, side, opponent) rows loaded
+    """
+    rows = _game_sides(start_date, end_date, full_names)
+
+    cursor.execute("DROP TABLE IF EXISTS game_sides")
+    cursor.execute("CREATE TEMP TABLE game_sides (date date, team text, side varchar(10), opponent text) ON COMMIT DROP")
+    if rows:
+        psycopg2.extras.execute_values(cursor, "INSERT INTO game_sides (date, team, side, opponent) VALUES %s", rows)
+    return len(rows)
 
 def add_home_away_data_from_nhl_api(
     start_date: str,
@@ -1258,249 +2227,53 @@ def add_home_away_data_from_nhl_api(
     """
     Add home/away information to team stats using the NHL API.
     
-    This function queries the NHL API to get game information for the specified date range,
-    and updates the team_stats table with home/away information.
+    The scrapers attach side and opponent when rows are saved (see attach_game_sides);
+    this backfills rows saved before that. It loads the games of the date range from
+    the local schedule store into a temp table (see load_game_sides) and sets the side
+    and opponent of every matching team stats row with a single UPDATE ... FROM.
     
     Args:
         start_date: Start date in 'YYYY-MM-DD' format
         end_date: End date in 'YYYY-MM-DD' format
         db_prefix: Database environment variable prefix
         table_name: Name of the table to update
-        delay_min: Minimum delay between requests in seconds
-        delay_max: Maximum delay between requests in seconds
+        delay_min: Unused, kept for backwards compatibility (no per-day requests are made)
+        delay_max: Unused, kept for backwards compatibility (no per-day requests are made)
     """
-    # Convert dates to datetime objects
-    start = datetime.strptime(start_date, '%Y-%m-%d')
-    end = datetime.strptime(end_date, '%Y-%m-%d')
-    
-    # Initialize counters for logging
-    games_processed = 0
-    teams_updated = 0
-    
-    # Connect to the database
     conn = connect_db(db_prefix)
-    if conn is None:
-        raise Exception("Failed to establish database connection")
-    
-    cursor = conn.cursor()
-    
-    # Check if side column exists, add it if it doesn't
-    # Use a separate connection for this check to avoid transaction issues
-    check_conn = None
-    check_cursor = None
     try:
-        check_conn = connect_db(db_prefix)
-        check_cursor = check_conn.cursor()
-        
-        # Check if the column exists using information_schema
-        check_cursor.execute(
-            """
-            SELECT column_name 
-            FROM information_schema.columns 
-            WHERE table_name = %s AND column_name = 'side'
-            """, 
-            (table_name,)
-        )
-        
-        column_exists = check_cursor.fetchone() is not None
-        
-        if not column_exists:
-            logger.info(f"Adding side column to {table_name}")
-            check_cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN side VARCHAR(10)")
-            check_conn.commit()
-            logger.info(f"Successfully added side column to {table_name}")
-    except Exception as e:
-        logger.error(f"Error checking/adding side column: {str(e)}")
-        if check_conn:
-            check_conn.rollback()
+        with conn.cursor() as cursor:
+            sides_loaded = load_game_sides(cursor, start_date, end_date, full_names=True)
+            cursor.execute(
+                f"""
+                UPDATE {table_name} t
+                SET side = g.side, opponent = g.opponent
+                FROM game_sides g
+                WHERE t.date = g.date
+                AND t.team = g.team
+                AND t.date BETWEEN %s AND %s
+                AND (t.side, t.opponent) IS DISTINCT FROM (g.side, g.opponent)
+                RETURNING t.team
+                """,
+                (start_date, end_date)
+            )
+            updated = [row[0] for row in cursor.fetchall()]
+            teams_updated = len(updated)
+            # Home and away running totals of the updated teams change from the first updated date
+            if updated:
+                refresh_team_cumulative_stats(cursor, table_name, start_date, teams=sorted(set(updated)))
+        conn.commit()
+    except Exception:
+        conn.rollback()
         raise
     finally:
-        if check_cursor:
-            check_cursor.close()
-        if check_conn:
-            disconnect_db(check_conn)
-    
-    # First, check if we have data for the date range
-    cursor.execute(
-        f"SELECT DISTINCT date::text, team FROM {table_name} WHERE date BETWEEN %s AND %s",
-        (start_date, end_date)
-    )
-    existing_data = cursor.fetchall()
-    
-    if not existing_data:
-        logger.warning(f"No team stats data found in {table_name} for date range {start_date} to {end_date}")
-        logger.info("You may need to run scrape_team_stats_range() first to populate the data")
-    else:
-        # Create a dictionary for quick lookup of existing data
-        existing_dates_teams = {(row[0], row[1]) for row in existing_data}
-        has_existing_data = True  # Flag to track if we have existing data
-        logger.info(f"Found {len(existing_dates_teams)} team-date combinations in the database")
-        
-        # Log a sample of the data for debugging
-        sample_data = list(existing_dates_teams)[:5]
-        logger.info(f"Sample data (date, team): {sample_data}")
-    
-    # Process each day in the date range
-    current_date = start
-    while current_date <= end:
-        current_date_str = current_date.strftime('%Y-%m-%d')
-        logger.info(f"Processing games for date: {current_date_str}")
-        
-        try:
-            # Try to get schedule data using multiple methods
-            schedule_data = None
-            games_for_date = []
-            
-            # Method 1: Try using the direct schedule endpoint
-            try:
-                url = f"https://api-web.nhle.com/v1/schedule/{current_date_str}"
-                response = requests.get(url)
-                response.raise_for_status()
-                schedule_data = response.json()
-                
-                # Extract games for the current date
-                if 'gameWeek' in schedule_data and schedule_data['gameWeek']:
-                    for day_data in schedule_data['gameWeek']:
-                        if day_data.get('date') == current_date_str and 'games' in day_data:
-                            games_for_date = day_data['games']
-                            logger.info(f"Found {len(games_for_date)} games using direct schedule endpoint")
-            except Exception as e:
-                logger.warning(f"Error using direct schedule endpoint: {str(e)}")
-            
-            # Process the games we found
-            for game in games_for_date:
-                # Extract home and away team information
-                home_team_data = game.get('homeTeam', {})
-                away_team_data = game.get('awayTeam', {})
-                
-                # Get team abbreviations - try different fields that might be available
-                home_team = home_team_data.get('abbrev', home_team_data.get('triCode', ''))
-                away_team = away_team_data.get('abbrev', away_team_data.get('triCode', ''))
-                
-                home_team = get_fullname_by_tricode(home_team)
-                away_team = get_fullname_by_tricode(away_team)
-
-                # Remove accent marks and punctuation from both team names
-                home_team = ''.join(
-                    c for c in unicodedata.normalize('NFD', home_team)
-                    if unicodedata.category(c) != 'Mn' and (c.isalnum() or c.isspace())
-                )
-                away_team = ''.join(
-                    c for c in unicodedata.normalize('NFD', away_team)
-                    if unicodedata.category(c) != 'Mn' and (c.isalnum() or c.isspace())
-                )
-                
-                # Also try the NST to NHL mapping as a fallback
-                if not home_team:
-                    nst_home = home_team_data.get('abbrev', '')
-                    home_team = nst_to_nhl_tricode(nst_home) or nst_home
-                
-                if not away_team:
-                    nst_away = away_team_data.get('abbrev', '')
-                    away_team = nst_to_nhl_tricode(nst_away) or nst_away
-                
-                game_date = current_date_str
-                
-                # Check if we have data for these teams on this date
-                if has_existing_data:  # Replace locals() check with flag
-                    # Try to find the team in the database - check for both the tricode and full name
-                    home_exists = False
-                    away_exists = False
-                    
-                    # Check for exact match
-                    home_exists = (game_date, home_team) in existing_dates_teams
-                    away_exists = (game_date, away_team) in existing_dates_teams
-                    
-                    # If not found, try to find by full team name
-                    if not home_exists:
-                        # Try to find the full team name in the database
-                        home_full_name = f"{home_team} {home_team_data.get('teamName', '')}"
-                        for date_team in existing_dates_teams:
-                            if date_team[0] == game_date and home_team in date_team[1]:
-                                home_exists = True
-                                home_team = date_team[1]  # Use the exact team name from the database
-                                logger.info(f"Found home team in database as: {home_team}")
-                                break
-                    
-                    if not away_exists:
-                        # Try to find the full team name in the database
-                        away_full_name = f"{away_team} {away_team_data.get('teamName', '')}"
-                        for date_team in existing_dates_teams:
-                            if date_team[0] == game_date and away_team in date_team[1]:
-                                away_exists = True
-                                away_team = date_team[1]  # Use the exact team name from the database
-                                logger.info(f"Found away team in database as: {away_team}")
-                                break
-                    
-                    if not home_exists:
-                        logger.warning(f"No data found for home team {home_team} on {game_date}")
-                    if not away_exists:
-                        logger.warning(f"No data found for away team {away_team} on {game_date}")
-                
-                # Update home team record
-                cursor.execute(
-                    f"UPDATE {table_name} SET side = 'home' WHERE team = %s AND date = %s",
-                    (home_team, game_date)
-                )
-                home_updated = cursor.rowcount
-                
-                # If no rows were updated, try with a more flexible query
-                if home_updated == 0:
-                    cursor.execute(
-                        f"UPDATE {table_name} SET side = 'home' WHERE team LIKE %s AND date = %s",
-                        (f"%{home_team}%", game_date)
-                    )
-                    home_updated = cursor.rowcount
-                    if home_updated > 0:
-                        logger.info(f"Updated home team using LIKE query: {home_team}")
-                
-                # Update away team record
-                cursor.execute(
-                    f"UPDATE {table_name} SET side = 'away' WHERE team = %s AND date = %s",
-                    (away_team, game_date)
-                )
-                away_updated = cursor.rowcount
-                
-                # If no rows were updated, try with a more flexible query
-                if away_updated == 0:
-                    cursor.execute(
-                        f"UPDATE {table_name} SET side = 'away' WHERE team LIKE %s AND date = %s",
-                        (f"%{away_team}%", game_date)
-                    )
-                    away_updated = cursor.rowcount
-                    if away_updated > 0:
-                        logger.info(f"Updated away team using LIKE query: {away_team}")
-                
-                teams_updated += home_updated + away_updated
-                games_processed += 1
-                
-                logger.info(f"Game: {away_team} @ {home_team} on {game_date} - Updated {home_updated + away_updated} records")
-            
-            # Commit changes for this day
-            conn.commit()
-            
-        except Exception as e:
-            logger.error(f"Error processing games for {current_date_str}: {str(e)}")
-            conn.rollback()
-        
-        # Add delay before next request
-        if current_date < end:
-            delay = random.uniform(delay_min, delay_max)
-            logger.info(f"Waiting {delay:.1f} seconds before next request...")
-            time.sleep(delay)
-        
-        # Move to next day
-        current_date += timedelta(days=1)
-    
-    # Close database connection
-    cursor.close()
-    disconnect_db(conn)
+        disconnect_db(conn)
     
     # Log summary
     logger.info(f"""
     Home/away data update completed:
     - Date range: {start_date} to {end_date}
-    - Games processed: {games_processed}
+    - Games processed: {sides_loaded // 2}
     - Team records updated: {teams_updated}
     - Table: {table_name}
     """)
@@ -1523,13 +2296,13 @@ def populate_and_update_home_away_data(
     stype: int = 2,
     delay_min: int = 3,
     delay_max: int = 7
-) -> None:
+) -> dict:
     """
-    Populate team stats data and add home/away information in one step.
+    Populate team stats data with home/away information in one step.
     
-    This function:
-    1. Scrapes team stats data for the specified date range
-    2. Adds home/away information from the NHL API
+    The scraper attaches side and opponent to every row before it is saved, so no
+    second pass over the table is needed. To add them to rows saved before that,
+    use add_home_away_data_from_nhl_api.
     
     Args:
         start_date: Start date in 'YYYY-MM-DD' format
@@ -1539,22 +2312,12 @@ def populate_and_update_home_away_data(
         stype: Type of statistics to retrieve. Defaults to 2 for regular season.
         delay_min: Minimum delay between requests (seconds)
         delay_max: Maximum delay between requests (seconds)
+
+    Returns:
+        Merge counts of the run (see scrape_team_stats_range)
     """
-    # Determine table name based on situation
-    if situation == "all":
-        table_name = "team_stats_all"
-    elif situation == "5v5":
-        table_name = "team_stats_5v5"
-    elif situation == "pk":
-        table_name = "team_stats_pk"
-    elif situation == "pp":
-        table_name = "team_stats_pp"
-    else:
-        raise ValueError(f"Invalid situation: {situation}. Must be one of: 'all', '5v5', 'pk', 'pp'")
-    
-    # Step 1: Scrape team stats data
-    logger.info(f"Step 1: Scraping team stats data for {start_date} to {end_date}")
-    scrape_team_stats_range(
+    logger.info(f"Scraping team stats data with home/away information for {start_date} to {end_date}")
+    counts = scrape_team_stats_range(
         start_date=start_date,
         end_date=end_date,
         db_prefix=db_prefix,
@@ -1564,18 +2327,8 @@ def populate_and_update_home_away_data(
         stype=stype
     )
     
-    # Step 2: Add home/away information
-    logger.info(f"Step 2: Adding home/away information for {start_date} to {end_date}")
-    add_home_away_data_from_nhl_api(
-        start_date=start_date,
-        end_date=end_date,
-        db_prefix=db_prefix,
-        table_name=table_name,
-        delay_min=1,  # Use shorter delays for API calls
-        delay_max=3
-    )
-    
     logger.info(f"Completed populating and updating home/away data for {start_date} to {end_date}")
+    return counts
 
 def check_available_dates(
     table_name: str = "team_stats_all",
@@ -1601,14 +2354,17 @@ def check_available_dates(
     cursor = conn.cursor()
     
     try:
-        # Get date counts
+        # Get date counts, with the number of records on each side
         cursor.execute(
             f"""
             SELECT 
                 date, 
                 COUNT(DISTINCT team) as team_count,
                 STRING_AGG(DISTINCT team, ', ' ORDER BY team) as teams,
-                COUNT(*) as record_count
+                COUNT(*) as record_count,
+                COUNT(CASE WHEN side = 'home' THEN 1 END) as home_count,
+                COUNT(CASE WHEN side = 'away' THEN 1 END) as away_count,
+                COUNT(CASE WHEN side IS NULL THEN 1 END) as null_count
             FROM {table_name}
             GROUP BY date
             ORDER BY date DESC
@@ -1622,44 +2378,6 @@ def check_available_dates(
         
         df = pd.DataFrame(results, columns=columns)
         
-        # Check if side column exists
-        cursor.execute(
-            f"""
-            SELECT column_name 
-            FROM information_schema.columns 
-            WHERE table_name = %s AND column_name = 'side'
-            """, 
-            (table_name,)
-        )
-        
-        side_column_exists = cursor.fetchone() is not None
-        
-        if side_column_exists:
-            # Get counts of records with side values
-            cursor.execute(
-                f"""
-                SELECT 
-                    date,
-                    COUNT(CASE WHEN side = 'home' THEN 1 END) as home_count,
-                    COUNT(CASE WHEN side = 'away' THEN 1 END) as away_count,
-                    COUNT(CASE WHEN side IS NULL THEN 1 END) as null_count
-                FROM {table_name}
-                GROUP BY date
-                ORDER BY date DESC
-                LIMIT 100
-                """
-            )
-            
-            # Convert to DataFrame
-            side_columns = [desc[0] for desc in cursor.description]
-            side_results = cursor.fetchall()
-            
-            side_df = pd.DataFrame(side_results, columns=side_columns)
-            
-            # Merge the two DataFrames
-            if not side_df.empty:
-                df = pd.merge(df, side_df, on='date', how='left')
-        
         return df
         
     finally:
@@ -1675,178 +2393,54 @@ def add_home_away_data_to_goalie_stats(
     delay_max: int = 3
 ) -> None:
     """
-    Fetch home/away data from NHL API for a date range and update existing goalie stats tables.
+    Add home/away data from the NHL schedule to existing goalie stats for a date range.
     
-    This function:
-    1. Queries the NHL API for games in the specified date range
-    2. Matches goalies to their teams for each game
-    3. Determines if their team was home or away
-    4. Updates the goalie stats tables with a 'side' column
+    The scrapers attach side and opponent when rows are saved (see attach_game_sides);
+    this backfills rows saved before that. This function:
+    1. Loads the games in the specified date range from the local schedule store
+       into a temp table of (date, team, side) (see load_game_sides)
+    2. Sets the side and opponent of every goalie row whose team played that day with a single UPDATE ... FROM
     
-    The function handles the conversion between Natural Stat Trick (NST) team abbreviations
-    and NHL API team codes (e.g., 'N.J' to 'NJD') automatically.
+    Goalie tables store NHL tri-codes (NST abbreviations such as 'N.J' are mapped to
+    'NJD' at scrape time); rows listing several teams ('NJD, TBL') match any of them.
     
     Args:
         start_date: Start date in 'YYYY-MM-DD' format
         end_date: End date in 'YYYY-MM-DD' format
         db_prefix: Prefix for database environment variables
         table_name: The table to update (e.g., 'goalie_stats_all', 'goalie_stats_5v5')
-        delay_min: Minimum delay between API requests (seconds)
-        delay_max: Maximum delay between API requests (seconds)
+        delay_min: Unused, kept for backwards compatibility (no per-day requests are made)
+        delay_max: Unused, kept for backwards compatibility (no per-day requests are made)
     """
-    # Convert dates to datetime objects
-    start = datetime.strptime(start_date, '%Y-%m-%d')
-    end = datetime.strptime(end_date, '%Y-%m-%d')
-    
-    # Initialize counters for logging
-    games_processed = 0
-    goalies_updated = 0
-    
-    # Connect to the database
     conn = connect_db(db_prefix)
-    if conn is None:
-        raise Exception("Failed to establish database connection")
-    
-    cursor = conn.cursor()
-    
-    # Check if side column exists, add it if it doesn't
     try:
-        # Check if the column exists using information_schema
-        cursor.execute(
-            """
-            SELECT column_name 
-            FROM information_schema.columns 
-            WHERE table_name = %s AND column_name = 'side'
-            """, 
-            (table_name,)
-        )
-        
-        column_exists = cursor.fetchone() is not None
-        
-        if not column_exists:
-            logger.info(f"Adding side column to {table_name}")
-            cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN side VARCHAR(10)")
-            conn.commit()
-            logger.info(f"Successfully added side column to {table_name}")
-    except Exception as e:
-        logger.error(f"Error checking/adding side column: {str(e)}")
+        with conn.cursor() as cursor:
+            sides_loaded = load_game_sides(cursor, start_date, end_date)
+            cursor.execute(
+                f"""
+                UPDATE {table_name} t
+                SET side = g.side, opponent = g.opponent
+                FROM game_sides g
+                WHERE t.date = g.date
+                AND g.team = ANY(regexp_split_to_array(t.team, ',\\s*'))
+                AND t.date BETWEEN %s AND %s
+                AND (t.side, t.opponent) IS DISTINCT FROM (g.side, g.opponent)
+                """,
+                (start_date, end_date)
+            )
+            goalies_updated = cursor.rowcount
+        conn.commit()
+    except Exception:
         conn.rollback()
         raise
-    
-    # First, check if we have data for the date range
-    cursor.execute(
-        f"SELECT DISTINCT date::text, player, team FROM {table_name} WHERE date BETWEEN %s AND %s",
-        (start_date, end_date)
-    )
-    existing_data = cursor.fetchall()
-    
-    if not existing_data:
-        logger.warning(f"No goalie stats data found in {table_name} for date range {start_date} to {end_date}")
-        logger.info("You may need to run scrape_goalie_stats_range() first to populate the data")
-    else:
-        # Create a dictionary for quick lookup of existing data
-        existing_dates_goalies = {(row[0], row[1], row[2]) for row in existing_data}
-        logger.info(f"Found {len(existing_dates_goalies)} goalie-date combinations in the database")
-        
-        # Log a sample of the data for debugging
-        sample_data = list(existing_dates_goalies)[:5]
-        logger.info(f"Sample data (date, goalie, team): {sample_data}")
-    
-    # Process each day in the date range
-    current_date = start
-    while current_date <= end:
-        current_date_str = current_date.strftime('%Y-%m-%d')
-        logger.info(f"Processing games for date: {current_date_str}")
-        
-        try:
-            # Try to get schedule data using the NHL API
-            url = f"https://api-web.nhle.com/v1/schedule/{current_date_str}"
-            response = requests.get(url)
-            response.raise_for_status()
-            schedule_data = response.json()
-            
-            # Extract games for the current date
-            games_for_date = []
-            if 'gameWeek' in schedule_data and schedule_data['gameWeek']:
-                for day_data in schedule_data['gameWeek']:
-                    if day_data.get('date') == current_date_str and 'games' in day_data:
-                        games_for_date = day_data['games']
-                        logger.info(f"Found {len(games_for_date)} games using schedule endpoint")
-            
-            # Process each game
-            for game in games_for_date:
-                # Extract home and away team information
-                home_team_data = game.get('homeTeam', {})
-                away_team_data = game.get('awayTeam', {})
-                
-                # Get team abbreviations from NHL API - these will match our database format
-                home_team = home_team_data.get('abbrev', home_team_data.get('triCode', ''))
-                away_team = away_team_data.get('abbrev', away_team_data.get('triCode', ''))
-                
-                if not home_team or not away_team:
-                    logger.warning(f"Missing team abbreviation in NHL API response")
-                    continue
-                
-                game_date = current_date_str
-                
-                # Update goalie records for this game using NHL abbreviations directly
-                cursor.execute(
-                    f"""
-                    UPDATE {table_name} 
-                    SET side = 'home' 
-                    WHERE date = %s 
-                    AND team = %s
-                    AND (side IS NULL OR side = '')
-                    """,
-                    (game_date, home_team)
-                )
-                home_goalies_updated = cursor.rowcount
-                
-                cursor.execute(
-                    f"""
-                    UPDATE {table_name} 
-                    SET side = 'away' 
-                    WHERE date = %s 
-                    AND team = %s
-                    AND (side IS NULL OR side = '')
-                    """,
-                    (game_date, away_team)
-                )
-                away_goalies_updated = cursor.rowcount
-                
-                goalies_updated += home_goalies_updated + away_goalies_updated
-                games_processed += 1
-                
-                logger.info(
-                    f"Game: {away_team} @ {home_team} on {game_date} - "
-                    f"Updated {home_goalies_updated + away_goalies_updated} goalie records"
-                )
-            
-            # Commit changes for this day
-            conn.commit()
-            
-        except Exception as e:
-            logger.error(f"Error processing games for {current_date_str}: {str(e)}")
-            conn.rollback()
-        
-        # Add delay before next request
-        if current_date < end:
-            delay = random.uniform(delay_min, delay_max)
-            logger.info(f"Waiting {delay:.1f} seconds before next request...")
-            time.sleep(delay)
-        
-        # Move to next day
-        current_date += timedelta(days=1)
-    
-    # Close database connection
-    cursor.close()
-    disconnect_db(conn)
+    finally:
+        disconnect_db(conn)
     
     # Log summary
     logger.info(f"""
     Home/away data update completed for goalies:
     - Date range: {start_date} to {end_date}
-    - Games processed: {games_processed}
+    - Games processed: {sides_loaded // 2}
     - Goalie records updated: {goalies_updated}
     - Table: {table_name}
     """)
@@ -1868,16 +2462,14 @@ def populate_and_update_goalie_home_away_data(
     situation: str = "all",
     delay_min: int = 3,
     delay_max: int = 7
-) -> None:
+) -> dict:
     """
-    Populate goalie stats data and add home/away information in one step.
+    Populate goalie stats data with home/away information in one step.
     
-    This function:
-    1. Scrapes goalie stats data for the specified date range
-    2. Adds home/away information from the NHL API
-    
-    The function handles the conversion between Natural Stat Trick (NST) team abbreviations
-    and NHL API team codes (e.g., 'N.J' to 'NJD') automatically.
+    The scraper attaches side and opponent to every row before it is saved (NST
+    abbreviations such as 'N.J' are mapped to NHL tri-codes like 'NJD' first), so no
+    second pass over the table is needed. To add them to rows saved before that,
+    use add_home_away_data_to_goalie_stats.
     
     Args:
         start_date: Start date in 'YYYY-MM-DD' format
@@ -1886,139 +2478,21 @@ def populate_and_update_goalie_home_away_data(
         situation: The game situation to scrape ('all', '5v5', or 'pk')
         delay_min: Minimum delay between requests (seconds)
         delay_max: Maximum delay between requests (seconds)
+
+    Returns:
+        Merge counts of the run (see scrape_goalie_stats_range)
     """
-    # Determine table name based on situation
-    if situation == "all":
-        table_name = "goalie_stats_all"
-    elif situation == "5v5":
-        table_name = "goalie_stats_5v5"
-    elif situation == "pk":
-        table_name = "goalie_stats_pk"
-    else:
-        raise ValueError(f"Invalid situation: {situation}. Must be one of: 'all', '5v5', 'pk'")
-    
-    # Step 1: Scrape goalie stats data
-    logger.info(f"Step 1: Scraping goalie stats data for {start_date} to {end_date}")
-    try:
-        # Check if the table exists before scraping
-        conn = connect_db(db_prefix)
-        if conn is None:
-            raise Exception("Failed to establish database connection")
-        
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            SELECT EXISTS (
-                SELECT FROM information_schema.tables 
-                WHERE table_schema = 'public' 
-                AND table_name = %s
-            );
-            """, 
-            (table_name,)
-        )
-        table_exists = cursor.fetchone()[0]
-        
-        if not table_exists:
-            logger.warning(f"Table {table_name} does not exist. Creating it now.")
-            # Create the table if it doesn't exist
-            create_table_query = f"""
-            CREATE TABLE IF NOT EXISTS {table_name} (
-                player VARCHAR(255),
-                team VARCHAR(10),
-                gp INTEGER,
-                toi FLOAT,
-                shots_against INTEGER,
-                saves INTEGER,
-                goals_against INTEGER,
-                sv_pct FLOAT,
-                gaa FLOAT,
-                gsaa FLOAT,
-                xg_against FLOAT,
-                hd_shots_against INTEGER,
-                hd_saves INTEGER,
-                hd_goals_against INTEGER,
-                hdsv_pct FLOAT,
-                hdgaa FLOAT,
-                hdgsaa FLOAT,
-                md_shots_against INTEGER,
-                md_saves INTEGER,
-                md_goals_against INTEGER,
-                mdsv_pct FLOAT,
-                mdgaa FLOAT,
-                mdgsaa FLOAT,
-                ld_shots_against INTEGER,
-                ld_saves INTEGER,
-                ld_goals_against INTEGER,
-                ldsv_pct FLOAT,
-                ldgaa FLOAT,
-                ldgsaa FLOAT,
-                rush_attempts_against INTEGER,
-                rebound_attempts_against INTEGER,
-                avg_shot_distance FLOAT,
-                avg_goal_distance FLOAT,
-                date DATE,
-                last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                season VARCHAR(10),
-                side VARCHAR(10)
-            );
-            """
-            cursor.execute(create_table_query)
-            conn.commit()
-            logger.info(f"Created table {table_name}")
-        
-        # Check if there's any data for the date range
-        cursor.execute(
-            f"SELECT COUNT(*) FROM {table_name} WHERE date BETWEEN %s AND %s",
-            (start_date, end_date)
-        )
-        existing_records = cursor.fetchone()[0]
-        logger.info(f"Found {existing_records} existing records in {table_name} for date range {start_date} to {end_date}")
-        
-        cursor.close()
-        disconnect_db(conn)
-        
-        # Scrape the data
-        scrape_goalie_stats_range(
-            start_date=start_date,
-            end_date=end_date,
-            db_prefix=db_prefix,
-            delay_min=delay_min,
-            delay_max=delay_max,
-            situation=situation
-        )
-        
-        # Verify data was added
-        conn = connect_db(db_prefix)
-        cursor = conn.cursor()
-        cursor.execute(
-            f"SELECT COUNT(*) FROM {table_name} WHERE date BETWEEN %s AND %s",
-            (start_date, end_date)
-        )
-        new_records = cursor.fetchone()[0]
-        records_added = new_records - existing_records
-        logger.info(f"Added {records_added} new records to {table_name}")
-        
-        cursor.close()
-        disconnect_db(conn)
-        
-    except Exception as e:
-        logger.error(f"Error in Step 1 (scraping goalie stats): {str(e)}")
-        raise
+    table_name = _goalie_table_name(situation)
     
-    # Step 2: Add home/away information
-    logger.info(f"Step 2: Adding home/away information for {start_date} to {end_date}")
-    try:
-        add_home_away_data_to_goalie_stats(
-            start_date=start_date,
-            end_date=end_date,
-            db_prefix=db_prefix,
-            table_name=table_name,
-            delay_min=1,  # Use shorter delays for API calls
-            delay_max=3
-        )
-    except Exception as e:
-        logger.error(f"Error in Step 2 (adding home/away data): {str(e)}")
-        raise
+    logger.info(f"Scraping goalie stats data with home/away information for {start_date} to {end_date}")
+    counts = scrape_goalie_stats_range(
+        start_date=start_date,
+        end_date=end_date,
+        db_prefix=db_prefix,
+        delay_min=delay_min,
+        delay_max=delay_max,
+        situation=situation
+    )
     
     # Final verification
     try:
@@ -2027,17 +2501,10 @@ def populate_and_update_goalie_home_away_data(
         
         # Check how many records have side information
         cursor.execute(
-            f"SELECT COUNT(*) FROM {table_name} WHERE date BETWEEN %s AND %s AND side IS NOT NULL AND side != ''",
-            (start_date, end_date)
-        )
-        records_with_side = cursor.fetchone()[0]
-        
-        # Check total records
-        cursor.execute(
-            f"SELECT COUNT(*) FROM {table_name} WHERE date BETWEEN %s AND %s",
+            f"SELECT COUNT(side), COUNT(*) FROM {table_name} WHERE date BETWEEN %s AND %s",
             (start_date, end_date)
         )
-        total_records = cursor.fetchone()[0]
+        records_with_side, total_records = cursor.fetchone()
         
         logger.info(f"Final verification: {records_with_side} of {total_records} records have side information")
         
@@ -2046,4 +2513,4 @@ def populate_and_update_goalie_home_away_data(
     except Exception as e:
         logger.error(f"Error in final verification: {str(e)}")
     
-    logger.info(f"Completed populating and updating goalie home/away data for {start_date} to {end_date} in {table_name}")
\ No newline at end of file
+    return counts
@@ -0,0 +1,353 @@
+import logging
+import os
+import random
+import socket
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+import pandas as pd
+import psycopg2
+import psycopg2.extras
+
+from src.data_processing.nst_archive import is_replaying
+from src.db.base_utils import connect_db, disconnect_db
+from src.db.nst_db_utils import scrape_goalie_stats_day, scrape_team_stats_day
+
+logger = logging.getLogger(__name__)
+
+# Host whose request budget is shared by all workers
+NST_HOST = 'www.naturalstattrick.com'
+
+# Job kind -> situations it accepts
+JOB_KINDS = {
+    'goalie': ('all', '5v5', 'pk'),
+    'team': ('all', '5v5', 'pk', 'pp'),
+    'team_home': ('all', '5v5', 'pk', 'pp'),
+    'team_away': ('all', '5v5', 'pk', 'pp'),
+}
+
+# Attempts after which a job is marked failed instead of returned to the queue
+MAX_ATTEMPTS = 3
+
+# Minutes after which a running job whose worker died is claimed again
+STALE_AFTER_MINUTES = 30
+
+def enqueue_jobs(
+    kind: str,
+    start_date: str,
+    end_date: str,
+    situations: List[str],
+    stype: int = 2,
+    db_prefix: str = "NST_DB_"
+) -> int:
+    """
+    Add one job per (date, situation) in a date range to the backfill queue.
+
+    Jobs that already exist are left alone, except failed jobs, which are reset to pending
+    so that enqueuing the same range again retries them.
+
+    Args:
+        kind: 'goalie', 'team', 'team_home' or 'team_away'
+        start_date: Start date in 'YYYY-MM-DD' format
+        end_date: End date in 'YYYY-MM-DD' format
+        situations: Situations to scrape (e.g., ['all', '5v5', 'pk'])
+        stype: Type of statistics to retrieve. Defaults to 2 for regular season.
+        db_prefix: Prefix for database environment variables
+
+    Returns:
+        The number of jobs added or reset
+    """
+    if kind not in JOB_KINDS:
+        raise ValueError(f"Invalid kind: {kind}. Must be one of: {', '.join(JOB_KINDS)}")
+    if kind == 'goalie' and stype != 2:
+        raise ValueError(f"Invalid stype for goalie jobs: {stype}. Goalie stats are only scraped for the regular season (2)")
+    for situation in situations:
+        if situation not in JOB_KINDS[kind]:
+            raise ValueError(f"Invalid situation for {kind}: {situation}. Must be one of: {', '.join(JOB_KINDS[kind])}")
+
+    start = datetime.strptime(start_date, '%Y-%m-%d').date()
+    end = datetime.strptime(end_date, '%Y-%m-%d').date()
+    dates = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    rows = [(kind, situation, stype, d) for d in dates for situation in situations]
+    if not rows:
+        return 0
+
+    conn = connect_db(db_prefix)
+    try:
+        with conn.cursor() as cursor:
+            queued = len(psycopg2.extras.execute_values(
+                cursor,
+                """
+                INSERT INTO nst_scrape_jobs (kind, situation, stype, date)
+                VALUES %s
+                ON CONFLICT (kind, situation, stype, date) DO UPDATE
+                SET status = 'pending', attempts = 0, last_error = NULL
+                WHERE nst_scrape_jobs.status = 'failed'
+                RETURNING job_id
+                """,
+                rows,
+                fetch=True
+            ))
+        conn.commit()
+    finally:
+        disconnect_db(conn)
+
+    logger.info(f"Queued {queued} {kind} jobs for {start_date} to {end_date} ({', '.join(situations)})")
+    return queued
+
+def claim_job(conn, worker_id: str, stale_after_minutes: int = STALE_AFTER_MINUTES) -> Optional[dict]:
+    """
+    Claim the next pending job (or a job abandoned by a dead worker).
+
+    FOR UPDATE SKIP LOCKED lets any number of workers claim from the queue at the
+    same time without ever handing out the same job twice. Abandoned jobs that already
+    used MAX_ATTEMPTS are marked failed instead, so a job that kills its worker is not
+    retried forever.
+
+    Args:
+        conn: Database connection
+        worker_id: Identifier recorded on the claimed job
+        stale_after_minutes: Minutes after which a running job is considered abandoned
+
+    Returns:
+        The claimed job as a dict, or None if the queue is empty
+    """
+    params = {'worker_id': worker_id, 'stale': stale_after_minutes, 'max_attempts': MAX_ATTEMPTS}
+    with conn.cursor() as cursor:
+        cursor.execute(
+            """
+            UPDATE nst_scrape_jobs
+            SET status = 'failed', last_error = 'Worker stopped while running the job', finished_at = now()
+            WHERE status = 'running'
+            AND claimed_at < now() - make_interval(mins => %(stale)s)
+            AND attempts >= %(max_attempts)s
+            """,
+            params
+        )
+        if cursor.rowcount:
+            logger.warning(f"Marked {cursor.rowcount} abandoned jobs as failed after {MAX_ATTEMPTS} attempts")
+        cursor.execute(
+            """
+            UPDATE nst_scrape_jobs
+            SET status = 'running', claimed_by = %(worker_id)s, claimed_at = now(), attempts = attempts + 1
+            WHERE job_id = (
+                SELECT job_id
+                FROM nst_scrape_jobs
+                WHERE status = 'pending'
+                   OR (status = 'running' AND claimed_at < now() - make_interval(mins => %(stale)s)
+                       AND attempts < %(max_attempts)s)
+                ORDER BY date, job_id
+                FOR UPDATE SKIP LOCKED
+                LIMIT 1
+            )
+            RETURNING job_id, kind, situation, stype, date, attempts
+            """,
+            params
+        )
+        row = cursor.fetchone()
+    conn.commit()
+
+    if row is None:
+        return None
+    return dict(zip(['job_id', 'kind', 'situation', 'stype', 'date', 'attempts'], row))
+
+def reserve_request_slot(conn, delay_min: float, delay_max: float, host: str = NST_HOST) -> float:
+    """
+    Reserve the next request slot from the global politeness budget.
+
+    The budget is one row per host holding the earliest time the next request may start.
+    Each reservation atomically moves it forward by a random delay, so requests from all
+    workers together are spaced at least delay_min seconds apart.
+
+    Args:
+        conn: Database connection
+        delay_min: Minimum delay between requests (seconds)
+        delay_max: Maximum delay between requests (seconds)
+        host: The host the request is for
+
+    Returns:
+        The number of seconds to wait before sending the request
+    """
+    delay = random.uniform(delay_min, delay_max)
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO nst_politeness (host) VALUES (%s) ON CONFLICT (host) DO NOTHING",
+            (host,)
+        )
+        cursor.execute(
+            """
+            UPDATE nst_politeness
+            SET next_allowed_at = GREATEST(next_allowed_at, clock_timestamp()) + make_interval(secs => %(delay)s)
+            WHERE host = %(host)s
+            RETURNING EXTRACT(EPOCH FROM (next_allowed_at - make_interval(secs => %(delay)s) - clock_timestamp()))
+            """,
+            {'delay': delay, 'host': host}
+        )
+        wait = float(cursor.fetchone()[0])
+    conn.commit()
+    return max(wait, 0.0)
+
+def run_job(job: dict, conn) -> Optional[int]:
+    """
+    Scrape and save the data of one job.
+
+    Args:
+        job: A job returned by claim_job
+        conn: Database connection
+
+    Returns:
+        The number of rows saved, or None if the scraper returned no data
+    """
+    date_str = job['date'].strftime('%Y-%m-%d')
+    if job['kind'] == 'goalie':
+        return scrape_goalie_stats_day(date_str, job['situation'], conn)
+    elif job['kind'] == 'team':
+        return scrape_team_stats_day(date_str, job['situation'], conn, stype=job['stype'])
+    elif job['kind'] == 'team_home':
+        return scrape_team_stats_day(date_str, job['situation'], conn, stype=job['stype'], loc='H')
+    elif job['kind'] == 'team_away':
+        return scrape_team_stats_day(date_str, job['situation'], conn, stype=job['stype'], loc='A')
+    else:
+        raise ValueError(f"Invalid job kind: {job['kind']}")
+
+def _finish_job(conn, job: dict, rows_saved: Optional[int], error: Optional[str]) -> None:
+    """
+    Record the outcome of a job.
+
+    Failed jobs go back to the queue until they reach MAX_ATTEMPTS.
+
+    Args:
+        conn: Database connection
+        job: The job
+        rows_saved: Number of rows saved (when successful)
+        error: Error message (when failed)
+    """
+    if error is None:
+        status = 'done'
+    else:
+        status = 'failed' if job['attempts'] >= MAX_ATTEMPTS else 'pending'
+    with conn.cursor() as cursor:
+        cursor.execute(
+            """
+            UPDATE nst_scrape_jobs
+            SET status = %s, rows_saved = %s, last_error = %s, finished_at = now()
+            WHERE job_id = %s
+            """,
+            (status, rows_saved, error, job['job_id'])
+        )
+    conn.commit()
+
+def run_worker(
+    db_prefix: str = "NST_DB_",
+    delay_min: int = 3,
+    delay_max: int = 7,
+    max_jobs: Optional[int] = None,
+    worker_id: Optional[str] = None
+) -> dict:
+    """
+    Process jobs from the backfill queue until it is empty.
+
+    Several workers (in one or more processes) can run against the same queue;
+    the politeness budget keeps their combined request rate within delay_min/delay_max.
+    After a crash, starting a worker again picks up only the unfinished jobs.
+
+    Args:
+        db_prefix: Prefix for database environment variables
+        delay_min: Minimum delay between requests (seconds)
+        delay_max: Maximum delay between requests (seconds)
+        max_jobs: Stop after this many jobs (all jobs if None)
+        worker_id: Identifier recorded on claimed jobs. Defaults to hostname:pid.
+
+    Returns:
+        Counts of 'done', 'empty' (no data for the day) and 'failed' jobs
+    """
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    counts = {'done': 0, 'empty': 0, 'failed': 0}
+
+    conn = connect_db(db_prefix)
+    try:
+        while max_jobs is None or sum(counts.values()) < max_jobs:
+            job = claim_job(conn, worker_id)
+            if job is None:
+                break
+
+            # Pages replayed from the archive do not count against the politeness budget
+            wait = 0 if is_replaying() else reserve_request_slot(conn, delay_min, delay_max)
+            if wait > 0:
+                logger.info(f"Waiting {wait:.1f} seconds before next request...")
+                time.sleep(wait)
+
+            logger.info(f"Running {job['kind']} job for {job['date']} ({job['situation']}), attempt {job['attempts']}")
+            try:
+                rows_saved = run_job(job, conn)
+            except Exception as e:
+                conn.rollback()
+                logger.error(f"Job {job['job_id']} failed: {e}")
+                _finish_job(conn, job, None, str(e))
+                counts['failed'] += 1
+                continue
+
+            _finish_job(conn, job, rows_saved or 0, None)
+            counts['done' if rows_saved else 'empty'] += 1
+    finally:
+        disconnect_db(conn)
+
+    logger.info(f"Worker {worker_id} finished: {counts}")
+    return counts
+
+def backfill(
+    kind: str,
+    start_date: str,
+    end_date: str,
+    situations: List[str],
+    stype: int = 2,
+    db_prefix: str = "NST_DB_",
+    delay_min: int = 3,
+    delay_max: int = 7
+) -> dict:
+    """
+    Queue a date range and process the queue in this process.
+
+    Example:
+        backfill('goalie', '2024-10-04', '2025-04-17', ['all', '5v5', 'pk'])
+
+    Args:
+        kind: 'goalie', 'team', 'team_home' or 'team_away'
+        start_date: Start date in 'YYYY-MM-DD' format
+        end_date: End date in 'YYYY-MM-DD' format
+        situations: Situations to scrape
+        stype: Type of statistics to retrieve. Defaults to 2 for regular season.
+        db_prefix: Prefix for database environment variables
+        delay_min: Minimum delay between requests (seconds)
+        delay_max: Maximum delay between requests (seconds)
+
+    Returns:
+        The worker's job counts (see run_worker)
+    """
+    enqueue_jobs(kind, start_date, end_date, situations, stype=stype, db_prefix=db_prefix)
+    return run_worker(db_prefix=db_prefix, delay_min=delay_min, delay_max=delay_max)
+
+def queue_status(db_prefix: str = "NST_DB_") -> pd.DataFrame:
+    """
+    Summarize the backfill queue.
+
+    Args:
+        db_prefix: Prefix for database environment variables
+
+    Returns:
+        DataFrame with the number of jobs and date range per kind, situation and status
+    """
+    conn = connect_db(db_prefix)
+    try:
+        return pd.read_sql_query(
+            """
+            SELECT kind, situation, status, COUNT(*) AS jobs, MIN(date) AS first_date, MAX(date) AS last_date
+            FROM nst_scrape_jobs
+            GROUP BY kind, situation, status
+            ORDER BY kind, situation, status
+            """,
+            conn
+        )
+    finally:
+        disconnect_db(conn)
@@ -0,0 +1,193 @@
+import logging
+from io import StringIO
+
+import pandas as pd
+import psycopg2
+
+from src.db.base_utils import connect_db, disconnect_db
+from src.data_processing.api_cache import FINAL_GAME_STATES
+from src.data_processing.pbp_utils import PBP_MAX_WORKERS, PlayByPlayBuilder, iter_game_plays
+from src.data_processing.schedule_store import get_games
+
+logger = logging.getLogger(__name__)
+
+DB_PREFIX = 'NHL_DB_'
+
+# PBP_SCHEMA column -> pbp_events column
+PBP_DB_COLUMNS = {
+    'gid': 'game_id',
+    'eventId': 'event_id',
+    'sortOrder': 'sort_order',
+    'period_number': 'period_number',
+    'period_type': 'period_type',
+    'maxRegulationPeriods': 'max_regulation_periods',
+    'secondsInPeriod': 'seconds_in_period',
+    'secondsRemaining': 'seconds_remaining',
+    'situationCode': 'situation_code',
+    'homeTeamDefendingSide': 'home_team_defending_side',
+    'typeCode': 'type_code',
+    'typeDescKey': 'type_desc_key',
+    'details_eventOwnerTeamId': 'event_owner_team_id',
+    'details_xCoord': 'x_coord',
+    'details_yCoord': 'y_coord',
+    'details_zoneCode': 'zone_code',
+    'details_shotType': 'shot_type',
+    'details_reason': 'reason',
+    'details_shootingPlayerId': 'shooting_player_id',
+    'details_scoringPlayerId': 'scoring_player_id',
+    'details_assist1PlayerId': 'assist1_player_id',
+    'details_assist2PlayerId': 'assist2_player_id',
+    'details_goalieInNetId': 'goalie_in_net_id',
+    'details_blockingPlayerId': 'blocking_player_id',
+    'details_hittingPlayerId': 'hitting_player_id',
+    'details_hitteePlayerId': 'hittee_player_id',
+    'details_playerId': 'player_id',
+    'details_winningPlayerId': 'winning_player_id',
+    'details_losingPlayerId': 'losing_player_id',
+    'details_committedByPlayerId': 'committed_by_player_id',
+    'details_drawnByPlayerId': 'drawn_by_player_id',
+    'details_servedByPlayerId': 'served_by_player_id',
+    'details_typeCode': 'penalty_type_code',
+    'details_descKey': 'penalty_desc_key',
+    'details_duration': 'duration',
+    'details_awayScore': 'away_score',
+    'details_homeScore': 'home_score',
+    'details_awaySOG': 'away_sog',
+    'details_homeSOG': 'home_sog',
+}
+
+def season_for_game(game_id) -> int:
+    """
+    Returns the season of a game from its ID.
+
+    Parameters:
+        game_id: The game ID (the first four digits are the season's start year).
+
+    Returns:
+        int: Season in YYYYYYYY format (e.g., 20242025).
+    """
+    start_year = int(str(game_id)[:4])
+    return start_year * 10000 + start_year + 1
+
+def ensure_pbp_partition(cursor, season: int) -> None:
+    """
+    Creates the pbp_events partition for a season if it does not exist.
+
+    Parameters:
+        cursor: Database cursor.
+        season (int): Season in YYYYYYYY format.
+    """
+    cursor.execute(
+        f"CREATE TABLE IF NOT EXISTS public.pbp_events_{int(season)} "
+        f"PARTITION OF public.pbp_events FOR VALUES IN ({int(season)})"
+    )
+
+def get_loaded_game_ids(cursor, game_ids) -> set:
+    """
+    Returns which of the given games already have events in pbp_events.
+
+    Parameters:
+        cursor: Database cursor.
+        game_ids (iterable): Game IDs to check.
+
+    Returns:
+        set: The IDs of games that are already loaded.
+    """
+    game_ids = [int(game_id) for game_id in game_ids]
+    if not game_ids:
+        return set()
+    seasons = sorted({season_for_game(game_id) for game_id in game_ids})
+    cursor.execute(
+        "SELECT DISTINCT game_id FROM pbp_events WHERE season = ANY(%s) AND game_id = ANY(%s)",
+        (seasons, game_ids)
+    )
+    return {row[0] for row in cursor.fetchall()}
+
+def copy_pbp_frame(cursor, df: pd.DataFrame) -> int:
+    """
+    Writes play-by-play rows into pbp_events with COPY FROM STDIN.
+
+    Parameters:
+        cursor: Database cursor.
+        df (pd.DataFrame): Play-by-play rows with the PBP_SCHEMA columns.
+
+    Returns:
+        int: The number of rows copied.
+    """
+    if df.empty:
+        return 0
+    out = df[list(PBP_DB_COLUMNS)].rename(columns=PBP_DB_COLUMNS)
+    out.insert(0, 'season', out['game_id'].map(season_for_game).astype('Int32'))
+
+    buffer = StringIO()
+    out.to_csv(buffer, header=False, index=False, na_rep='')
+    buffer.seek(0)
+    cursor.copy_expert(
+        f"COPY pbp_events ({', '.join(out.columns)}) FROM STDIN WITH (FORMAT csv, NULL '')",
+        buffer
+    )
+    return len(out)
+
+def load_pbp_events(start_date: str, end_date: str, db_prefix: str = DB_PREFIX,
+                    max_workers: int = PBP_MAX_WORKERS, conn=None) -> dict:
+    """
+    Loads the play-by-play events of all final regular season games in a date range into pbp_events.
+
+    Games are fetched concurrently and copied into the table one game at a time as they
+    arrive, so memory is bounded by a single game regardless of the size of the range.
+    Each game is committed on its own and games that are already loaded are skipped,
+    so the load can be repeated or resumed after a failure without duplicates.
+
+    Parameters:
+        start_date (str): The start date in 'YYYY-MM-DD' format.
+        end_date (str): The end date in 'YYYY-MM-DD' format.
+        db_prefix (str): The prefix for the database environment variables. Defaults to 'NHL_DB_'.
+        max_workers (int): Maximum number of concurrent requests. Defaults to PBP_MAX_WORKERS.
+        conn (optional): An open database connection to use instead of opening a new one.
+
+    Returns:
+        dict: 'games_loaded', 'rows_loaded' and 'games_skipped' (already loaded) counts.
+
+    Example:
+        load_pbp_events('2024-10-04', '2025-04-17')
+    """
+    games = [
+        game for game in get_games(start_date, end_date)
+        if game['gameType'] == 2 and game['gameState'] in FINAL_GAME_STATES
+    ]
+    game_ids = [game['id'] for game in games]
+    counts = {'games_loaded': 0, 'rows_loaded': 0, 'games_skipped': 0}
+
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_db(db_prefix)
+    try:
+        with conn.cursor() as cursor:
+            for season in sorted({game['season'] for game in games}):
+                ensure_pbp_partition(cursor, season)
+            loaded = get_loaded_game_ids(cursor, game_ids)
+        conn.commit()
+
+        to_load = [game_id for game_id in game_ids if game_id not in loaded]
+        counts['games_skipped'] = len(game_ids) - len(to_load)
+        logger.info(f"Loading play-by-play events for {len(to_load)} games ({counts['games_skipped']} already loaded)")
+
+        for game, plays in iter_game_plays({'game_ids': to_load}, max_workers=max_workers):
+            builder = PlayByPlayBuilder()
+            builder.append_game(game, plays)
+            try:
+                with conn.cursor() as cursor:
+                    rows = copy_pbp_frame(cursor, builder.to_frame())
+                conn.commit()
+            except psycopg2.Error as e:
+                conn.rollback()
+                logger.error(f"Failed to load play-by-play events for game {game}: {e}")
+                continue
+            counts['games_loaded'] += 1
+            counts['rows_loaded'] += rows
+    finally:
+        if own_conn:
+            disconnect_db(conn)
+
+    logger.info(f"Loaded {counts['rows_loaded']} play-by-play events from {counts['games_loaded']} games")
+    return counts
@@ -5,14 +5,13 @@ import urllib.parse
 from data_processing.utils import get_request  # Import from the new utils module
 from psycopg2.extras import execute_values  # Import execute_values
 import logging
+from src.data_processing.http_client import get_client
 from src.data_processing.team_utils import get_tricode_by_fullname
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import psycopg2.pool
 from functools import partial
 import os
 import time
-import threading
-from queue import Queue
 from fuzzywuzzy import fuzz
 
 DB_PREFIX = 'PROP_ODDS_DB_'
@@ -30,8 +29,7 @@ connection_pool = None
 
 # Add rate limiting configuration
 API_RATE_LIMIT = 2  # requests per second
-api_request_times = Queue()
-api_lock = threading.Lock()
+get_client().set_host_limit('api.prop-odds.com', min_interval=1.0 / API_RATE_LIMIT)
 
 def init_connection_pool(min_conn=2, max_conn=10):
     """Initialize the connection pool for database operations."""
@@ -238,29 +236,8 @@ def get_nhl_games_from_db(query_date=None, enable_logging=False):
 # get_nhl_games_from_db('2024-12-11')
 
 def rate_limited_api_request(url, enable_logging=False):
-    """Make an API request with rate limiting."""
-    with api_lock:
-        current_time = time.time()
-        
-        # Remove old request timestamps
-        while not api_request_times.empty():
-            old_time = api_request_times.get()
-            if current_time - old_time < 1:  # Keep requests within last second
-                api_request_times.put(old_time)
-                break
-        
-        # Check if we've hit the rate limit
-        if api_request_times.qsize() >= API_RATE_LIMIT:
-            sleep_time = 1.0 - (current_time - api_request_times.queue[0])
-            if sleep_time > 0:
-                if enable_logging:
-                    logging.info(f"Rate limit reached, waiting {sleep_time:.2f} seconds")
-                time.sleep(sleep_time)
-        
-        # Make the request
-        response = get_request(url, enable_logging=enable_logging)
-        api_request_times.put(time.time())
-        return response
+    """Make an API request with rate limiting (enforced by the shared HTTP client's host limit)."""
+    return get_request(url, enable_logging=enable_logging)
 
 def fetch_game_markets(game_id, market_name=None, enable_logging=False):
     """Fetch game markets with rate limiting."""
@@ -172,6 +172,9 @@ CREATE INDEX IF NOT EXISTS idx_player_shots_ou_player ON player_shots_ou(player)
 CREATE INDEX IF NOT EXISTS idx_player_shots_ou_timestamp ON player_shots_ou(timestamp);
 
 -- Create Natural Stat Trick Database Tables
+-- Stats tables have one partition per season (July 1 to June 30), created by the scrapers
+-- (see nst_db_utils.ensure_stats_partition). Databases created before the tables were
+-- partitioned are converted by sql/partition_nst_stats.sql.
 
 -- 5v5 Goalie Stats Table
 CREATE TABLE IF NOT EXISTS public.goalie_stats_5v5 (
@@ -211,8 +214,10 @@ CREATE TABLE IF NOT EXISTS public.goalie_stats_5v5 (
     date date NOT NULL,
     last_updated timestamp with time zone DEFAULT CURRENT_TIMESTAMP,
     season integer,
+    side character varying(10),  -- 'home' or 'away', attached from the NHL schedule at scrape time
+    opponent character varying(10),
     CONSTRAINT goalie_stats_5v5_pkey PRIMARY KEY (player, date)
-);
+) PARTITION BY RANGE (date);
 
 -- All Situations Goalie Stats Table
 CREATE TABLE IF NOT EXISTS public.goalie_stats_all (
@@ -252,8 +257,10 @@ CREATE TABLE IF NOT EXISTS public.goalie_stats_all (
     date date NOT NULL,
     last_updated timestamp with time zone DEFAULT CURRENT_TIMESTAMP,
     season integer,
+    side character varying(10),  -- 'home' or 'away', attached from the NHL schedule at scrape time
+    opponent character varying(10),
     CONSTRAINT goalie_stats_all_pkey PRIMARY KEY (player, date)
-);
+) PARTITION BY RANGE (date);
 
 -- Penalty Kill Goalie Stats Table
 CREATE TABLE IF NOT EXISTS public.goalie_stats_pk (
@@ -293,10 +300,12 @@ CREATE TABLE IF NOT EXISTS public.goalie_stats_pk (
     date date NOT NULL,
     last_updated timestamp with time zone DEFAULT CURRENT_TIMESTAMP,
     season integer,
+    side character varying(10),  -- 'home' or 'away', attached from the NHL schedule at scrape time
+    opponent character varying(10),
     CONSTRAINT goalie_stats_pk_pkey PRIMARY KEY (player, date)
-);
+) PARTITION BY RANGE (date);
 
--- Create indices for goalie stats tables
+-- Create indices for goalie stats tables (created on every partition)
 CREATE INDEX IF NOT EXISTS idx_goalie_stats_5v5_player ON goalie_stats_5v5(player);
 CREATE INDEX IF NOT EXISTS idx_goalie_stats_5v5_date ON goalie_stats_5v5(date);
 CREATE INDEX IF NOT EXISTS idx_goalie_stats_5v5_team ON goalie_stats_5v5(team);
@@ -320,9 +329,34 @@ COMMENT ON TABLE public.nhl_player_sog_odds IS 'Player shots on goal betting odd
 COMMENT ON TABLE public.nhl_player_saves_odds IS 'Player saves betting odds for NHL games';
 COMMENT ON TABLE public.prop_game_info IS 'Game information for prop betting odds';
 COMMENT ON TABLE public.player_shots_ou IS 'Player shots over/under prop betting odds';
-COMMENT ON TABLE public.goalie_stats_5v5 IS 'NHL goalie statistics at 5v5 play including high, medium, and low danger metrics';
-COMMENT ON TABLE public.goalie_stats_all IS 'NHL goalie statistics for all game situations including high, medium, and low danger metrics';
-COMMENT ON TABLE public.goalie_stats_pk IS 'NHL goalie statistics during penalty kill situations including high, medium, and low danger metrics';
+COMMENT ON TABLE public.goalie_stats_5v5 IS 'NHL goalie statistics at 5v5 play including high, medium, and low danger metrics, partitioned by season';
+COMMENT ON TABLE public.goalie_stats_all IS 'NHL goalie statistics for all game situations including high, medium, and low danger metrics, partitioned by season';
+COMMENT ON TABLE public.goalie_stats_pk IS 'NHL goalie statistics during penalty kill situations including high, medium, and low danger metrics, partitioned by season';
+
+-- Rolling Goalie Stats Table
+-- Averages over each goalie's last 5, 10 and 20 games up to and including each game date,
+-- refreshed for the goalies of every saved day (see nst_db_utils.refresh_goalie_rolling_stats)
+CREATE TABLE IF NOT EXISTS public.goalie_rolling_stats (
+    source_table character varying(30) NOT NULL,  -- goalie_stats_all, goalie_stats_5v5 or goalie_stats_pk
+    player character varying(200) NOT NULL,
+    date date NOT NULL,
+    n_games integer NOT NULL,
+    games integer,  -- games in the window (fewer than n_games early in a career)
+    avg_sv_pct numeric,
+    avg_hd_sv_pct numeric,
+    avg_md_sv_pct numeric,
+    avg_ld_sv_pct numeric,
+    avg_hd_shots numeric,
+    avg_md_shots numeric,
+    avg_ld_shots numeric,
+    avg_gsaa numeric,
+    last_updated timestamp with time zone DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT goalie_rolling_stats_pkey PRIMARY KEY (source_table, player, n_games, date)
+);
+
+CREATE INDEX IF NOT EXISTS idx_goalie_rolling_stats_date ON goalie_rolling_stats(source_table, date);
+
+COMMENT ON TABLE public.goalie_rolling_stats IS 'Rolling last-5/10/20 game averages per goalie and game date, maintained from the goalie stats tables';
 
 -- Create Team Stats Tables
 
@@ -402,8 +436,10 @@ CREATE TABLE IF NOT EXISTS public.team_stats_5v5 (
     date date NOT NULL,
     last_updated timestamp with time zone DEFAULT CURRENT_TIMESTAMP,
     season integer,
+    side character varying(10),  -- 'home' or 'away', attached from the NHL schedule at scrape time
+    opponent character varying(50),
     CONSTRAINT team_stats_5v5_pkey PRIMARY KEY (team, date)
-);
+) PARTITION BY RANGE (date);
 
 -- All Situations Team Stats Table
 CREATE TABLE IF NOT EXISTS public.team_stats_all (
@@ -487,8 +523,10 @@ CREATE TABLE IF NOT EXISTS public.team_stats_all (
     date date NOT NULL,
     last_updated timestamp with time zone DEFAULT CURRENT_TIMESTAMP,
     season integer,
+    side character varying(10),  -- 'home' or 'away', attached from the NHL schedule at scrape time
+    opponent character varying(50),
     CONSTRAINT team_stats_all_pkey PRIMARY KEY (team, date)
-);
+) PARTITION BY RANGE (date);
 
 -- Penalty Kill Team Stats Table
 CREATE TABLE IF NOT EXISTS public.team_stats_pk (
@@ -566,8 +604,10 @@ CREATE TABLE IF NOT EXISTS public.team_stats_pk (
     date date NOT NULL,
     last_updated timestamp with time zone DEFAULT CURRENT_TIMESTAMP,
     season integer,
+    side character varying(10),  -- 'home' or 'away', attached from the NHL schedule at scrape time
+    opponent character varying(50),
     CONSTRAINT team_stats_pk_pkey PRIMARY KEY (team, date)
-);
+) PARTITION BY RANGE (date);
 
 -- Power Play Team Stats Table
 CREATE TABLE IF NOT EXISTS public.team_stats_pp (
@@ -645,10 +685,12 @@ CREATE TABLE IF NOT EXISTS public.team_stats_pp (
     date date NOT NULL,
     last_updated timestamp with time zone DEFAULT CURRENT_TIMESTAMP,
     season integer,
+    side character varying(10),  -- 'home' or 'away', attached from the NHL schedule at scrape time
+    opponent character varying(50),
     CONSTRAINT team_stats_pp_pkey PRIMARY KEY (team, date)
-);
+) PARTITION BY RANGE (date);
 
--- Create indices for team stats tables
+-- Create indices for team stats tables (created on every partition)
 CREATE INDEX IF NOT EXISTS idx_team_stats_5v5_team ON team_stats_5v5(team);
 CREATE INDEX IF NOT EXISTS idx_team_stats_5v5_date ON team_stats_5v5(date);
 CREATE INDEX IF NOT EXISTS idx_team_stats_5v5_season ON team_stats_5v5(season);
@@ -666,7 +708,104 @@ CREATE INDEX IF NOT EXISTS idx_team_stats_pp_date ON team_stats_pp(date);
 CREATE INDEX IF NOT EXISTS idx_team_stats_pp_season ON team_stats_pp(season);
 
 -- Add comments to team stats tables
-COMMENT ON TABLE public.team_stats_5v5 IS 'NHL team statistics at 5v5 play including possession, shot, and goal metrics';
-COMMENT ON TABLE public.team_stats_all IS 'NHL team statistics for all game situations including power play and penalty kill metrics';
-COMMENT ON TABLE public.team_stats_pk IS 'NHL team statistics during penalty kill situations';
-COMMENT ON TABLE public.team_stats_pp IS 'NHL team statistics during power play situations'; 
\ No newline at end of file
+COMMENT ON TABLE public.team_stats_5v5 IS 'NHL team statistics at 5v5 play including possession, shot, and goal metrics, partitioned by season';
+COMMENT ON TABLE public.team_stats_all IS 'NHL team statistics for all game situations including power play and penalty kill metrics, partitioned by season';
+COMMENT ON TABLE public.team_stats_pk IS 'NHL team statistics during penalty kill situations, partitioned by season';
+COMMENT ON TABLE public.team_stats_pp IS 'NHL team statistics during power play situations, partitioned by season'; 
+
+-- Add the side and opponent columns to stats tables created before they were part of the schema
+ALTER TABLE public.goalie_stats_5v5 ADD COLUMN IF NOT EXISTS side character varying(10), ADD COLUMN IF NOT EXISTS opponent character varying(10);
+ALTER TABLE public.goalie_stats_all ADD COLUMN IF NOT EXISTS side character varying(10), ADD COLUMN IF NOT EXISTS opponent character varying(10);
+ALTER TABLE public.goalie_stats_pk ADD COLUMN IF NOT EXISTS side character varying(10), ADD COLUMN IF NOT EXISTS opponent character varying(10);
+ALTER TABLE public.team_stats_5v5 ADD COLUMN IF NOT EXISTS side character varying(10), ADD COLUMN IF NOT EXISTS opponent character varying(50);
+ALTER TABLE public.team_stats_all ADD COLUMN IF NOT EXISTS side character varying(10), ADD COLUMN IF NOT EXISTS opponent character varying(50);
+ALTER TABLE public.team_stats_pk ADD COLUMN IF NOT EXISTS side character varying(10), ADD COLUMN IF NOT EXISTS opponent character varying(50);
+ALTER TABLE public.team_stats_pp ADD COLUMN IF NOT EXISTS side character varying(10), ADD COLUMN IF NOT EXISTS opponent character varying(50);
+
+-- Create Play-by-Play Tables
+
+-- Play-by-Play Events Table (one partition per season, see pbp_db_utils.ensure_pbp_partition)
+CREATE TABLE IF NOT EXISTS public.pbp_events (
+    season integer NOT NULL,
+    game_id integer NOT NULL,
+    event_id integer NOT NULL,
+    sort_order integer,
+    period_number smallint,
+    period_type character varying(10),
+    max_regulation_periods smallint,
+    seconds_in_period smallint,
+    seconds_remaining smallint,
+    situation_code character varying(4),
+    home_team_defending_side character varying(10),
+    type_code integer,
+    type_desc_key character varying(50),
+    event_owner_team_id integer,
+    x_coord real,
+    y_coord real,
+    zone_code character varying(2),
+    shot_type character varying(20),
+    reason character varying(50),
+    shooting_player_id integer,
+    scoring_player_id integer,
+    assist1_player_id integer,
+    assist2_player_id integer,
+    goalie_in_net_id integer,
+    blocking_player_id integer,
+    hitting_player_id integer,
+    hittee_player_id integer,
+    player_id integer,
+    winning_player_id integer,
+    losing_player_id integer,
+    committed_by_player_id integer,
+    drawn_by_player_id integer,
+    served_by_player_id integer,
+    penalty_type_code character varying(10),
+    penalty_desc_key character varying(50),
+    duration integer,
+    away_score smallint,
+    home_score smallint,
+    away_sog smallint,
+    home_sog smallint,
+    loaded_at timestamp with time zone DEFAULT CURRENT_TIMESTAMP,
+    -- The partition key must be part of the primary key
+    CONSTRAINT pbp_events_pkey PRIMARY KEY (season, game_id, event_id)
+) PARTITION BY LIST (season);
+
+-- Create indices for pbp_events table (created on every partition)
+CREATE INDEX IF NOT EXISTS idx_pbp_events_game_id ON pbp_events(game_id, event_id);
+CREATE INDEX IF NOT EXISTS idx_pbp_events_type_desc_key ON pbp_events(type_desc_key);
+CREATE INDEX IF NOT EXISTS idx_pbp_events_shooting_player ON pbp_events(shooting_player_id);
+CREATE INDEX IF NOT EXISTS idx_pbp_events_goalie_in_net ON pbp_events(goalie_in_net_id);
+
+COMMENT ON TABLE public.pbp_events IS 'NHL play-by-play events from the NHL API, partitioned by season';
+
+-- Create Natural Stat Trick Backfill Queue Tables
+
+-- One row per (kind, situation, stype, date) scrape, claimed by workers with FOR UPDATE SKIP LOCKED
+CREATE TABLE IF NOT EXISTS public.nst_scrape_jobs (
+    job_id bigserial PRIMARY KEY,
+    kind character varying(20) NOT NULL,  -- 'goalie', 'team', 'team_home' or 'team_away'
+    situation character varying(10) NOT NULL,
+    stype integer NOT NULL DEFAULT 2,
+    date date NOT NULL,
+    status character varying(10) NOT NULL DEFAULT 'pending',  -- 'pending', 'running', 'done' or 'failed'
+    attempts integer NOT NULL DEFAULT 0,
+    rows_saved integer,
+    claimed_by character varying(100),
+    claimed_at timestamp with time zone,
+    finished_at timestamp with time zone,
+    last_error text,
+    created_at timestamp with time zone DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT nst_scrape_jobs_unique UNIQUE (kind, situation, stype, date)
+);
+
+CREATE INDEX IF NOT EXISTS idx_nst_scrape_jobs_status ON nst_scrape_jobs(status, date);
+
+-- Earliest time the next request may be sent to a host, shared by all workers
+CREATE TABLE IF NOT EXISTS public.nst_politeness (
+    host character varying(100) PRIMARY KEY,
+    next_allowed_at timestamp with time zone NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+COMMENT ON TABLE public.nst_scrape_jobs IS 'Persisted work items for Natural Stat Trick date-range backfills';
+COMMENT ON TABLE public.nst_politeness IS 'Global request budget shared by Natural Stat Trick backfill workers';
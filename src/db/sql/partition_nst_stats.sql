@@ -0,0 +1,67 @@
+-- Convert the Natural Stat Trick stats tables to tables partitioned by season
+--
+-- Databases created before the goalie_stats_* and team_stats_* tables were partitioned
+-- hold them as plain tables. For each such table this script renames it, creates the
+-- partitioned table with the same columns, one partition per season found in the data
+-- (July 1 to June 30, named <table>_<season>, e.g. goalie_stats_all_20242025), copies
+-- the rows and drops the old table. Tables that are already partitioned are skipped,
+-- so the script can be run more than once.
+--
+-- Run create_tables.sql first (it adds the side and opponent columns), then:
+--     psql -f src/db/sql/partition_nst_stats.sql
+-- The whole conversion runs in one transaction; the tables are locked while it runs.
+
+DO $$
+DECLARE
+    t text;
+    key_column text;
+    table_comment text;
+    start_year integer;
+BEGIN
+    FOREACH t IN ARRAY ARRAY[
+        'goalie_stats_5v5', 'goalie_stats_all', 'goalie_stats_pk',
+        'team_stats_5v5', 'team_stats_all', 'team_stats_pk', 'team_stats_pp'
+    ] LOOP
+        IF to_regclass('public.' || t) IS NULL
+           OR (SELECT relkind FROM pg_class WHERE oid = to_regclass('public.' || t)) = 'p' THEN
+            RAISE NOTICE 'Skipping %: missing or already partitioned', t;
+            CONTINUE;
+        END IF;
+        key_column := CASE WHEN t LIKE 'goalie%' THEN 'player' ELSE 'team' END;
+        table_comment := obj_description(to_regclass('public.' || t), 'pg_class');
+
+        EXECUTE format('ALTER TABLE public.%I RENAME TO %I', t, t || '_unpartitioned');
+        EXECUTE format('ALTER TABLE public.%I RENAME CONSTRAINT %I TO %I', t || '_unpartitioned', t || '_pkey', t || '_unpartitioned_pkey');
+
+        EXECUTE format(
+            'CREATE TABLE public.%I (LIKE public.%I INCLUDING DEFAULTS INCLUDING COMMENTS, '
+            'CONSTRAINT %I PRIMARY KEY (%I, date)) PARTITION BY RANGE (date)',
+            t, t || '_unpartitioned', t || '_pkey', key_column
+        );
+        EXECUTE format('COMMENT ON TABLE public.%I IS %L', t, table_comment);
+
+        FOR start_year IN EXECUTE format(
+            'SELECT DISTINCT date_part(''year'', date - interval ''6 months'')::integer FROM public.%I',
+            t || '_unpartitioned'
+        ) LOOP
+            EXECUTE format(
+                'CREATE TABLE public.%I PARTITION OF public.%I FOR VALUES FROM (%L) TO (%L)',
+                t || '_' || start_year || (start_year + 1), t,
+                make_date(start_year, 7, 1), make_date(start_year + 1, 7, 1)
+            );
+        END LOOP;
+
+        EXECUTE format('INSERT INTO public.%I SELECT * FROM public.%I', t, t || '_unpartitioned');
+        EXECUTE format('DROP TABLE public.%I', t || '_unpartitioned');
+
+        -- The old table's indices were dropped with it; create them on the partitioned table
+        EXECUTE format('CREATE INDEX IF NOT EXISTS %I ON public.%I(%I)', 'idx_' || t || '_' || key_column, t, key_column);
+        EXECUTE format('CREATE INDEX IF NOT EXISTS %I ON public.%I(date)', 'idx_' || t || '_date', t);
+        EXECUTE format('CREATE INDEX IF NOT EXISTS %I ON public.%I(season)', 'idx_' || t || '_season', t);
+        IF key_column = 'player' THEN
+            EXECUTE format('CREATE INDEX IF NOT EXISTS %I ON public.%I(team)', 'idx_' || t || '_team', t);
+        END IF;
+
+        RAISE NOTICE 'Partitioned %', t;
+    END LOOP;
+END $$;